@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed store for build outputs.
+
+The outputs of a build (logs, index files, design
+documents, test and coverage data and so on) are
+all written to the branch log directory. They are
+fully determined by the design documents being
+built (identified by the hash of the git tree of
+the defined baseline, which also identifies the
+version of the build system itself) and by the
+build configuration.
+
+Two branches, or two defined baselines, which
+point at the same tree would otherwise be built
+twice. Instead, once a build has completed, its
+branch log directory is moved into the store,
+under a key derived from the tree hash and a
+digest of the build configuration, and replaced
+by a symbolic link to the stored copy. A later
+build with the same key is a cache hit: the branch
+log directory is simply linked to the stored copy,
+and nothing is rebuilt.
+
+Each build which is not a cache hit starts with
+an empty branch log directory, so the stored
+outputs depend only on the key, and not on the
+history of the branch.
+
+The store is kept in the build cache directory, so
+it is cleared by clean_tmp_dir. The least recently
+used entries are deleted when the number of entries
+exceeds the configured limit.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import da.util
+
+
+# Configuration items which identify a particular
+# build rather than determine what is built.
+#
+_VOLATILE_KEYS = ('auto_commit_baseline',
+                  'baseline_results',
+                  'build_codename',
+                  'build_context',
+                  'build_id',
+                  'cfg_name',
+                  'changed_files',
+                  'defined_baseline',
+                  'paths',
+                  'safe_branch_name',
+                  'timestamp')
+
+
+# -----------------------------------------------------------------------------
+def open_store(cfg):
+    """
+    Return the ArtifactStore for the build, or None if it is not enabled.
+
+    """
+    if not cfg['options'].get('enable_artifact_store', False):
+        return None
+    return ArtifactStore(
+                dirpath     = os.path.join(cfg['paths']['dirpath_meta_cache'],
+                                           'artifacts'),
+                max_entries = cfg['options'].get(
+                                        'artifact_store_max_entries', 64))
+
+
+# -----------------------------------------------------------------------------
+def build_key(cfg):
+    """
+    Return the key for the outputs of the build, or None if it has none.
+
+    Changed files are identified by their path
+    relative to the local working copy, as they
+    determine which files are checked when
+    check_changed_files_only is set.
+
+    """
+    tree_hexsha = cfg.get('defined_baseline', {}).get('tree_hexsha', None)
+    if tree_hexsha is None:
+        return None
+
+    dirpath_lwc_root = cfg['paths']['dirpath_lwc_root']
+    content = {key: value for (key, value) in cfg.items()
+               if key not in _VOLATILE_KEYS}
+    content['changed_files'] = sorted(
+                                os.path.relpath(filepath, dirpath_lwc_root)
+                                for filepath in cfg.get('changed_files', ()))
+
+    hasher = hashlib.sha256()
+    for part in (tree_hexsha,
+                 sys.version,
+                 json.dumps(content, sort_keys = True, default = str)):
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+# =============================================================================
+class ArtifactStore:
+    """
+    A store of build output directories, keyed by build_key().
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath, max_entries):
+        """
+        Return an initialised instance of the ArtifactStore class.
+
+        """
+        self.dirpath     = dirpath
+        self.max_entries = max_entries
+
+    # -------------------------------------------------------------------------
+    def link(self, key, dirpath_output):
+        """
+        Link dirpath_output to the stored outputs for key, if there are any.
+
+        """
+        dirpath_entry = self._dirpath(key)
+        if not os.path.isdir(dirpath_entry):
+            return False
+        _remove(dirpath_output)
+        da.util.ensure_dir_exists(os.path.dirname(dirpath_output))
+        os.symlink(dirpath_entry, dirpath_output)
+        os.utime(dirpath_entry, None)
+        return True
+
+    # -------------------------------------------------------------------------
+    def prepare(self, dirpath_output):
+        """
+        Make dirpath_output ready for a new build, which is not a cache hit.
+
+        Outputs from previous builds are removed
+        (if they are not stored, they are stale).
+
+        """
+        _remove(dirpath_output)
+        da.util.ensure_dir_exists(dirpath_output)
+
+    # -------------------------------------------------------------------------
+    def put(self, key, dirpath_output):
+        """
+        Move the outputs in dirpath_output into the store and link to them.
+
+        If the outputs for the same key have been
+        stored in the meantime (e.g. by a concurrent
+        build of the same tree) these are kept, and
+        the new outputs are discarded.
+
+        """
+        dirpath_entry = self._dirpath(key)
+        if not os.path.isdir(dirpath_entry):
+            da.util.ensure_dir_exists(os.path.dirname(dirpath_entry))
+            try:
+                os.rename(dirpath_output, dirpath_entry)
+            except OSError:
+                if not os.path.isdir(dirpath_entry):
+                    raise
+        self.link(key, dirpath_output)
+        self.prune()
+
+    # -------------------------------------------------------------------------
+    def prune(self):
+        """
+        Delete least recently used entries until the store is within bounds.
+
+        """
+        if not os.path.isdir(self.dirpath):
+            return
+        entries = []
+        for dirname_shard in os.listdir(self.dirpath):
+            dirpath_shard = os.path.join(self.dirpath, dirname_shard)
+            for dirname_entry in os.listdir(dirpath_shard):
+                dirpath_entry = os.path.join(dirpath_shard, dirname_entry)
+                try:
+                    entries.append((os.stat(dirpath_entry).st_mtime,
+                                    dirpath_entry))
+                except OSError:
+                    continue
+        num_excess = len(entries) - self.max_entries
+        for (_, dirpath_entry) in sorted(entries)[:max(num_excess, 0)]:
+            shutil.rmtree(dirpath_entry, ignore_errors = True)
+
+    # -------------------------------------------------------------------------
+    def _dirpath(self, key):
+        """
+        Return the directory path of the entry for the specified key.
+
+        """
+        return os.path.join(self.dirpath, key[:2], key)
+
+
+# -----------------------------------------------------------------------------
+def _remove(path):
+    """
+    Remove a file, symbolic link or directory tree, if it exists.
+
+    """
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
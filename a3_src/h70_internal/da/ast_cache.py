@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of parsed Python syntax trees and comment tokens.
+
+Every build parses every Python design document
+and specification, and several processing steps
+then walk the resulting syntax trees and tokenize
+the same source text again. Both the parse and
+the tokenization are deterministic functions of
+the source text, the module name and the version
+of the interpreter, so we cache the results on
+disk and reuse them whenever a file has not
+changed.
+
+Syntax trees are stored after they have been
+annotated by da.python_source.gen_ast_paths_depth_first
+so that the da_lineno_last annotation does not
+need to be recalculated either.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import ast
+import os
+import sys
+import tokenize
+
+import da.python_source
+import da.util.diskcache
+
+
+# -----------------------------------------------------------------------------
+def open_cache(cfg):
+    """
+    Return the AST cache, or None if it has not been enabled.
+
+    """
+    if not cfg['options'].get('enable_ast_cache', False):
+        return None
+    max_mb = cfg['options'].get('ast_cache_max_mb', 256)
+    return da.util.diskcache.DiskCache(
+                dirpath   = os.path.join(cfg['paths']['dirpath_meta_cache'],
+                                         'ast'),
+                max_bytes = max_mb * 1024 * 1024)
+
+
+# -----------------------------------------------------------------------------
+def parse(source_text, module_name, cache = None):
+    """
+    Return an annotated AST and a list of comment tokens for the source text.
+
+    If a cache is supplied, then results are loaded
+    from the cache where possible and stored in it
+    otherwise. SyntaxError exceptions are propagated
+    to the caller and nothing is cached for source
+    text that does not parse.
+
+    The comment token list is None if the source text
+    parses but cannot be tokenized.
+
+    """
+    if cache is not None:
+        key    = cache.key('ast',
+                           sys.version,
+                           module_name,
+                           source_text)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    root = ast.parse(source_text)
+    for _ in da.python_source.gen_ast_paths_depth_first(root, module_name):
+        pass
+    try:
+        comments = da.python_source.comment_tokens(source_text)
+    except (tokenize.TokenError, SyntaxError, ValueError):
+        comments = None
+    result = (root, comments)
+
+    if cache is not None:
+        cache.put(key, result)
+    return result
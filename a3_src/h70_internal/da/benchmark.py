@@ -0,0 +1,532 @@
+# -*- coding: utf-8 -*-
+"""
+Time-to-first-nonconformity benchmark for the build.
+
+One of the design goals of the build is to detect
+95% of nonconformities within the first 5 seconds
+of the build starting. This module measures how
+well we meet that goal.
+
+Each benchmark run takes a scratch copy of the
+source tree of the local working copy. For each
+trial, a fault from a catalogue of representative
+faults (a syntax error; a failing specification;
+a pylint violation; a schema violation and a
+complexity breach) is injected into a randomly
+chosen build unit; the build is run in-process,
+with the faulty files marked as changed, and the
+wall-clock time between the start of the build
+and the first call to BuildMonitor.report_nonconformity
+for the faulty files is recorded. The injected
+fault is reverted after each trial, so caches
+are warm, as they would be in a typical edit /
+build cycle.
+
+Trial records are appended to a jseq file so that
+the 95th percentile detection latency can be
+tracked across commits.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import collections
+import contextlib
+import datetime
+import json
+import math
+import os
+import random
+import shutil
+import time
+
+import da.lwc.discover
+import da.lwc.file
+import da.monitor
+import da.util
+
+
+_SYNTAX_ERROR = '''
+
+def benchmark_fault(:
+    pass
+'''
+
+_FAILING_SPEC = '''
+
+# =============================================================================
+class SpecifyBenchmarkFault:
+    """
+    Specify an injected benchmark fault.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_fails(self):
+        """
+        The injected specification always fails.
+
+        """
+        assert False
+'''
+
+_PYLINT_VIOLATION = '''
+
+# -----------------------------------------------------------------------------
+def benchmark_fault():
+    """
+    Return None, with an unused local variable.
+
+    """
+    unused = None
+'''
+
+_COMPLEXITY_BREACH = '''
+
+# -----------------------------------------------------------------------------
+def benchmark_fault(value):
+    """
+    Return value, with a McCabe complexity in excess of the limit.
+
+    """
+{branches}
+    return value
+'''.format(branches = '\n'.join(
+    '    if value == {idx}:\n        return {idx}'.format(idx = idx)
+    for idx in range(24)))
+
+
+# -----------------------------------------------------------------------------
+def _append_to_design(text):
+    """
+    Return a fault injector that appends text to the design document.
+
+    """
+    def inject(filepath_design, filepath_spec):        # pylint: disable=W0613
+        """
+        Append text to the design document.
+
+        """
+        with open(filepath_design, 'at') as file:
+            file.write(text)
+        return [filepath_design]
+    return inject
+
+
+# -----------------------------------------------------------------------------
+def _append_to_spec(text):
+    """
+    Return a fault injector that appends text to the specification.
+
+    """
+    def inject(filepath_design, filepath_spec):        # pylint: disable=W0613
+        """
+        Append text to the specification.
+
+        """
+        with open(filepath_spec, 'at') as file:
+            file.write(text)
+        return [filepath_spec]
+    return inject
+
+
+# -----------------------------------------------------------------------------
+def _rename_embedded_key(key):
+    """
+    Return a fault injector that misspells a key in the embedded module data.
+
+    """
+    def inject(filepath_design, filepath_spec):        # pylint: disable=W0613
+        """
+        Misspell a key in the design document's embedded data.
+
+        Return None if the key cannot be found.
+
+        """
+        with open(filepath_design, 'rt') as file:
+            text = file.read()
+        old = '\n{key}:\n'.format(key = key)
+        if old not in text:
+            return None
+        new = '\n{key}_benchmark_fault:\n'.format(key = key)
+        with open(filepath_design, 'wt') as file:
+            file.write(text.replace(old, new, 1))
+        return [filepath_design]
+    return inject
+
+
+# Each fault injector takes the paths of a design
+# document and its specification, modifies one or
+# both of them, and returns a list of the modified
+# files (or None if the fault does not apply).
+#
+FAULTS = collections.OrderedDict((
+    ('syntax_error',       _append_to_design(_SYNTAX_ERROR)),
+    ('failing_spec',       _append_to_spec(_FAILING_SPEC)),
+    ('pylint_violation',   _append_to_design(_PYLINT_VIOLATION)),
+    ('schema_violation',   _rename_embedded_key('validation_level')),
+    ('complexity_breach',  _append_to_design(_COMPLEXITY_BREACH))))
+
+
+# =============================================================================
+class _FaultDetected(Exception):
+    """
+    Raised to stop the build once the injected fault has been reported.
+
+    """
+
+
+# -----------------------------------------------------------------------------
+def run(dirpath_lwc_root,                               # pylint: disable=R0913
+        filepath_results,
+        num_trials  = 10,
+        seed        = None,
+        label       = None,
+        cfg_key     = 'default',
+        fault_names = None):
+    """
+    Run the benchmark and return a list of trial records.
+
+    Each trial record is also appended to the jseq
+    file at filepath_results as soon as the trial
+    is complete. The label (typically the short
+    hash of the commit under test) is included in
+    each record to allow results to be compared
+    across commits.
+
+    """
+    if fault_names is None:
+        fault_names = list(FAULTS)
+    rng             = random.Random(seed)
+    dirpath_scratch = os.path.join(
+                            da.lwc.discover.path(
+                                        key              = 'tmp',
+                                        dirpath_lwc_root = dirpath_lwc_root),
+                            'benchmark',
+                            'lwc')
+    _create_scratch_lwc(dirpath_lwc_root, dirpath_scratch)
+    units = sorted(_gen_candidate_units(dirpath_scratch))
+    if not units:
+        raise RuntimeError('No build units with specifications to benchmark.')
+
+    record_list = []
+    for idx_trial in range(num_trials):
+        fault_name = rng.choice(fault_names)
+        record     = _trial(dirpath_scratch = dirpath_scratch,
+                            cfg_key         = cfg_key,
+                            fault_name      = fault_name,
+                            units           = rng.sample(units, len(units)))
+        record.update({'label':     label,
+                       'seed':      seed,
+                       'trial':     idx_trial,
+                       'timestamp': datetime.datetime.utcnow().isoformat()})
+        _append_jseq(filepath_results, [record])
+        record_list.append(record)
+    return record_list
+
+
+# -----------------------------------------------------------------------------
+def inject_fault(fault_name, filepath_design, filepath_spec):
+    """
+    Inject the named fault, returning modified filepaths (or None if N/A).
+
+    """
+    return FAULTS[fault_name](filepath_design, filepath_spec)
+
+
+# -----------------------------------------------------------------------------
+def percentile(values, pct):
+    """
+    Return the nearest-rank percentile of the values (or None if empty).
+
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank    = int(math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[max(rank, 1) - 1]
+
+
+# -----------------------------------------------------------------------------
+def summarise(record_list, pct = 95, target_seconds = 5.0):
+    """
+    Return a summary of detection latency statistics for the trial records.
+
+    Faults that were never detected are treated as
+    having an infinite detection latency, so they
+    count against both the percentile latency and
+    the fraction of faults detected within the
+    target time.
+
+    """
+    latencies = [math.inf if record['latency'] is None
+                 else record['latency'] for record in record_list]
+    num_fast  = sum(1 for latency in latencies if latency <= target_seconds)
+    return {
+        'num_trials':      len(latencies),
+        'num_detected':    sum(1 for latency in latencies
+                                             if latency != math.inf),
+        'percentile':      pct,
+        'latency':         percentile(latencies, pct),
+        'target_seconds':  target_seconds,
+        'fraction_within': (float(num_fast) / len(latencies)
+                                                    if latencies else None)
+    }
+
+
+# -----------------------------------------------------------------------------
+def format_summary(summary):
+    """
+    Return a one line description of a summary returned by summarise().
+
+    The latency and the fraction within the target
+    are None if there were no trials; these are
+    shown as n/a. The latency is infinite if too
+    few faults were detected.
+
+    """
+    latency  = 'n/a'
+    fraction = 'n/a'
+    if summary['latency'] == math.inf:
+        latency  = 'inf'
+    elif summary['latency'] is not None:
+        latency  = '{latency:.2f}s'.format(latency = summary['latency'])
+    if summary['fraction_within'] is not None:
+        fraction = '{fraction:.0%}'.format(
+                                    fraction = summary['fraction_within'])
+    return ('{num_detected}/{num_trials} detected. '
+            'p{percentile} latency: {latency}. '
+            'Within {target_seconds:.0f}s: {fraction}.'.format(
+                                    num_detected   = summary['num_detected'],
+                                    num_trials     = summary['num_trials'],
+                                    percentile     = summary['percentile'],
+                                    latency        = latency,
+                                    target_seconds = summary['target_seconds'],
+                                    fraction       = fraction))
+
+
+# -----------------------------------------------------------------------------
+def _create_scratch_lwc(dirpath_lwc_root, dirpath_scratch):
+    """
+    Create a scratch copy of the source tree of the local working copy.
+
+    The scratch copy lives in the tmp directory, so
+    the 'heavyweight' env, cfg and dat directories
+    resolve to those of the outer working copy.
+
+    """
+    if os.path.isdir(dirpath_scratch):
+        shutil.rmtree(dirpath_scratch)
+    shutil.copytree(
+        da.lwc.discover.path(key = 'src', dirpath_lwc_root = dirpath_lwc_root),
+        da.lwc.discover.path(key = 'src', dirpath_lwc_root = dirpath_scratch),
+        ignore = shutil.ignore_patterns('__pycache__', '*.pyc'))
+
+
+# -----------------------------------------------------------------------------
+def _gen_candidate_units(dirpath_lwc_root):
+    """
+    Yield (design, spec) filepath pairs for python units with specifications.
+
+    """
+    for filepath in da.lwc.discover.gen_src_files(dirpath_lwc_root):
+        if not da.lwc.file.is_python_file(filepath):
+            continue
+        if not da.lwc.file.is_design_file(filepath):
+            continue
+        if da.lwc.file.is_experimental(filepath):
+            continue
+        filepath_spec = da.lwc.file.specification_filepath_for(filepath)
+        if os.path.isfile(filepath_spec):
+            yield (filepath, filepath_spec)
+
+
+# -----------------------------------------------------------------------------
+def _trial(dirpath_scratch, cfg_key, fault_name, units):
+    """
+    Inject a fault into the first unit to which it applies and time the build.
+
+    The original content of each modified file is
+    restored at the end of the trial.
+
+    """
+    for (filepath_design, filepath_spec) in units:
+        originals = {}
+        for filepath in (filepath_design, filepath_spec):
+            with open(filepath, 'rb') as file:
+                originals[filepath] = file.read()
+        try:
+            faulty = inject_fault(fault_name, filepath_design, filepath_spec)
+            if faulty is None:
+                continue
+            record = _timed_build(
+                        cfg = _benchmark_cfg(cfg_key, dirpath_scratch, faulty),
+                        filepath_list = faulty)
+            record.update({
+                'fault':   fault_name,
+                'relpath': os.path.relpath(filepath_design, dirpath_scratch)})
+            return record
+        finally:
+            for (filepath, content) in originals.items():
+                with open(filepath, 'wb') as file:
+                    file.write(content)
+    raise RuntimeError('Fault {name} does not apply to any unit.'.format(
+                                                        name = fault_name))
+
+
+# -----------------------------------------------------------------------------
+def _benchmark_cfg(cfg_key, dirpath_scratch, changed_files):
+    """
+    Return a build configuration for the scratch LWC.
+
+    The scratch LWC stands in for both the local
+    working copy and the isolated build copy, as
+    no version control operations are performed.
+
+    """
+    import da.bldcfg as _bldcfg
+    datetime_utc = datetime.datetime.utcnow()
+    cfg_extras   = {
+        'build_context': {
+            'pid':                  os.getpid(),
+            'outer_cmd':            'benchmark',
+            'cmd_args':             [],
+            'unmatched_args':       []
+        },
+        'timestamp': {
+            'datetime_utc':         datetime_utc
+        },
+        'options': {
+            'enable_cms_registration':  False
+        }
+    }
+    cfg = _bldcfg.load_cfg(cfg_key          = cfg_key,
+                           cfg_extras       = cfg_extras,
+                           dirpath_lwc_root = dirpath_scratch)
+
+    dirpath_branch_tmp = os.path.join(cfg['paths']['dirpath_meta_tmp'],
+                                      'benchmark')
+    cfg['paths']['dirpath_branch_cms']   = os.path.join(
+                                            cfg['paths']['dirpath_meta_cms'],
+                                            'benchmark')
+    cfg['paths']['dirpath_branch_tmp']   = dirpath_branch_tmp
+    cfg['paths']['dirpath_branch_log']   = os.path.join(dirpath_branch_tmp,
+                                                        'log')
+    cfg['paths']['dirpath_isolated_src'] = dirpath_scratch
+    cfg['changed_files']                 = list(changed_files)
+    cfg['safe_branch_name']              = 'benchmark'
+    cfg['defined_baseline']              = {
+        'commit_summary':   'Time-to-first-nonconformity benchmark',
+        'hexsha':           None,
+        'short_hexsha':     'benchmark'
+    }
+    cfg['build_id']       = 'benchmark.{utc}'.format(
+                                    utc = cfg['timestamp']['timestamp_utc'])
+    cfg['build_codename'] = cfg['build_id']
+    return cfg
+
+
+# -----------------------------------------------------------------------------
+def _timed_build(cfg, filepath_list):
+    """
+    Run the build in-process and return a record of the detection latency.
+
+    """
+    import da.build as _build
+    with _first_nonconformity_probe(filepath_list) as probe:
+        time_start = time.monotonic()
+        try:
+            _build.main(cfg = cfg)
+        except _FaultDetected:
+            pass
+        time_end = time.monotonic()
+
+    latency = None
+    if probe['time'] is not None:
+        latency = probe['time'] - time_start
+    return {'latency':       latency,
+            'duration':      time_end - time_start,
+            'nonconformity': probe['nonconformity'],
+            'num_other':     probe['num_other']}
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _first_nonconformity_probe(filepath_list):
+    """
+    Context manager to time the first report of a nonconformity in any file.
+
+    BuildMonitor.report_nonconformity is replaced
+    for the duration of the context. Reports for
+    other files (i.e. those not caused by the
+    injected fault) are counted and then ignored.
+    The first report for one of the specified
+    files is recorded and stops the build.
+
+    """
+    filepaths = set(os.path.normpath(path) for path in filepath_list)
+    probe     = {'time': None, 'nonconformity': None, 'num_other': 0}
+    original  = da.monitor.BuildMonitor.report_nonconformity
+
+    # -------------------------------------------------------------------------
+    def report_nonconformity(                           # pylint: disable=R0913
+                    self, tool, msg_id, msg, path, line = 1, col = 0):
+        """
+        Record the time of the first nonconformity in one of the files.
+
+        """
+        if os.path.normpath(path) not in filepaths:
+            probe['num_other'] += 1
+            return
+        if probe['time'] is None:
+            probe['time']          = time.monotonic()
+            probe['nonconformity'] = {'tool':   tool,
+                                      'msg_id': msg_id,
+                                      'msg':    msg,
+                                      'line':   line,
+                                      'col':    col}
+        raise _FaultDetected()
+
+    da.monitor.BuildMonitor.report_nonconformity = report_nonconformity
+    try:
+        yield probe
+    finally:
+        da.monitor.BuildMonitor.report_nonconformity = original
+
+
+# -----------------------------------------------------------------------------
+def _append_jseq(filepath, iterable):
+    """
+    Append a sequence of JSON objects to the specified file.
+
+    """
+    da.util.ensure_dir_exists(os.path.dirname(filepath))
+    with open(filepath, 'at') as file:
+        for item in iterable:
+            file.write('{line}\n'.format(
+                                    line = json.dumps(item, sort_keys = True)))
@@ -365,13 +365,14 @@ def _create_paths_record(cfg):
                                          key              = "cms",
                                          dirpath_lwc_root = dirpath_lwc_root)
 
-    cfg_name          = cfg['cfg_name']
-    dirpath_meta_tmp  = os.path.join(rootpath_tmp, cfg_name)
-    dirpath_meta_log  = os.path.join(dirpath_meta_tmp, 'log')
-    dirpath_meta_cms  = os.path.join(rootpath_cms,
-                                     cfg['timestamp']['iso_year_id'],
-                                     cfg['timestamp']['timebox_id'],
-                                     cfg_name)
+    cfg_name           = cfg['cfg_name']
+    dirpath_meta_tmp   = os.path.join(rootpath_tmp, cfg_name)
+    dirpath_meta_log   = os.path.join(dirpath_meta_tmp, 'log')
+    dirpath_meta_cache = os.path.join(dirpath_meta_tmp, 'cache')
+    dirpath_meta_cms   = os.path.join(rootpath_cms,
+                                      cfg['timestamp']['iso_year_id'],
+                                      cfg['timestamp']['timebox_id'],
+                                      cfg_name)
     return {
         'paths': {
             'dirpath_lwc_root':     dirpath_lwc_root,
@@ -380,6 +381,7 @@ def _create_paths_record(cfg):
             'rootpath_cms':         rootpath_cms,
             'dirpath_meta_tmp':     dirpath_meta_tmp,
             'dirpath_meta_log':     dirpath_meta_log,
+            'dirpath_meta_cache':   dirpath_meta_cache,
             'dirpath_meta_cms':     dirpath_meta_cms
         }
     }
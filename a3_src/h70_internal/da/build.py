@@ -56,39 +56,47 @@ license:
 """
 
 
-import ast
 import contextlib
+import copy
 import datetime
 import json
 import logging
+import multiprocessing
 import os
+import sys
+import time
 
+import da.ast_cache
 import da.bldcfg
-import da.check.bulk_data
+import da.build_step
+import da.build_unit
 import da.check.constants
-import da.check.dependencies
-import da.check.pycodestyle
-import da.check.pycomplexity
-import da.check.pydocstyle
-import da.check.pylint
-import da.check.pytest
-import da.check.pytype
-import da.check.schema
+import da.check.result_cache
 import da.cms
-import da.compile.clang
-import da.compile.gcc
 import da.constants
 import da.dep
-import da.docgen.design
 import da.exception
+import da.import_graph
 import da.index
+import da.index_spill
+import da.index_store
 import da.log
 import da.lwc
+import da.lwc.discover
 import da.lwc.file
 import da.monitor
+import da.monitor.step_timing
+import da.prioritisation
 import da.team
 
 
+# Priority tier for unchanged files which do not
+# import any changed files. These are processed
+# after the files in every other tier.
+#
+_TIER_UNCHANGED = sys.maxsize
+
+
 # -----------------------------------------------------------------------------
 @da.log.trace
 def main(cfg):
@@ -161,13 +169,28 @@ def main(cfg):
     _log_build_configuration(cfg)
     build_monitor = da.monitor.BuildMonitor(cfg)
 
+    # Keep the persistent caches within their size bounds.
+    for cache in (da.check.result_cache.open_cache(cfg),
+                  da.ast_cache.open_cache(cfg)):
+        if cache is not None:
+            cache.prune()
+
     # First build phase -- process individual build units / design documents.
-    build_inputs    = _sequence_build_inputs(cfg, build_monitor)
-    unit_processing = _unit_processing(cfg, build_monitor)
-    build_data      = None
-    for unit in build_inputs:
-        build_monitor.report_progress(unit)
-        build_data = unit_processing.send(unit)
+    num_workers = _num_build_workers(cfg)
+    if num_workers > 1:
+        build_data = _parallel_unit_processing(cfg, build_monitor, num_workers)
+    else:
+        with _slow_lane_context(cfg, build_monitor) as slow_lane:
+            build_inputs    = _sequence_build_inputs(cfg, build_monitor)
+            unit_processing = _unit_processing(cfg,
+                                               build_monitor,
+                                               build_monitor.step_timer,
+                                               slow_lane)
+            build_data      = None
+            for unit in build_inputs:
+                build_monitor.report_progress(unit)
+                build_data = unit_processing.send(unit)
+                _merge_slow_lane_results(slow_lane, build_monitor)
 
     # Second build phase -- process the design as an integrated whole.
     _integrated_processing(cfg, build_monitor, build_data)
@@ -177,6 +200,453 @@ def main(cfg):
     return da.constants.BUILD_COMPLETED
 
 
+# -----------------------------------------------------------------------------
+def _num_build_workers(cfg):
+    """
+    Return the number of worker processes to use for the first build phase.
+
+    A value of zero in the configuration is taken
+    to mean one worker per available CPU. A value
+    of one (the default) gives the original serial,
+    single process behaviour.
+
+    ---
+    type: function
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+    returns:
+        num_workers:    The number of worker processes to use.
+    ...
+
+    """
+    num_workers = cfg['options'].get('build_worker_count', 1)
+    if not num_workers:
+        num_workers = multiprocessing.cpu_count()
+    return max(1, num_workers)
+
+
+# -----------------------------------------------------------------------------
+def _parallel_unit_processing(cfg, build_monitor, num_workers):
+    """
+    Process build units in a pool of worker processes and return build data.
+
+    Design document filepaths are sequenced in
+    the parent process and fanned out to a pool
+    of workers, each of which loads the build
+    unit and runs the same chain of processing
+    coroutines as the serial build.
+
+    Nonconformities are recorded in each worker
+    and replayed into the parent build_monitor,
+    together with progress reports, in the same
+    priority order in which the filepaths were
+    sequenced. The "95% of nonconformities in
+    5 seconds" design goal is therefore served
+    by the parallel build in the same way as it
+    is by the serial build; the Jidoka (fail-
+    fast) response is also preserved, as the
+    pool is terminated as soon as the parent
+    build_monitor aborts the build.
+
+    Index fragments for each build unit are sent
+    back to the parent and merged into a single
+    set of indices, which is spilled to disk if it
+    grows larger than the memory budget. If the
+    incremental index is enabled, the parent
+    instead updates the index store with each
+    fragment, and workers do not index units whose
+    content has not changed since they were last
+    indexed. Step timing records are also sent
+    back to the parent, if step timing is enabled.
+
+    The filepath sequence is consumed eagerly
+    because the pool iterates over its input in
+    a separate thread, and we do not want any
+    nonconformities found during sequencing to
+    be reported from anywhere other than the
+    main thread.
+
+    ---
+    type: function
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        build_monitor:  A reference to the build monitoring and
+                        progress reporting coroutine.
+
+        num_workers:    The number of worker processes to use.
+
+    returns:
+        build_data:     A mapping holding build data accumulated
+                        during the unit processing phase (e.g.
+                        index data for reports and traceability).
+    ...
+
+    """
+    filepath_list = list(_sequence_build_filepaths(cfg, build_monitor))
+    index_merger  = None
+    index_store   = None
+    index_digests = None
+    build_data    = None
+    if cfg['steps']['enable_static_indexing']:
+        index_store = da.index_store.open_store(cfg)
+    if index_store is not None:
+        index_digests = index_store.digests
+    else:
+        index_merger  = da.index.merge_coro(da.index_spill.open_index(cfg))
+    with multiprocessing.Pool(processes   = num_workers,
+                              initializer = _init_unit_worker,
+                              initargs    = (cfg, index_digests)) as pool:
+
+        for (filepath,
+             relpath,
+             nonconformity_list,
+             index_digest,
+             index_fragment,
+             timing_list,
+             seconds) in pool.imap(_process_unit_in_worker,
+                                   filepath_list,
+                                   chunksize = 1):
+
+            build_monitor.report_progress({'filepath': filepath,
+                                           'relpath':  relpath,
+                                           'seconds':  seconds})
+            if build_monitor.step_timer is not None:
+                for timing in timing_list:
+                    build_monitor.step_timer.record(timing)
+            for nonconformity in nonconformity_list:
+                build_monitor.report_nonconformity(**nonconformity)
+            if index_store is not None:
+                index_store.update(relpath, index_digest, index_fragment)
+                build_data = index_store
+            elif index_fragment is not None:
+                build_data = index_merger.send(index_fragment)
+
+    return build_data
+
+
+# Per-process state for build unit worker processes.
+# This is populated by _init_unit_worker() when each
+# worker in the pool is started.
+#
+_UNIT_WORKER = {}
+
+
+# -----------------------------------------------------------------------------
+def _init_unit_worker(cfg, index_digests = None):
+    """
+    Initialise the unit processing coroutine chain in a worker process.
+
+    Indexing is disabled in the worker's coroutine
+    chain: each worker instead sends back a fresh
+    index fragment for each unit, which the parent
+    process merges.
+
+    ---
+    type: function
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        index_digests:  A mapping from relpath to the content
+                        digest of each unit in the index store,
+                        or None if the incremental index is not
+                        enabled.
+
+    ...
+
+    """
+    cfg_worker = copy.deepcopy(cfg)
+    cfg_worker['steps']['enable_static_indexing'] = False
+    recorder   = da.monitor.NonconformityRecorder()
+    step_timer = None
+    if cfg['options'].get('enable_step_timing', False):
+        step_timer = da.monitor.step_timing.StepTimer()
+    _UNIT_WORKER['cfg']             = cfg
+    _UNIT_WORKER['index_digests']   = index_digests
+    _UNIT_WORKER['build_monitor']   = recorder
+    _UNIT_WORKER['step_timer']      = step_timer
+    _UNIT_WORKER['unit_processing'] = _unit_processing(cfg_worker,
+                                                       recorder,
+                                                       step_timer)
+
+
+# -----------------------------------------------------------------------------
+def _process_unit_in_worker(filepath):
+    """
+    Load and process a single build unit in a worker process.
+
+    ---
+    type: function
+
+    args:
+        filepath:       A design document filepath.
+
+    returns:
+        result:         A tuple containing the design document
+                        filepath; its relative path; the list
+                        of nonconformities recorded whilst it
+                        was being processed; the content
+                        digest of the unit and its index
+                        fragment (both None if indexing is not
+                        enabled; the fragment is also None if
+                        the unit is unchanged in the index
+                        store); the list of step timing
+                        records (empty if step timing is not
+                        enabled) and the wall clock time taken
+                        to process the unit, in seconds.
+    ...
+
+    """
+    cfg             = _UNIT_WORKER['cfg']
+    build_monitor   = _UNIT_WORKER['build_monitor']
+    step_timer      = _UNIT_WORKER['step_timer']
+    unit_processing = _UNIT_WORKER['unit_processing']
+    index_digests   = _UNIT_WORKER['index_digests']
+    index_digest    = None
+    index_fragment  = None
+    timing_list     = []
+    time_start      = time.monotonic()
+
+    with _load_design_doc(cfg, filepath, build_monitor) as part_loaded:
+        with _load_supporting_docs(
+                        cfg, part_loaded, build_monitor) as build_unit:
+
+            unit_processing.send(build_unit)
+            relpath = build_unit['relpath']
+            if cfg['steps']['enable_static_indexing']:
+                dirpath_src  = cfg['paths']['dirpath_isolated_src']
+                index_digest = da.index_store.unit_digest(build_unit)
+                if (index_digests is None
+                        or index_digests.get(relpath, None) != index_digest):
+                    index_fragment = da.index.index_fragment(
+                                            dirpath_lwc_root = dirpath_src,
+                                            build_unit       = build_unit)
+
+    if step_timer is not None:
+        timing_list = step_timer.drain()
+    return (filepath,
+            relpath,
+            build_monitor.drain(),
+            index_digest,
+            index_fragment,
+            timing_list,
+            time.monotonic() - time_start)
+
+
+# The slow lane is polled at this interval whilst
+# waiting for outstanding jobs at the end of the
+# first build phase, so that a nonconformity from
+# any job can abort the build promptly.
+#
+_SLOW_LANE_POLL_SECONDS = 0.05
+
+# Slow static checks that may be run in the slow lane.
+#
+_SLOW_LANE_STEPS = ('pylint', 'pytype')
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _slow_lane_context(cfg, build_monitor):
+    """
+    Manage a pool of worker processes that run the slowest static checks.
+
+    Pylint and MyPy are by far the slowest of the
+    unit processing steps, so when the slow lane is
+    enabled they are queued to a background pool of
+    worker processes rather than being run inline.
+    The remaining (fast) steps for the next build
+    unit can then start straight away.
+
+    Nonconformities from completed slow lane jobs are
+    merged into the build_monitor (in the main thread)
+    by _merge_slow_lane_results(), which is called
+    after each build unit, and then repeatedly at the
+    end of the first build phase until all jobs have
+    completed. In Jidoka (fail-fast) mode the build
+    therefore aborts at the first merge after a slow
+    lane job finds a nonconformity, and the pool is
+    terminated on the way out of this context.
+
+    ---
+    type: context_manager
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        build_monitor:  A reference to the build monitoring and
+                        progress reporting coroutine.
+
+    yields:
+        slow_lane:      A mapping holding the worker pool and the
+                        list of outstanding jobs, or None if the
+                        slow lane is not enabled.
+    ...
+
+    """
+    num_workers = cfg['options'].get('slow_lane_worker_count', 0)
+    if num_workers < 1:
+        yield None
+        return
+
+    with multiprocessing.Pool(processes   = num_workers,
+                              initializer = _init_slow_lane_worker,
+                              initargs    = (cfg,)) as pool:
+        slow_lane = {'pool': pool, 'pending': []}
+        yield slow_lane
+        _merge_slow_lane_results(slow_lane, build_monitor, wait = True)
+
+
+# -----------------------------------------------------------------------------
+@da.util.coroutine
+def _slow_lane_submitter(slow_lane, step_id):
+    """
+    Queue a slow lane job for each build unit received.
+
+    Only those parts of the build unit that the
+    slow checks (and the step result cache) use
+    are sent to the worker process.
+
+    ---
+    type: coroutine
+
+    args:
+        slow_lane:      A mapping holding the worker pool and the
+                        list of outstanding jobs.
+
+        step_id:        The id of the slow check to run.
+
+    ...
+
+    """
+    while True:
+        build_unit = (yield)
+        job_unit   = {key: build_unit[key] for key in ('filepath',
+                                                       'relpath',
+                                                       'dirpath_log')}
+        job_unit['bytes'] = bytes(build_unit['bytes'])
+        if 'spec' in build_unit:
+            job_unit['spec'] = {
+                            'filepath': build_unit['spec']['filepath'],
+                            'bytes':    bytes(build_unit['spec']['bytes'])}
+        slow_lane['pending'].append(slow_lane['pool'].apply_async(
+                                                    _run_slow_lane_job,
+                                                    (step_id, job_unit)))
+
+
+# -----------------------------------------------------------------------------
+def _merge_slow_lane_results(slow_lane, build_monitor, wait = False):
+    """
+    Replay results from completed slow lane jobs into the build_monitor.
+
+    Results are replayed in order of completion.
+    If wait is True, this function does not return
+    until every outstanding job has completed.
+
+    ---
+    type: function
+
+    args:
+        slow_lane:      A mapping holding the worker pool and the
+                        list of outstanding jobs, or None if the
+                        slow lane is not enabled.
+
+        build_monitor:  A reference to the build monitoring and
+                        progress reporting coroutine.
+
+        wait:           Set True to wait for all outstanding jobs.
+
+    ...
+
+    """
+    if slow_lane is None:
+        return
+
+    pending = slow_lane['pending']
+    while pending:
+        ready = [job for job in pending if job.ready()]
+        for job in ready:
+            pending.remove(job)
+            (nonconformity_list, timing_list) = job.get()
+            if build_monitor.step_timer is not None:
+                for timing in timing_list:
+                    build_monitor.step_timer.record(timing)
+            for nonconformity in nonconformity_list:
+                build_monitor.report_nonconformity(**nonconformity)
+        if not wait:
+            return
+        if not ready:
+            pending[0].wait(_SLOW_LANE_POLL_SECONDS)
+
+
+# Per-process state for slow lane worker processes.
+# This is populated by _init_slow_lane_worker() when
+# each worker in the pool is started.
+#
+_SLOW_LANE_WORKER = {}
+
+
+# -----------------------------------------------------------------------------
+def _init_slow_lane_worker(cfg):
+    """
+    Initialise the slow check coroutines in a slow lane worker process.
+
+    ---
+    type: function
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+    ...
+
+    """
+    recorder   = da.monitor.NonconformityRecorder()
+    step_timer = None
+    if cfg['options'].get('enable_step_timing', False):
+        step_timer = da.monitor.step_timing.StepTimer()
+    checkers   = da.build_step.coroutines(cfg,
+                                          recorder,
+                                          step_timer = step_timer,
+                                          step_ids   = _SLOW_LANE_STEPS)
+    _SLOW_LANE_WORKER['build_monitor'] = recorder
+    _SLOW_LANE_WORKER['step_timer']    = step_timer
+    _SLOW_LANE_WORKER['checkers']      = checkers
+
+
+# -----------------------------------------------------------------------------
+def _run_slow_lane_job(step_id, build_unit):
+    """
+    Run a single slow check on a single build unit in a worker process.
+
+    ---
+    type: function
+
+    args:
+        step_id:        The id of the slow check to run.
+
+        build_unit:     The parts of the build unit used by the
+                        slow check.
+
+    returns:
+        result:         A tuple containing the list of
+                        nonconformities recorded by the check
+                        and the list of step timing records
+                        (empty if step timing is not enabled).
+    ...
+
+    """
+    step_timer = _SLOW_LANE_WORKER['step_timer']
+    _SLOW_LANE_WORKER['checkers'][step_id].send(build_unit)
+    timing_list = []
+    if step_timer is not None:
+        timing_list = step_timer.drain()
+    return (_SLOW_LANE_WORKER['build_monitor'].drain(), timing_list)
+
+
 # -----------------------------------------------------------------------------
 def _log_build_configuration(cfg):
     """
@@ -299,10 +769,7 @@ def _sequence_build_inputs(cfg, build_monitor):
     ...
 
     """
-    iter_prioritised = _gen_prioritised_filepaths(cfg)
-    iter_normalised  = _normalise_filepaths(iter_prioritised, build_monitor)
-    iter_restricted  = _restrict_filepaths(cfg, iter_normalised)
-    for filepath_design_doc in iter_restricted:
+    for filepath_design_doc in _sequence_build_filepaths(cfg, build_monitor):
 
         with _load_design_doc(
                 cfg, filepath_design_doc, build_monitor) as part_loaded:
@@ -313,10 +780,52 @@ def _sequence_build_inputs(cfg, build_monitor):
                 yield build_unit
 
 
+# -----------------------------------------------------------------------------
+def _sequence_build_filepaths(cfg, build_monitor):
+    """
+    Return an iterator over filtered and prioritised design document filepaths.
+
+    This is the part of the build input sequencing
+    that does not require any files to be opened,
+    so it can be shared between the serial build
+    and the parallel build, where units are loaded
+    by the worker processes themselves.
+
+    ---
+    type: function
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        build_monitor:  A reference to the build monitoring and
+                        progress reporting coroutine.
+
+    returns:
+        iter_filepaths: An iterator yielding one design document
+                        filepath for each build unit, in priority
+                        order.
+    ...
+
+    """
+    iter_prioritised = _gen_prioritised_filepaths(cfg)
+    iter_ranked      = _rank_filepaths(cfg, iter_prioritised)
+    iter_normalised  = _normalise_filepaths(iter_ranked, build_monitor)
+    iter_restricted  = _restrict_filepaths(cfg, iter_normalised)
+    return iter_restricted
+
+
 # -----------------------------------------------------------------------------
 def _gen_prioritised_filepaths(cfg):
     """
-    Yield a sequence of candidate build input filepaths in priority order.
+    Yield a sequence of candidate build input filepaths in priority tiers.
+
+    Each filepath is tagged with a priority tier.
+    Changed files are in tier zero; files which
+    import changed files are in tiers numbered by
+    their import distance from the nearest changed
+    file; all other files are in the final tier.
+    Tiers are yielded in order, and filepaths within
+    each tier may be reordered by _rank_filepaths().
 
     ---
     type: generator
@@ -325,7 +834,8 @@ def _gen_prioritised_filepaths(cfg):
         cfg:            A mapping holding the build configuration.
 
     yields:
-        filepath:       A filepath string pointing to a file in the
+        tier_filepath:  A tuple containing the priority tier and a
+                        filepath string pointing to a file in the
                         build isolation area (isolated_src).
     ...
 
@@ -341,7 +851,7 @@ def _gen_prioritised_filepaths(cfg):
 
     for filepath in changed_files:
         if not os.path.isdir(filepath):
-            yield filepath
+            yield (0, filepath)
 
     # build_date = datetime.datetime.strptime(cfg['timestamp']['datetime_utc'],
     #                                         da.bldcfg.DATEFMT_DATETIME_UTC)
@@ -351,12 +861,116 @@ def _gen_prioritised_filepaths(cfg):
     #                     dirpath_root = dirpath_lwc_root):
     #     yield lwc_path.replace(dirpath_lwc_root, dirpath_isolated_src)
 
+    # Files which import changed files, directly
+    # or indirectly, ordered by import distance.
     if check_changed_files_only:
+        if cfg['options'].get('check_import_dependents', False):
+            for tier_filepath in _gen_import_dependents(cfg, changed_files):
+                yield tier_filepath
         return
 
     changed_files = set(changed_files)
     for filepath in da.lwc.discover.gen_src_files(dirpath_isolated_src):
         if filepath not in changed_files:
+            yield (_TIER_UNCHANGED, filepath)
+
+
+# -----------------------------------------------------------------------------
+def _gen_import_dependents(cfg, changed_files):
+    """
+    Yield filepaths of files that import any of the changed files.
+
+    The reverse dependency closure of the changed
+    files in the static import graph is yielded,
+    nearest dependents first, each tagged with its
+    import distance as the priority tier.
+
+    ---
+    type: generator
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        changed_files:  A list of changed filepaths in the build
+                        isolation area (isolated_src).
+
+    yields:
+        tier_filepath:  A tuple containing the priority tier and a
+                        filepath string pointing to a file in the
+                        build isolation area (isolated_src).
+    ...
+
+    """
+    dirpath_isolated_src = cfg['paths']['dirpath_isolated_src']
+    dirpath_src          = da.lwc.discover.path(
+                                    key              = 'src',
+                                    dirpath_lwc_root = dirpath_isolated_src)
+    graph                = da.import_graph.open_graph(cfg)
+    relpath_list = [os.path.relpath(filepath, dirpath_src)
+                                    for filepath in changed_files]
+    for (distance, relpath) in da.import_graph.dependents(graph, relpath_list):
+        yield (distance, os.path.join(dirpath_src, relpath))
+
+
+# -----------------------------------------------------------------------------
+def _rank_filepaths(cfg, iter_tiered):
+    """
+    Yield filepaths ranked by assessed risk of nonconformity within each tier.
+
+    If risk-based prioritisation is enabled, the
+    filepaths within each priority tier are sorted
+    by the expected number of nonconformities found
+    per second of processing time, as estimated from
+    the statistics gathered in previous builds.
+    Otherwise filepaths are yielded in the order in
+    which they were supplied.
+
+    Supporting documents are ranked using the
+    statistics for the design document that they
+    support.
+
+    ---
+    type: generator
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        iter_tiered:    An iterable yielding a sequence of tuples
+                        containing a priority tier and a filepath.
+
+    yields:
+        filepath:       A filepath string pointing to a file in the
+                        build isolation area (isolated_src).
+    ...
+
+    """
+    if not cfg['options'].get('enable_risk_prioritisation', False):
+        for (_, filepath) in iter_tiered:
+            yield filepath
+        return
+
+    dirpath_isolated_src = cfg['paths']['dirpath_isolated_src']
+    risk_model           = da.prioritisation.RiskModel(
+                                    da.prioritisation.statistics_filepath(cfg))
+    by_relpath           = {}
+
+    def _gen_unit_relpaths():
+        """
+        Yield (tier, relpath) for each build unit, recording its filepaths.
+
+        """
+        for (tier, filepath) in iter_tiered:
+            filepath_design = filepath
+            if da.lwc.file.is_specification_file(filepath):
+                filepath_design = da.lwc.file.design_filepath_for(filepath)
+            relpath = os.path.relpath(filepath_design, dirpath_isolated_src)
+            is_new  = relpath not in by_relpath
+            by_relpath.setdefault(relpath, []).append(filepath)
+            if is_new:
+                yield (tier, relpath)
+
+    for (_, relpath) in risk_model.rank(_gen_unit_relpaths()):
+        for filepath in by_relpath.pop(relpath, ()):
             yield filepath
 
 
@@ -520,37 +1134,37 @@ def _load_design_doc(cfg, filepath, build_monitor):
     ...
 
     """
-    rootpath_log = cfg['paths']['dirpath_branch_log']
+    rootpath_log            = cfg['paths']['dirpath_branch_log']
+    relpath                 = os.path.relpath(
+                                        filepath,
+                                        cfg['paths']['dirpath_isolated_src'])
+    (relpath_dir, filename) = os.path.split(relpath)
+    dirpath_log             = os.path.join(rootpath_log,
+                                           relpath_dir,
+                                           filename.replace('.', '_'))
 
-    # TODO: If possible (python >= 3.2) use tokenize.open to open
-    #       files, so PEP 263 encoding markers are interpreted.
-    #       We will need to go through and update all the processes
-    #       that make use of the file handle though ...
+    # TODO: Interpret PEP 263 encoding markers
+    #       when decoding Python source files.
     #
-    with open(filepath, 'rb') as file:
-        content       = file.read().decode('utf-8')
-        relpath       = os.path.relpath(filepath,
-                                        cfg['paths']['dirpath_isolated_src'])
-        (relpath_dir, filename) = os.path.split(relpath)
-        dirpath_log             = os.path.join(
-                                            rootpath_log,
-                                            relpath_dir,
-                                            filename.replace('.', '_'))
-        build_unit = {
-            'filepath':     filepath,
-            'relpath':      relpath,
-            'file':         file,
-            'content':      content,
-            'dirpath_log':  dirpath_log
-        }
-
-        # Add build_unit['ast'] if file parses OK...
-        build_unit = _try_parse(build_unit, build_monitor)
-
-        # Yield with open filepath...
-        yield build_unit
+    build_unit = da.build_unit.BuildUnit(
+                                filepath      = filepath,
+                                relpath       = relpath,
+                                dirpath_log   = dirpath_log,
+                                build_monitor = build_monitor,
+                                ast_cache     = da.ast_cache.open_cache(cfg))
+
+    # Python files are parsed straight away so that
+    # syntax errors are reported as early as possible,
+    # before any of the processing steps are run.
+    # Other files are not decoded until they are
+    # needed.
+    #
+    build_unit.parse()
 
-    return
+    try:
+        yield build_unit
+    finally:
+        build_unit.close()
 
 
 # -----------------------------------------------------------------------------
@@ -587,101 +1201,24 @@ def _load_supporting_docs(cfg, build_unit, build_monitor):
                              and os.path.isfile(filepath_spec))
 
     if has_supporting_docs:
-        with open(filepath_spec, 'rb') as file:
-            content = file.read().decode('utf-8')
-            build_unit['spec'] = {
-                'filepath': filepath_spec,
-                'relpath':  os.path.relpath(
+        build_unit['spec'] = da.build_unit.BuildUnit(
+                                filepath      = filepath_spec,
+                                relpath       = os.path.relpath(
                                         filepath_spec,
                                         cfg['paths']['dirpath_isolated_src']),
-                'file':     file,
-                'content':  content
-            }
+                                build_monitor = build_monitor,
+                                ast_cache     = da.ast_cache.open_cache(cfg))
+        build_unit['spec'].parse()
 
-            # Add build_unit['spec']['ast'] if file parses OK...
-            build_unit['spec'] = _try_parse(build_unit['spec'], build_monitor)
-
-            # Yield with open filepath_spec...
-            yield build_unit
-
-    else:
-
-        yield build_unit
-
-    return
-
-
-# -----------------------------------------------------------------------------
-def _try_parse(build_unit_part, build_monitor):
-    """
-    Return build_unit_part with added 'ast' field, else report a nonconformity.
-
-    This function attempts to parse the file specified
-    by build_unit_part['filepath']. If it is successful,
-    it stores the resulting AST in build_unit_part['ast'].
-    If it is not successful, it reports a nonconformity
-    via the supplied build_monitor reference. In either
-    case, a reference to the supplied build_unit_part
-    dict is returned.
-
-    The build_unit_part can either be a reference to
-    an entire build_unit structure or a reference to
-    the build_unit['spec'] part.
-
-    ---
-    type: function
-
-    args:
-
-        build_unit_part:    Either a reference to an entire
-                            build_unit struct, or a reference
-                            to the build_unit['spec'] part.
-
-        build_monitor:      A reference to the build monitoring and
-                            progress reporting coroutine.
-
-    returns:
-
-        build_unit_part:    Either a reference to an entire
-                            build_unit struct, or a reference
-                            to the build_unit['spec'] part.
-    ...
-
-    """
-    filepath = build_unit_part['filepath']
-    if da.lwc.file.is_python_file(filepath):
-
-        try:
-
-            build_unit_part['ast'] = ast.parse(build_unit_part['content'])
-
-        except SyntaxError as err:
-
-            # Draw a caret under the error location
-            # so it is easy for the user to spot
-            # where the error is.
-            #
-            idx_newline = str(err.text)[0:int(err.offset)].rfind('\n')
-            col = err.offset - (idx_newline + 1)
-            location_indicator = (' ' * col) + '^'
-            msg = 'Syntax error:\n{msg}\n{loc}'.format(
-                                            msg = err.text,
-                                            loc = location_indicator)
-
-            build_monitor.report_nonconformity(
-                tool   = 'da.build',
-                msg_id = da.check.constants.BUILD_SPEC_SYNTAX_ERROR,
-                msg    = msg,
-                path   = filepath,
-                line   = err.lineno,
-                col    = col)
-
-    return build_unit_part
+    yield build_unit
 
 
 # -----------------------------------------------------------------------------
 @da.util.coroutine
-def _unit_processing(cfg, build_monitor):               # pylint: disable=R0912
+def _unit_processing(cfg,
+                     build_monitor,
+                     step_timer = None,
+                     slow_lane  = None):
     """
     Recieve and process individual build units.
 
@@ -690,13 +1227,17 @@ def _unit_processing(cfg, build_monitor):               # pylint: disable=R0912
     configuration and sequencing of those processing
     steps which are applied to individual build
     units. The processing steps themselves are
-    implemented as a set of subsidiary coroutines.
+    implemented as a set of subsidiary coroutines,
+    which are registered in da.build_step.
 
-    Pylint rule R0912 (too many branches) is disabled
-    for this function because the use of if statements
-    to apply configuration values feels justified
-    and legible and I do not believe that it poses
-    any obstacle to either maintenance or test.
+    If a step_timer is supplied, each processing
+    step coroutine is wrapped so that the time
+    taken by each step for each unit is recorded.
+
+    If a slow_lane is supplied, the slowest static
+    checks are queued to it rather than being run
+    inline, and their step timings are recorded
+    by the slow lane worker processes instead.
 
     ---
     type: coroutine
@@ -707,6 +1248,13 @@ def _unit_processing(cfg, build_monitor):               # pylint: disable=R0912
         build_monitor:  A reference to the build monitoring and
                         progress reporting coroutine.
 
+        step_timer:     A da.monitor.step_timing.StepTimer, or
+                        None if step timing is not enabled.
+
+        slow_lane:      A mapping holding the slow lane worker
+                        pool and list of outstanding jobs, or
+                        None if the slow lane is not enabled.
+
     yields:
         build_data:     A mapping holding build data accumulated
                         during the preceeding unit processing
@@ -715,92 +1263,34 @@ def _unit_processing(cfg, build_monitor):               # pylint: disable=R0912
     ...
 
     """
-    dirpath_src = cfg['paths']['dirpath_isolated_src']
-    steps       = cfg['steps']
-
-    chk_pytest  = da.check.pytest.coro(
-                                    dirpath_src      = dirpath_src,
-                                    build_monitor    = build_monitor)
-
-    chk_pylint  = da.check.pylint.coro(
-                                    dirpath_lwc_root = dirpath_src,
-                                    build_monitor    = build_monitor)
-
-    chk_pytype  = da.check.pytype.coro(
-                                    dirpath_lwc_root = dirpath_src,
-                                    build_monitor    = build_monitor)
-
-    indexer     = da.index.index_coro(
-                                    dirpath_lwc_root = dirpath_src)
-
-    chk_deps    = da.check.dependencies.coro(
-                                    dirpath_lwc_root = dirpath_src,
-                                    build_monitor    = build_monitor)
-
-    bld_clang   = da.compile.clang.coro(build_monitor)
-    bld_gcc     = da.compile.gcc.coro(build_monitor)
-    chk_complex = da.check.pycomplexity.coro(build_monitor)
-    chk_data    = da.check.schema.coro(build_monitor)
-    chk_pycode  = da.check.pycodestyle.coro(build_monitor)
-    chk_pydoc   = da.check.pydocstyle.coro(build_monitor)
-    doc_design  = da.docgen.design.coro(cfg)
+    # The slowest static checks are queued to
+    # the slow lane, if there is one, rather
+    # than being run inline. The slow lane
+    # worker processes import their modules.
+    overrides = {}
+    if slow_lane is not None:
+        overrides = {step_id: _slow_lane_submitter(slow_lane, step_id)
+                     for step_id in _SLOW_LANE_STEPS}
+
+    # Modules are imported and coroutines are
+    # constructed only for enabled steps (see
+    # da.build_step for the processing order).
+    steps = da.build_step.coroutines(cfg,
+                                     build_monitor,
+                                     step_timer = step_timer,
+                                     overrides  = overrides)
 
     report_data = None
     while True:
 
-        build_unit = (yield report_data)
-
-        # We run unit tests first to make the
-        # test-modify-test loop as tight as
-        # possible.
-        if steps['enable_test_python_unittest']:
-            chk_pytest.send(build_unit)
-
-        if steps['enable_static_test_python_complexity']:
-            chk_complex.send(build_unit)
-
-        if steps['enable_static_test_python_codestyle']:
-            chk_pycode.send(build_unit)
-
-        if steps['enable_static_test_python_docstyle']:
-            chk_pydoc.send(build_unit)
-
-        # Pylint static analysis and MyPy type
-        # checking are the slowest python-specific
-        # steps, so we leave them until after the
-        # other python-specific stuff.
-        if steps['enable_static_test_python_pylint']:
-            chk_pylint.send(build_unit)
-
-        if steps['enable_static_test_python_typecheck']:
-            chk_pytype.send(build_unit)
-
-        # C/C++ compilation with gcc.
-        if steps['enable_compile_gcc']:
-            bld_gcc.send(build_unit)
-
-        # C/C++ compilation with clang.
-        if steps['enable_compile_clang']:
-            bld_clang.send(build_unit)
-
-        # Generate design documentation.
-        if steps['enable_generate_design_docs']:
-            doc_design.send(build_unit)
-
-        # Data validation has to come before
-        # indexing -- perhaps both should be
-        # enabled together?
-        if steps['enable_static_data_validation']:
-            chk_data.send(build_unit)
-
-        # Static indexing... early or late?
-        # TODO: Consider switching this on/off with reporting??
-        if steps['enable_static_indexing']:
-            report_data = indexer.send(build_unit)
-        else:
-            report_data = None
+        build_unit  = (yield report_data)
+        report_data = None
+        for (step_id, step) in steps.items():
 
-        chk_deps.send(build_unit)
+            # Only the indexing step returns data.
+            result = step.send(build_unit)
+            if step_id == 'index':
+                report_data = result
 
 
 # -----------------------------------------------------------------------------
@@ -840,7 +1330,9 @@ def _integrated_processing(cfg,
 
     """
     if cfg['steps']['enable_bulk_data_checks']:
-        da.check.bulk_data.check_all(cfg, build_monitor)
+        # Delay importing the bulk data module until we know that we need it.
+        import da.check.bulk_data as _bulk_data
+        _bulk_data.check_all(cfg, build_monitor)
 
     if cfg['steps']['enable_report_generation']:
         # Delay importing the report module as it has heavyweight dependencies.
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Message channel between the metabuild and a subsidiary build.
+
+A subsidiary build runs in a separate process, either
+a build subprocess or the build server for the
+isolated source tree. We want the metabuild process
+to be able to see what is happening in the build as
+it happens, rather than just the final result, so
+that it can react to failures (e.g. by aborting the
+builds of sibling baselines) without waiting for the
+build to finish.
+
+The channel is a Unix domain socket: for a build
+subprocess, one end of a socket pair that is
+inherited by the child; for the build server, the
+connection on which the build was requested. We do
+not use stdout, as many of the build tools (py.test
+in particular) make extensive use of it.
+
+Messages are pickled objects, each framed with a
+length header. The build sends a message for each
+build unit as it starts, for each nonconformity
+and for each step timing record, then finally the
+result of the build. The metabuild may ask the
+build to abort, which it does before starting the
+next build unit.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import array
+import contextlib
+import os
+import pickle
+import select
+import socket
+import struct
+
+import da.constants
+
+
+# Message types.
+PROGRESS      = 'progress'
+NONCONFORMITY = 'nonconformity'
+TIMING        = 'timing'
+RESULT        = 'result'
+ABORT         = 'abort'
+
+# The interval at which the metabuild checks
+# whether the build should be aborted.
+#
+POLL_SECS = 0.2
+
+# The maximum number of file descriptors that
+# may be sent with a single message.
+#
+MAX_FDS = 3
+
+_HEADER = struct.Struct('!Q')
+
+# The channel for the build running in this
+# process, if any. Worker processes forked by
+# the build inherit this, but must not use it,
+# so we also record which process owns it.
+#
+_CHANNEL = {'conn': None, 'pid': None, 'is_abort_requested': False}
+
+
+# -----------------------------------------------------------------------------
+def send_message(conn, obj, fds = ()):
+    """
+    Send a pickled object, and optionally some file descriptors, to conn.
+
+    NOTE: Pickled data can execute arbitrary code
+          when loaded, so channels must only be
+          accessible to the user that created them.
+
+    """
+    data   = pickle.dumps(obj, protocol = da.constants.PICKLE_PROTOCOL)
+    header = _HEADER.pack(len(data))
+    if fds:
+        conn.sendmsg([header], [(socket.SOL_SOCKET,
+                                 socket.SCM_RIGHTS,
+                                 array.array('i', fds))])
+    else:
+        conn.sendall(header)
+    conn.sendall(data)
+
+
+# -----------------------------------------------------------------------------
+def recv_message(conn):
+    """
+    Return an (object, fds) tuple received from conn.
+
+    EOFError is raised if the connection is closed.
+
+    """
+    fds          = array.array('i')
+    ancbufsize   = socket.CMSG_LEN(MAX_FDS * fds.itemsize)
+    (header, ancdata, _, _) = conn.recvmsg(_HEADER.size, ancbufsize)
+    for (level, msg_type, msg_data) in ancdata:
+        if level == socket.SOL_SOCKET and msg_type == socket.SCM_RIGHTS:
+            usable = len(msg_data) - (len(msg_data) % fds.itemsize)
+            fds.frombytes(msg_data[:usable])
+    if not header:
+        raise EOFError('Connection closed.')
+    header += _recv_exactly(conn, _HEADER.size - len(header))
+    (size,) = _HEADER.unpack(header)
+    return (pickle.loads(_recv_exactly(conn, size)), list(fds))
+
+
+# -----------------------------------------------------------------------------
+def _recv_exactly(conn, size):
+    """
+    Return exactly size bytes received from conn.
+
+    """
+    chunks = []
+    while size > 0:
+        chunk = conn.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError('Connection closed.')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def context(conn):
+    """
+    Publish messages from the build in this process on conn.
+
+    """
+    _CHANNEL['conn']               = conn
+    _CHANNEL['pid']                = os.getpid()
+    _CHANNEL['is_abort_requested'] = False
+    try:
+        yield
+    finally:
+        _CHANNEL['conn'] = None
+        _CHANNEL['pid']  = None
+
+
+# -----------------------------------------------------------------------------
+def _conn():
+    """
+    Return the channel for the build in this process, or None if there is none.
+
+    """
+    if _CHANNEL['pid'] != os.getpid():
+        return None
+    return _CHANNEL['conn']
+
+
+# -----------------------------------------------------------------------------
+def publish(msg_type, payload):
+    """
+    Send a message to the metabuild, if there is a channel to it.
+
+    If the metabuild has gone away, the channel is
+    dropped and the build carries on regardless.
+
+    """
+    conn = _conn()
+    if conn is None:
+        return
+    try:
+        send_message(conn, {'type': msg_type, 'payload': payload})
+    except OSError:
+        _CHANNEL['conn'] = None
+
+
+# -----------------------------------------------------------------------------
+def is_abort_requested():
+    """
+    Return True if the metabuild has asked the build in this process to abort.
+
+    """
+    conn = _conn()
+    if conn is None or _CHANNEL['is_abort_requested']:
+        return _CHANNEL['is_abort_requested']
+    try:
+        while select.select([conn], [], [], 0)[0]:
+            (message, _) = recv_message(conn)
+            if message['type'] == ABORT:
+                _CHANNEL['is_abort_requested'] = True
+                break
+    except (OSError, EOFError):
+        _CHANNEL['conn'] = None
+    return _CHANNEL['is_abort_requested']
+
+
+# -----------------------------------------------------------------------------
+def listen(conn, on_message = None, abort_event = None):
+    """
+    Return the result of the build, passing other messages to on_message.
+
+    If abort_event is set while the build is in
+    progress, the build is asked to abort. The
+    result is still awaited, so that the build
+    can finish cleanly.
+
+    EOFError is raised if the channel is closed
+    before the result is received.
+
+    """
+    is_abort_sent = False
+    while True:
+
+        if (     abort_event is not None
+             and abort_event.is_set()
+             and not is_abort_sent):
+            try:
+                send_message(conn, {'type': ABORT, 'payload': None})
+            except OSError:
+                pass
+            is_abort_sent = True
+
+        if not select.select([conn], [], [], POLL_SECS)[0]:
+            continue
+
+        (message, _) = recv_message(conn)
+        if message['type'] == RESULT:
+            return message['payload']
+        if on_message is not None:
+            on_message(message)
@@ -0,0 +1,598 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent build server.
+
+Each build is run using the build system from the
+isolated copy of the design documents that is
+being built, so that the build process can be
+treated as an integrated part of the product.
+
+Launching a fresh Python interpreter for each
+build means that pylint, pytest, radon, yaml
+and all of the other build dependencies must be
+imported again every time, and for small
+incremental builds this import cost dominates.
+
+Instead, we keep a build server resident for each
+isolated source tree. The server is a daemon that
+accepts build requests over a Unix domain socket.
+Before each build, it reloads only those modules
+in the da package that have changed in the isolated
+source tree, so third party modules stay imported
+and warm from one build to the next.
+
+The standard streams of the requesting process are
+passed to the server along with the request, so
+console output from the build appears just as it
+would if the build were run in a subprocess. The
+connection is then used as the da.build_channel
+for the build, over which progress messages and
+finally the result (or exception information,
+which tblib allows us to pickle) are sent back
+to the requesting process.
+
+The server exits when it has been idle for the
+configured period, or when the server module
+itself has changed.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import ast
+import collections
+import contextlib
+import hashlib
+import importlib
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import tblib.pickling_support
+
+import da.build_channel
+import da.import_graph
+import da.lwc.run
+import da.util.daemon
+
+
+# The maximum time to wait for a newly launched
+# server to start accepting connections.
+#
+STARTUP_TIMEOUT_SECS = 30.0
+
+# Standard input, output and error.
+_STDIO_FDS = (0, 1, 2)
+
+# tblib enables us to pickle tracebacks so we can
+# return exceptions raised by the build to the
+# requesting process.
+#
+tblib.pickling_support.install()
+
+
+# -----------------------------------------------------------------------------
+def socket_filepath(dirpath_isolated_src):
+    """
+    Return the path of the socket for the server for an isolated source tree.
+
+    The path of a Unix domain socket is limited
+    to around 100 characters, so the socket is
+    named after a digest of the source tree path
+    and kept in the system temporary directory.
+
+    """
+    return _server_filepath(dirpath_isolated_src, 'sock')
+
+
+# -----------------------------------------------------------------------------
+def pid_filepath(dirpath_isolated_src):
+    """
+    Return the path of the pidfile for the server for an isolated source tree.
+
+    """
+    return _server_filepath(dirpath_isolated_src, 'pid')
+
+
+# -----------------------------------------------------------------------------
+def _server_filepath(dirpath_isolated_src, ext):
+    """
+    Return a short, unique filepath for the server for an isolated source tree.
+
+    """
+    digest = hashlib.sha1(
+                    os.path.abspath(dirpath_isolated_src).encode('utf-8'))
+    return os.path.join(tempfile.gettempdir(),
+                        'da_build_server_{uid}_{digest}.{ext}'.format(
+                                            uid    = os.getuid(),
+                                            digest = digest.hexdigest()[:16],
+                                            ext    = ext))
+
+
+# -----------------------------------------------------------------------------
+def request_build(cfg, on_message = None, abort_event = None):
+    """
+    Run a build on the server for the isolated source tree; return the result.
+
+    A server is launched if one is not already
+    running. None is returned if no server could
+    be reached, or if the server declined the
+    request (because it needs to be restarted),
+    in which case the caller should run the build
+    some other way.
+
+    Messages from the build are passed to
+    on_message, and the build is asked to abort
+    if abort_event is set, as described for
+    da.build_channel.listen().
+
+    """
+    dirpath_isolated_src = cfg['paths']['dirpath_isolated_src']
+    filepath_socket      = socket_filepath(dirpath_isolated_src)
+    conn                 = _connect(filepath_socket)
+    if conn is None:
+        _launch(dirpath_isolated_src,
+                cfg['options'].get('build_server_idle_timeout_secs', 3600))
+        conn = _connect(filepath_socket, timeout = STARTUP_TIMEOUT_SECS)
+    if conn is None:
+        return None
+
+    with conn:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        da.build_channel.send_message(conn,
+                                      {'cfg': cfg, 'cwd': os.getcwd()},
+                                      fds = _STDIO_FDS)
+        try:
+            result = da.build_channel.listen(conn, on_message, abort_event)
+        except EOFError:
+            raise RuntimeError(
+                'No result from the build server. '
+                'It seems to have terminated unexpectedly.')
+    return result
+
+
+# -----------------------------------------------------------------------------
+def _connect(filepath_socket, timeout = 0.0):
+    """
+    Return a connection to the server, or None if it is not accepting them.
+
+    Retry until the timeout expires.
+
+    """
+    time_limit = time.monotonic() + timeout
+    while True:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(filepath_socket)
+            return conn
+        except OSError:
+            conn.close()
+        if time.monotonic() >= time_limit:
+            return None
+        time.sleep(0.05)
+
+
+# -----------------------------------------------------------------------------
+def _launch(dirpath_isolated_src, idle_timeout_secs):
+    """
+    Launch a build server for the specified isolated source tree.
+
+    The server is run using the Python environment
+    for the isolated source tree, just as for a
+    build subprocess, and daemonises itself, so
+    this function returns as soon as the server
+    process has forked.
+
+    """
+    # A pidfile left behind by a server which was
+    # killed would stop a new server from starting.
+    #
+    filepath_pid = pid_filepath(dirpath_isolated_src)
+    if os.path.isfile(filepath_pid) and not _is_running(filepath_pid):
+        os.remove(filepath_pid)
+
+    da.lwc.run.python3(['-m', 'da.build_server',
+                        dirpath_isolated_src,
+                        str(idle_timeout_secs)],
+                       dirpath_lwc_root = dirpath_isolated_src)
+
+
+# -----------------------------------------------------------------------------
+def _is_running(filepath_pid):
+    """
+    Return True if the process identified by the pidfile is running.
+
+    """
+    try:
+        with open(filepath_pid, 'r') as file:
+            os.kill(int(file.read().strip()), 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+# -----------------------------------------------------------------------------
+def module_digests(dirpath_root):
+    """
+    Return a map from module name to digest for da modules under dirpath_root.
+
+    Only modules which have been imported are
+    included.
+
+    """
+    dirpath_root = os.path.abspath(dirpath_root)
+    digests      = {}
+    for (name, module) in list(sys.modules.items()):
+        if name != 'da' and not name.startswith('da.'):
+            continue
+        filepath = getattr(module, '__file__', None)
+        if filepath is None:
+            continue
+        filepath = os.path.abspath(filepath)
+        if not filepath.startswith(dirpath_root + os.sep):
+            continue
+        digests[name] = _file_digest(filepath)
+    return digests
+
+
+# -----------------------------------------------------------------------------
+def _file_digest(filepath):
+    """
+    Return a digest of the content of the file, or None if it does not exist.
+
+    File modification times are not used, as the
+    isolated source tree may be re-cloned between
+    builds.
+
+    """
+    try:
+        with open(filepath, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+# -----------------------------------------------------------------------------
+def changed_modules(digests):
+    """
+    Return the sorted names of modules with content that no longer matches.
+
+    """
+    changed = []
+    for (name, digest) in digests.items():
+        module   = sys.modules.get(name)
+        filepath = getattr(module, '__file__', None)
+        if filepath is None or _file_digest(filepath) != digest:
+            changed.append(name)
+    return sorted(changed)
+
+
+# -----------------------------------------------------------------------------
+def reload_order(names, candidates):
+    """
+    Return the named modules and those which import them, in reload order.
+
+    importlib.reload() re-executes a module in place,
+    so code which refers to the module by name sees
+    the new definitions, but modules which bound
+    objects from it (e.g. with "from x import y", or
+    packages which re-export their submodules) keep
+    the old ones. Those modules are reloaded too, as
+    are the modules which import them in turn.
+
+    Each module comes after any others in the list
+    which it imports. Only modules named in
+    candidates are considered.
+
+    """
+    importers = collections.defaultdict(set)
+    for name in candidates:
+        for imported in _imported_candidates(name, candidates):
+            importers[imported].add(name)
+
+    closure = set()
+    queue   = collections.deque(names)
+    while queue:
+        name = queue.popleft()
+        if name not in closure:
+            closure.add(name)
+            queue.extend(importers[name])
+
+    # Import cycles are broken by taking the
+    # first remaining module in sorted order.
+    #
+    imports = {name: _imported_candidates(name, closure) for name in closure}
+    order   = []
+    while imports:
+        ready = sorted(name for (name, imported) in imports.items()
+                                                        if not imported)
+        if not ready:
+            ready = [min(imports)]
+        for name in ready:
+            del imports[name]
+        for imported in imports.values():
+            imported.difference_update(ready)
+        order.extend(ready)
+    return order
+
+
+# -----------------------------------------------------------------------------
+def _imported_candidates(name, candidates):
+    """
+    Return the set of candidate modules which the named module imports.
+
+    The current content of the file is used, as it
+    is this which will be executed on reload.
+
+    """
+    filepath = getattr(sys.modules.get(name), '__file__', None)
+    if filepath is None:
+        return set()
+    try:
+        with open(filepath, 'rb') as file:
+            root = ast.parse(file.read(), filename = filepath)
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    imported = da.import_graph.imported_modules(
+                root       = root,
+                name       = name,
+                is_package = os.path.basename(filepath) == '__init__.py')
+    return set(imported).intersection(candidates) - {name}
+
+
+# -----------------------------------------------------------------------------
+def reload_modules(names):
+    """
+    Reload the named modules, in order, forgetting any that have been deleted.
+
+    The order given by reload_order() ensures that
+    each module sees the reloaded versions of the
+    modules which it imports.
+
+    """
+    for name in names:
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        if _file_digest(module.__file__) is None:
+            del sys.modules[name]
+        else:
+            importlib.reload(module)
+
+
+# =============================================================================
+class BuildServer(da.util.daemon.BaseDaemon):
+    """
+    Daemon that runs builds for a single isolated source tree.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath_isolated_src, idle_timeout_secs):
+        """
+        Return an initialised instance of the BuildServer class.
+
+        """
+        super().__init__(pidfile = pid_filepath(dirpath_isolated_src))
+        self.dirpath_isolated_src = os.path.abspath(dirpath_isolated_src)
+        self.filepath_socket      = socket_filepath(dirpath_isolated_src)
+        self.idle_timeout_secs    = idle_timeout_secs
+        self.digests              = {}
+
+        # The server cannot reload the modules that
+        # it is running, so it restarts if any of
+        # them change. (This module is not known as
+        # da.build_server when run as __main__).
+        #
+        self.digests_server = {
+                        filepath: _file_digest(filepath)
+                        for filepath in (os.path.abspath(__file__),
+                                         da.util.daemon.__file__)}
+
+    # -------------------------------------------------------------------------
+    def run(self):
+        """
+        Serve build requests until idle for too long, or until restart is due.
+
+        """
+        self.digests = module_digests(self.dirpath_isolated_src)
+
+        if os.path.exists(self.filepath_socket):
+            os.remove(self.filepath_socket)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+
+            # Only the current user may connect. The
+            # umask is restored once the socket file
+            # has been created so that it does not
+            # affect files written by the builds.
+            #
+            umask = os.umask(0o077)
+            try:
+                listener.bind(self.filepath_socket)
+            finally:
+                os.umask(umask)
+            listener.listen(1)
+            listener.settimeout(self.idle_timeout_secs)
+            is_serving = True
+            while is_serving:
+                try:
+                    (conn, _) = listener.accept()
+                except socket.timeout:
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    is_serving = self.serve(conn)
+        finally:
+            listener.close()
+            if os.path.exists(self.filepath_socket):
+                os.remove(self.filepath_socket)
+
+    # -------------------------------------------------------------------------
+    def serve(self, conn):
+        """
+        Run a single build request, returning False if the server should exit.
+
+        """
+        # Ignore clients which disconnect without
+        # making a request.
+        #
+        try:
+            (request, fds) = da.build_channel.recv_message(conn)
+        except (EOFError, OSError):
+            return True
+
+        try:
+            if any(_file_digest(filepath) != digest
+                   for (filepath, digest) in self.digests_server.items()):
+                da.build_channel.send_message(
+                                    conn, {'type':    da.build_channel.RESULT,
+                                           'payload': None})
+                return False
+
+            changed     = changed_modules(self.digests)
+            is_reloaded = False
+            with _stdio_redirected(fds), \
+                 _cwd(request['cwd']), \
+                 _logging_restored(), \
+                 da.build_channel.context(conn):
+
+                try:
+                    reload_modules(reload_order(changed, self.digests))
+                    is_reloaded = True
+                    import da.metabuild as _metabuild
+                    result = _metabuild.run_build(request['cfg'])
+
+                # Pylint rule W0703 (broad-except) disabled.
+                # Exceptions raised while reloading modules
+                # are returned to the requesting process just
+                # like exceptions raised by the build itself.
+                #
+                except Exception:                       # pylint: disable=W0703
+                    result = sys.exc_info()
+
+            da.build_channel.send_message(
+                                    conn, {'type':    da.build_channel.RESULT,
+                                           'payload': result})
+
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        # Modules which failed to reload are left with
+        # their old digests so that we try again next
+        # time.
+        #
+        digests = module_digests(self.dirpath_isolated_src)
+        if not is_reloaded:
+            for name in changed:
+                digests.pop(name, None)
+        self.digests.update(digests)
+        return True
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _stdio_redirected(fds):
+    """
+    Redirect the standard streams to the received file descriptors.
+
+    """
+    saved = [os.dup(fd) for fd in _STDIO_FDS]
+    try:
+        for (fd_received, fd_std) in zip(fds, _STDIO_FDS):
+            os.dup2(fd_received, fd_std)
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for (fd_saved, fd_std) in zip(saved, _STDIO_FDS):
+            os.dup2(fd_saved, fd_std)
+            os.close(fd_saved)
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _cwd(dirpath):
+    """
+    Change the current working directory for the duration of the context.
+
+    """
+    dirpath_prev = os.getcwd()
+    os.chdir(dirpath)
+    try:
+        yield
+    finally:
+        os.chdir(dirpath_prev)
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _logging_restored():
+    """
+    Remove any log handlers added to the root logger within the context.
+
+    Each build configures logging afresh, so
+    handlers would otherwise accumulate from one
+    build to the next.
+
+    """
+    logger   = logging.getLogger()
+    level    = logger.level
+    handlers = list(logger.handlers)
+    try:
+        yield
+    finally:
+        for handler in list(logger.handlers):
+            if handler not in handlers:
+                logger.removeHandler(handler)
+                handler.close()
+        logger.setLevel(level)
+
+
+# -----------------------------------------------------------------------------
+def main(argv = None):
+    """
+    Start a build server for the isolated source tree given in argv.
+
+    """
+    if argv is None:
+        argv = sys.argv
+    server = BuildServer(dirpath_isolated_src = argv[1],
+                         idle_timeout_secs    = float(argv[2]))
+    server.start()
+    return 0
+
+
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+    sys.exit(main())
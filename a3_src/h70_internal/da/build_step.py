@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of the processing steps applied to individual build units.
+
+Each unit processing step is registered with the
+flag in the steps section of the build configuration
+which enables it, the module which implements it
+and a function which constructs its coroutine from
+that module. Static checks whose results depend
+only on the content of the build unit also have a
+function which returns a fingerprint of the checker
+and the tools that it uses, so that their results
+can be stored in the step result cache. Checks
+which follow imports to other modules are marked
+as such, so that their cached results are also
+keyed on the content of the imported modules.
+
+Many of the step modules import large third party
+packages (pylint, pytest, pygments and so on), so
+importing all of them makes every build slow to
+start, even if only a few steps are enabled. The
+module for each step is therefore imported only
+when the step is enabled, and its coroutine is
+constructed only then. When step timing is enabled,
+the time taken to import each module is recorded
+as an 'import' step, with the module name in place
+of the build unit relpath.
+
+Steps are listed in the order in which they are
+applied to each build unit. We run unit tests
+first to make the test-modify-test loop as tight
+as possible. Pylint static analysis and MyPy type
+checking are the slowest python-specific steps, so
+we leave them until after the other python-specific
+stuff. Data validation has to come before indexing.
+The dependencies check has no flag, so it is always
+enabled.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import collections
+import importlib
+import os
+import sys
+
+import da.check.result_cache
+import da.import_graph
+import da.util.diskcache
+
+
+# -----------------------------------------------------------------------------
+def _dirpath_src(cfg):
+    """
+    Return the path of the isolated source directory being built.
+
+    """
+    return cfg['paths']['dirpath_isolated_src']
+
+
+# -----------------------------------------------------------------------------
+def _fingerprint_pylint(module, cfg):                   # pylint: disable=W0613
+    """
+    Return a fingerprint of the pylint check, its tool and its config files.
+
+    """
+    import pylint
+    dirpath_check = os.path.dirname(module.__file__)
+    return da.check.result_cache.fingerprint(
+                modules   = (module,),
+                tools     = (pylint,),
+                filepaths = (os.path.join(dirpath_check,
+                                          'design.pylintrc'),
+                             os.path.join(dirpath_check,
+                                          'specification.pylintrc')))
+
+
+# -----------------------------------------------------------------------------
+def _fingerprint_pytype(module, cfg):
+    """
+    Return a fingerprint of the type check and the mypy executable.
+
+    """
+    import da.lwc.env
+    filepath_mypy = da.lwc.env.cli_path(dependency_id    = 'mypy',
+                                        application_name = 'mypy',
+                                        dirpath_lwc_root = _dirpath_src(cfg))
+    return da.check.result_cache.fingerprint(
+                modules   = (module,),
+                filepaths = (filepath_mypy,))
+
+
+# -----------------------------------------------------------------------------
+def _fingerprint_pycomplexity(module, cfg):             # pylint: disable=W0613
+    """
+    Return a fingerprint of the complexity check and its tool.
+
+    """
+    import radon
+    import da.python_source
+    return da.check.result_cache.fingerprint(
+                modules   = (module, da.python_source),
+                tools     = (radon,))
+
+
+# -----------------------------------------------------------------------------
+def _fingerprint_schema(module, cfg):                   # pylint: disable=W0613
+    """
+    Return a fingerprint of the data validation check and its tool.
+
+    Identifiers are validated against the idclass
+    register, so the identifier class expressions
+    are included. The check is constructed without
+    a local working copy root (see UNIT_STEPS), so
+    the register is found in the same way here.
+
+    """
+    import good
+    import da.check.constants
+    import da.idclass
+    return da.util.diskcache.DiskCache.key(
+                da.check.result_cache.fingerprint(
+                    modules   = (module, da.check.constants),
+                    tools     = (good,)),
+                da.idclass.combined_regex(None).pattern)
+
+
+# -----------------------------------------------------------------------------
+def _fingerprint_pycodestyle(module, cfg):              # pylint: disable=W0613
+    """
+    Return a fingerprint of the code style check and its tool.
+
+    """
+    import pycodestyle
+    return da.check.result_cache.fingerprint(
+                modules   = (module,),
+                tools     = (pycodestyle,))
+
+
+# -----------------------------------------------------------------------------
+def _fingerprint_pydocstyle(module, cfg):               # pylint: disable=W0613
+    """
+    Return a fingerprint of the docstring style check and its tool.
+
+    """
+    import pydocstyle
+    return da.check.result_cache.fingerprint(
+                modules   = (module,),
+                tools     = (pydocstyle,))
+
+
+# Unit processing steps, in processing order.
+#
+UNIT_STEPS = (
+    {
+        'step_id':      'pytest',
+        'flag':         'enable_test_python_unittest',
+        'module':       'da.check.pytest',
+        'ctor':         lambda module, cfg, monitor: module.coro(
+                                        dirpath_src      = _dirpath_src(cfg),
+                                        build_monitor    = monitor)
+    },
+    {
+        'step_id':      'pycomplexity',
+        'flag':         'enable_static_test_python_complexity',
+        'module':       'da.check.pycomplexity',
+        'ctor':         lambda module, cfg, monitor: module.coro(monitor),
+        'fingerprint':  _fingerprint_pycomplexity,
+        'outputs':      ('complexity.jseq',)
+    },
+    {
+        'step_id':      'pycodestyle',
+        'flag':         'enable_static_test_python_codestyle',
+        'module':       'da.check.pycodestyle',
+        'ctor':         lambda module, cfg, monitor: module.coro(monitor),
+        'fingerprint':  _fingerprint_pycodestyle
+    },
+    {
+        'step_id':      'pydocstyle',
+        'flag':         'enable_static_test_python_docstyle',
+        'module':       'da.check.pydocstyle',
+        'ctor':         lambda module, cfg, monitor: module.coro(monitor),
+        'fingerprint':  _fingerprint_pydocstyle
+    },
+    {
+        'step_id':      'pylint',
+        'flag':         'enable_static_test_python_pylint',
+        'module':       'da.check.pylint',
+        'ctor':         lambda module, cfg, monitor: module.coro(
+                                        dirpath_lwc_root = _dirpath_src(cfg),
+                                        build_monitor    = monitor),
+        'fingerprint':  _fingerprint_pylint,
+        'imports':      True
+    },
+    {
+        'step_id':      'pytype',
+        'flag':         'enable_static_test_python_typecheck',
+        'module':       'da.check.pytype',
+        'ctor':         lambda module, cfg, monitor: module.coro(
+                                        dirpath_lwc_root = _dirpath_src(cfg),
+                                        build_monitor    = monitor),
+        'fingerprint':  _fingerprint_pytype,
+        'imports':      True
+    },
+    {
+        'step_id':      'gcc',
+        'flag':         'enable_compile_gcc',
+        'module':       'da.compile.gcc',
+        'ctor':         lambda module, cfg, monitor: module.coro(monitor)
+    },
+    {
+        'step_id':      'clang',
+        'flag':         'enable_compile_clang',
+        'module':       'da.compile.clang',
+        'ctor':         lambda module, cfg, monitor: module.coro(monitor)
+    },
+    {
+        'step_id':      'docgen',
+        'flag':         'enable_generate_design_docs',
+        'module':       'da.docgen.design',
+        'ctor':         lambda module, cfg, monitor: module.coro(cfg)
+    },
+    {
+        'step_id':      'schema',
+        'flag':         'enable_static_data_validation',
+        'module':       'da.check.schema',
+        'ctor':         lambda module, cfg, monitor: module.coro(monitor),
+        'fingerprint':  _fingerprint_schema
+    },
+    {
+        'step_id':      'index',
+        'flag':         'enable_static_indexing',
+        'module':       'da.index',
+        'ctor':         lambda module, cfg, monitor: module.unit_coro(cfg)
+    },
+    {
+        'step_id':      'dependencies',
+        'flag':         None,
+        'module':       'da.check.dependencies',
+        'ctor':         lambda module, cfg, monitor: module.coro(
+                                        dirpath_lwc_root = _dirpath_src(cfg),
+                                        build_monitor    = monitor)
+    }
+)
+
+
+# -----------------------------------------------------------------------------
+def enabled_steps(cfg, step_ids = None):
+    """
+    Return the registered steps which are enabled, in processing order.
+
+    If step_ids is given, only steps with one of
+    the specified ids are returned.
+
+    """
+    return [step for step in UNIT_STEPS
+            if (step['flag'] is None or cfg['steps'][step['flag']])
+            and (step_ids is None or step['step_id'] in step_ids)]
+
+
+# -----------------------------------------------------------------------------
+def import_module(step, step_timer = None):
+    """
+    Import and return the module which implements the specified step.
+
+    If a step_timer is supplied, and the module has
+    not already been imported, the time taken to
+    import it is recorded.
+
+    """
+    module_name = step['module']
+    if step_timer is None or module_name in sys.modules:
+        return importlib.import_module(module_name)
+    with step_timer.measure('import', module_name):
+        return importlib.import_module(module_name)
+
+
+# -----------------------------------------------------------------------------
+def coroutines(cfg,
+               build_monitor,
+               step_timer = None,
+               step_ids   = None,
+               overrides  = None):
+    """
+    Return an ordered map from step id to coroutine for each enabled step.
+
+    Modules are imported, and coroutines constructed,
+    only for the enabled steps. If the step result
+    cache is enabled, cacheable checks are wrapped
+    so that their results are stored in and replayed
+    from the cache, and the import graph is updated
+    if any of them follow imports. If a step_timer
+    is supplied, each coroutine is wrapped so that
+    the time taken by each step for each unit is
+    recorded.
+
+    Steps with an id in overrides use the supplied
+    coroutine instead, which is neither cached nor
+    timed, and their modules are not imported.
+
+    ---
+    type: function
+
+    args:
+        cfg:            A mapping holding the build configuration.
+
+        build_monitor:  A reference to the build monitoring and
+                        progress reporting coroutine.
+
+        step_timer:     A da.monitor.step_timing.StepTimer, or
+                        None if step timing is not enabled.
+
+        step_ids:       A collection of step ids to restrict the
+                        map to, or None for all enabled steps.
+
+        overrides:      A mapping from step id to a coroutine to
+                        use in place of the registered one.
+
+    returns:
+        steps:          An ordered mapping from step id to
+                        coroutine.
+    ...
+
+    """
+    overrides    = overrides or {}
+    step_cache   = da.check.result_cache.open_cache(cfg)
+    import_graph = None
+    steps        = collections.OrderedDict()
+    for step in enabled_steps(cfg, step_ids):
+
+        step_id = step['step_id']
+        if step_id in overrides:
+            steps[step_id] = overrides[step_id]
+            continue
+
+        module = import_module(step, step_timer)
+        if step_cache is not None and 'fingerprint' in step:
+            if step.get('imports', False) and import_graph is None:
+                import_graph = da.import_graph.open_graph(cfg)
+            coro = da.check.result_cache.coro(
+                    cache            = step_cache,
+                    step_id          = step_id,
+                    step_fingerprint = step['fingerprint'](module, cfg),
+                    dirpath_src      = _dirpath_src(cfg),
+                    build_monitor    = build_monitor,
+                    checker_ctor     = _bind(step['ctor'], module, cfg),
+                    output_filenames = step.get('outputs', ()),
+                    import_graph     = (import_graph
+                                        if step.get('imports', False)
+                                        else None))
+        else:
+            coro = step['ctor'](module, cfg, build_monitor)
+
+        if step_timer is not None:
+            coro = step_timer.wrap(step_id, coro)
+        steps[step_id] = coro
+
+    return steps
+
+
+# -----------------------------------------------------------------------------
+def _bind(ctor, module, cfg):
+    """
+    Return a function which constructs a step coroutine given a monitor.
+
+    """
+    return lambda monitor: ctor(module, cfg, monitor)
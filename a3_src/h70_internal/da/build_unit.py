@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Lazily loaded build units.
+
+A build unit holds information about a single
+design document (source file) together with its
+supporting specification, and is passed to each
+of the unit processing steps in turn.
+
+Many of the unit processing steps only apply to
+some kinds of file (e.g. Python source documents
+which are not experimental), so the content of a
+build unit is loaded lazily: the file is memory
+mapped when the build unit is created, but it is
+only decoded when the 'content' or 'lines' are
+first requested, and only parsed when the 'ast'
+or 'comments' are first requested. Steps which
+skip a file therefore never pay for either. This
+is particularly beneficial for large data files
+such as registers and daybooks.
+
+Build units support the same mapping interface
+as the dicts which they replace, so processing
+steps can continue to use build_unit['content'],
+'ast' in build_unit, build_unit.get('comments')
+and so on.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import collections.abc
+import io
+import mmap
+
+import da.ast_cache
+import da.check.constants
+import da.lwc.file
+import da.python_source
+
+
+# Keys for which values are always available.
+_EAGER_KEYS = ('filepath', 'relpath', 'dirpath_log')
+
+# Keys for which values are computed on demand.
+_LAZY_KEYS = ('bytes', 'content', 'lines', 'ast', 'comments')
+
+
+# =============================================================================
+# Pylint rule R0902 (too-many-instance-attributes)
+# disabled as each slot holds one piece of lazily
+# loaded state, and grouping them into containers
+# would cost the memory and lookups that __slots__
+# are used here to save.
+#
+class BuildUnit(collections.abc.MutableMapping):        # pylint: disable=R0902
+    """
+    A lazily loaded design document or specification.
+
+    The 'ast' and 'comments' keys are only present
+    for Python files which parse successfully. If
+    a file does not parse, a nonconformity is sent
+    to the build_monitor the first time that either
+    key is requested.
+
+    Other keys (e.g. 'spec') may be set and read as
+    for a dict.
+
+    """
+
+    __slots__ = ('filepath',
+                 'relpath',
+                 'dirpath_log',
+                 '_build_monitor',
+                 '_ast_cache',
+                 '_mapped',
+                 '_content',
+                 '_lines',
+                 '_is_parsed',
+                 '_parsed',
+                 '_extra')
+
+    # -------------------------------------------------------------------------
+    def __init__(self,                                  # pylint: disable=R0913
+                 filepath,
+                 relpath,
+                 dirpath_log   = None,
+                 build_monitor = None,
+                 ast_cache     = None):
+        """
+        Return a BuildUnit instance with the specified file memory mapped.
+
+        """
+        self.filepath       = filepath
+        self.relpath        = relpath
+        self.dirpath_log    = dirpath_log
+        self._build_monitor = build_monitor
+        self._ast_cache     = ast_cache
+        self._content       = None
+        self._lines         = None
+        self._is_parsed     = False
+        self._parsed        = {}
+        self._extra         = {}
+        with open(filepath, 'rb') as file:
+            try:
+                self._mapped = mmap.mmap(file.fileno(),
+                                         0,
+                                         access = mmap.ACCESS_READ)
+            except ValueError:
+                self._mapped = b''   # Empty files cannot be mapped.
+
+    # -------------------------------------------------------------------------
+    def __getitem__(self, key):
+        """
+        Return the value for the specified key, loading it if necessary.
+
+        """
+        if key in _EAGER_KEYS:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+        elif key == 'bytes':
+            value = self._mapped
+        elif key == 'content':
+            value = self._decoded()
+        elif key == 'lines':
+            if self._lines is None:
+                self._lines = list(io.StringIO(self._decoded(),
+                                               newline = '\n'))
+            value = self._lines
+        elif key in ('ast', 'comments'):
+            value = self.parse()[key]
+        else:
+            value = self._extra[key]
+        return value
+
+    # -------------------------------------------------------------------------
+    def __contains__(self, key):
+        """
+        Return True if there is a value for the key, parsing if necessary.
+
+        """
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    # -------------------------------------------------------------------------
+    def __setitem__(self, key, value):
+        """
+        Set the value for the specified key.
+
+        """
+        if key in _EAGER_KEYS or key in _LAZY_KEYS:
+            raise KeyError('Cannot set lazily loaded key: {key}'.format(
+                                                                key = key))
+        self._extra[key] = value
+
+    # -------------------------------------------------------------------------
+    def __delitem__(self, key):
+        """
+        Delete the value for the specified key.
+
+        """
+        del self._extra[key]
+
+    # -------------------------------------------------------------------------
+    def __iter__(self):
+        """
+        Iterate over keys, without loading anything that is not yet loaded.
+
+        """
+        for key in _EAGER_KEYS:
+            if getattr(self, key) is not None:
+                yield key
+        yield 'bytes'
+        yield 'content'
+        yield 'lines'
+        for key in self._parsed:
+            yield key
+        for key in self._extra:
+            yield key
+
+    # -------------------------------------------------------------------------
+    def __len__(self):
+        """
+        Return the number of keys.
+
+        """
+        return sum(1 for _ in self)
+
+    # -------------------------------------------------------------------------
+    def parse(self):
+        """
+        Return a mapping holding the 'ast' and 'comments' of a Python file.
+
+        The file is parsed on the first call only.
+        The mapping is empty for files which are not
+        Python files, and for files which do not
+        parse, for which a nonconformity is reported
+        to the build monitor.
+
+        """
+        if self._is_parsed:
+            return self._parsed
+        self._is_parsed = True
+        if not da.lwc.file.is_python_file(self.filepath):
+            return self._parsed
+
+        try:
+
+            (root, comments) = da.ast_cache.parse(
+                source_text = self._decoded(),
+                module_name = da.python_source.get_module_name(self.filepath),
+                cache       = self._ast_cache)
+            self._parsed = {'ast': root, 'comments': comments}
+
+        except SyntaxError as err:
+
+            # Draw a caret under the error location
+            # so it is easy for the user to spot
+            # where the error is.
+            #
+            idx_newline = str(err.text)[0:int(err.offset)].rfind('\n')
+            col = err.offset - (idx_newline + 1)
+            location_indicator = (' ' * col) + '^'
+            msg = 'Syntax error:\n{msg}\n{loc}'.format(
+                                            msg = err.text,
+                                            loc = location_indicator)
+
+            if self._build_monitor is not None:
+                self._build_monitor.report_nonconformity(
+                    tool   = 'da.build',
+                    msg_id = da.check.constants.BUILD_SPEC_SYNTAX_ERROR,
+                    msg    = msg,
+                    path   = self.filepath,
+                    line   = err.lineno,
+                    col    = col)
+
+        return self._parsed
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Release the memory mapping, and any spec that has been attached.
+
+        """
+        spec = self._extra.get('spec')
+        if isinstance(spec, BuildUnit):
+            spec.close()
+        if isinstance(self._mapped, mmap.mmap):
+            self._mapped.close()
+        self._mapped = b''
+
+    # -------------------------------------------------------------------------
+    def _decoded(self):
+        """
+        Return the content of the file, decoding it on the first call only.
+
+        """
+        if self._content is None:
+            self._content = str(self._mapped, 'utf-8')
+        return self._content
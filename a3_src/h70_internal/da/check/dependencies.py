@@ -319,6 +319,8 @@ def _add_build_section(json_doc, entry):
     json_doc >>= 'build'
     json_doc += ('method',  entry['build']['method'])
     json_doc += ('tool',    entry['build']['tool'])
+    if 'requires' in entry['build']:
+        json_doc += ('requires', entry['build']['requires'])
     json_doc <<= 'build'
     return json_doc
 
@@ -461,15 +463,21 @@ class VerticallyAlignedJSON():                          # pylint: disable=R0903
         if tab > 0:
             key += (' ' * tab)
 
-        # Currently I'm only envisaging doing this
-        # with simple key-value pairs where key and
-        # value are both strings. This function could
-        # be extended in future to handle different
-        # types, but for the moment we just return
-        # an error.
+        # Values are either strings or lists of
+        # strings, which are written on a single
+        # line. This function could be extended in
+        # future to handle different types, but for
+        # the moment we just return an error.
         #
-        assert isinstance(value, str)
-        self.buffer.write('{newline}{key}"{value}"'.format(
+        if isinstance(value, list):
+            assert all(isinstance(item, str) for item in value)
+            value = '[{items}]'.format(
+                        items = ', '.join('"{item}"'.format(item = item)
+                                          for item in value))
+        else:
+            assert isinstance(value, str)
+            value = '"{value}"'.format(value = value)
+        self.buffer.write('{newline}{key}{value}'.format(
                                                 newline = self._get_newline(),
                                                 key     = key,
                                                 value   = value))
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent per-check result cache for build units.
+
+Static checks are deterministic functions of the
+design document being checked, its specification,
+the checker implementation, the checker tool version
+and its configuration. If none of these have changed
+since the last time the check was run, then the
+nonconformities that it reports will not have
+changed either, so we can replay them from a cache
+rather than re-running the check.
+
+Some checks (such as pylint and mypy) also follow
+imports to other modules, and report errors which
+depend upon the content of those modules. Results
+from these checks are also keyed on the content of
+every module in the import closure of the design
+document, as recorded in the import graph (see
+da.import_graph), so a change to an imported module
+invalidates the cached results for all of the
+modules which import it.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+import da.import_graph
+import da.lwc.discover
+import da.monitor
+import da.util
+import da.util.diskcache
+
+
+# -----------------------------------------------------------------------------
+def open_cache(cfg):
+    """
+    Return the step result cache, or None if it has not been enabled.
+
+    The cache is kept under the build configuration
+    tmp directory, so it is cleared whenever the
+    clean_tmp_dir option is used.
+
+    """
+    if not cfg['options'].get('enable_step_result_cache', False):
+        return None
+    max_mb = cfg['options'].get('step_result_cache_max_mb', 256)
+    return da.util.diskcache.DiskCache(
+                dirpath   = os.path.join(cfg['paths']['dirpath_meta_cache'],
+                                         'step'),
+                max_bytes = max_mb * 1024 * 1024)
+
+
+# -----------------------------------------------------------------------------
+def fingerprint(modules, tools = (), filepaths = ()):
+    """
+    Return a string identifying a particular checker configuration.
+
+    The fingerprint changes if the source of any of
+    the specified (checker implementation) modules
+    changes; if the version of any of the specified
+    (third party) tool modules changes, or if the
+    content of any of the specified (configuration)
+    files changes.
+
+    """
+    parts = []
+    for module in modules:
+        filepath = module.__file__
+        if os.path.basename(filepath) == '__init__.py':
+            dirpath = os.path.dirname(filepath)
+            parts.extend(os.path.join(dirpath, name)
+                         for name in sorted(os.listdir(dirpath))
+                         if name.endswith('.py'))
+        else:
+            parts.append(filepath)
+    parts = [_file_digest(filepath) for filepath in parts]
+    for tool in tools:
+        parts.append(tool.__name__)
+        parts.append(str(getattr(tool, '__version__', None)))
+    for filepath in filepaths:
+        parts.append(filepath)
+        parts.append(_file_digest(filepath))
+    return da.util.diskcache.DiskCache.key(*parts)
+
+
+# -----------------------------------------------------------------------------
+@da.util.coroutine
+def coro(cache,                                         # pylint: disable=R0913
+         step_id,
+         step_fingerprint,
+         dirpath_src,
+         build_monitor,
+         checker_ctor,
+         output_filenames = (),
+         import_graph     = None):
+    """
+    Replay cached nonconformities or run the wrapped checker on a cache miss.
+
+    The wrapped checker coroutine is constructed
+    with a NonconformityRecorder in place of the
+    build_monitor, so that the nonconformities
+    that it reports can be stored before they
+    are forwarded to the real build_monitor.
+
+    Paths within the isolated source directory are
+    stored relative to it, so results remain valid
+    across branches and build directories.
+
+    Any files named in output_filenames that the
+    checker writes to the build unit log directory
+    are also stored, and are restored on a hit.
+
+    If the checker raises an exception, nothing is
+    stored, so incomplete results are never cached.
+
+    If an import_graph is given, the key for each
+    build unit also includes the content digest of
+    each module in its import closure.
+
+    """
+    recorder = da.monitor.NonconformityRecorder()
+    checker  = checker_ctor(recorder)
+    while True:
+
+        build_unit = (yield)
+        key        = cache.key(step_id,
+                               step_fingerprint,
+                               build_unit['relpath'],
+                               _unit_digest(build_unit),
+                               _imports_digest(import_graph,
+                                               build_unit,
+                                               dirpath_src))
+        result     = cache.get(key)
+
+        if result is None:
+            checker.send(build_unit)
+            result = {
+                'nonconformities': [
+                    _relativise(nonconformity, dirpath_src)
+                    for nonconformity in recorder.drain()],
+                'outputs': _read_outputs(build_unit, output_filenames)
+            }
+            cache.put(key, result)
+        else:
+            _write_outputs(build_unit, result['outputs'])
+
+        for nonconformity in result['nonconformities']:
+            build_monitor.report_nonconformity(
+                                **_absolutise(nonconformity, dirpath_src))
+
+
+# -----------------------------------------------------------------------------
+def _unit_digest(build_unit):
+    """
+    Return a digest of the design document and specification content.
+
+    """
+    spec_bytes = b''
+    if 'spec' in build_unit:
+        spec_bytes = build_unit['spec']['bytes']
+    return da.util.diskcache.DiskCache.key(build_unit['bytes'],
+                                           spec_bytes)
+
+
+# -----------------------------------------------------------------------------
+def _imports_digest(import_graph, build_unit, dirpath_src):
+    """
+    Return a digest of the modules imported by the design document, or None.
+
+    """
+    if import_graph is None:
+        return None
+    dirpath_graph = da.lwc.discover.path(key              = 'src',
+                                         dirpath_lwc_root = dirpath_src)
+    relpath       = os.path.relpath(build_unit['filepath'], dirpath_graph)
+    parts         = []
+    for imported in da.import_graph.dependencies(import_graph, relpath):
+        parts.append(imported)
+        parts.append(import_graph[imported]['digest'])
+    return da.util.diskcache.DiskCache.key(*parts)
+
+
+# -----------------------------------------------------------------------------
+def _file_digest(filepath):
+    """
+    Return a digest of the content of the specified file.
+
+    """
+    with open(filepath, 'rb') as file:
+        return da.util.diskcache.DiskCache.key(file.read())
+
+
+# -----------------------------------------------------------------------------
+def _relativise(nonconformity, dirpath_src):
+    """
+    Return a copy of the nonconformity with a path relative to dirpath_src.
+
+    """
+    nonconformity = dict(nonconformity)
+    path          = nonconformity['path']
+    prefix        = os.path.join(dirpath_src, '')
+    if path.startswith(prefix):
+        nonconformity['path'] = os.path.relpath(path, dirpath_src)
+        nonconformity['is_relpath'] = True
+    return nonconformity
+
+
+# -----------------------------------------------------------------------------
+def _absolutise(nonconformity, dirpath_src):
+    """
+    Return a copy of the nonconformity with an absolute path.
+
+    """
+    nonconformity = dict(nonconformity)
+    if nonconformity.pop('is_relpath', False):
+        nonconformity['path'] = os.path.join(dirpath_src,
+                                             nonconformity['path'])
+    return nonconformity
+
+
+# -----------------------------------------------------------------------------
+def _read_outputs(build_unit, output_filenames):
+    """
+    Return a map from filename to content for each output file written.
+
+    """
+    outputs = {}
+    for filename in output_filenames:
+        filepath = os.path.join(build_unit['dirpath_log'], filename)
+        if os.path.isfile(filepath):
+            with open(filepath, 'rb') as file:
+                outputs[filename] = file.read()
+    return outputs
+
+
+# -----------------------------------------------------------------------------
+def _write_outputs(build_unit, outputs):
+    """
+    Restore output files from a cached result.
+
+    """
+    if not outputs:
+        return
+    dirpath_log = build_unit['dirpath_log']
+    da.util.ensure_dir_exists(dirpath_log)
+    for (filename, content) in outputs.items():
+        with open(os.path.join(dirpath_log, filename), 'wb') as file:
+            file.write(content)
@@ -32,6 +32,7 @@ license:
 
 
 import copy
+import io
 import os.path
 
 import _ast
@@ -115,7 +116,6 @@ def _validate_embedded_data(build_unit, schema_map, build_monitor):
     Send errors to the build_monitor if sent files are not schema-compliant.
 
     """
-    file          = build_unit['file']
     relpath       = build_unit['relpath']
     filepath      = build_unit['filepath']
     filename      = os.path.basename(relpath)
@@ -125,10 +125,15 @@ def _validate_embedded_data(build_unit, schema_map, build_monitor):
 
         # TODO:
         module_name = da.python_source.get_module_name(filepath)
+        comments    = build_unit.get('comments')
+        file        = None
+        if comments is None:
+            file = io.BytesIO(build_unit['bytes'])
         for (item, context) in da.python_source.iter_embedded_data(
                                             module_name = module_name,
                                             root        = build_unit['ast'],
-                                            file        = file):
+                                            file        = file,
+                                            comments    = comments):
             try:
 
                 if isinstance(context.node, _ast.Module):
@@ -31,7 +31,10 @@ license:
 """
 
 
-from good import (Extra,
+from good import (All,
+                  Any,
+                  Extra,
+                  Length,
                   Maybe,
                   Optional,
                   Reject,
@@ -65,17 +68,58 @@ def get(idclass_tab):
         Optional('loglevel_console'):                         common.LOG_LEVEL,
         Optional('enable_build_profiling'):                   bool,
         Optional('enable_build_debugger'):                    bool,
+        Optional('enable_incremental_isolation'):             bool,
+        Optional('enable_build_server'):                      bool,
+        Optional('build_server_idle_timeout_secs'):           int,
+        Optional('enable_artifact_store'):                    bool,
+        Optional('artifact_store_max_entries'):               int,
+        Optional('metabuild_concurrency'):                    int,
+        Optional('metabuild_max_load_per_cpu'):               float,
+        Optional('metabuild_min_free_memory_mb'):             int,
+        Optional('watch_debounce_secs'):                      float,
+        Optional('watch_niceness'):                           int,
+        Optional('watch_io_idle'):                            bool,
+        Optional('enable_step_timing'):                       bool,
+        Optional('step_timing_top_n'):                        int,
         Optional('enable_cms_registration'):                  bool,
         Optional('enable_cms_delete_old_builds'):             bool,
         Optional('cms_expiration_days'):                      int,
         Optional('check_changed_files_only'):                 bool,
+        Optional('check_import_dependents'):                  bool,
+        Optional('enable_risk_prioritisation'):               bool,
         Optional('errors_abort_immediately'):                 bool,
+        Optional('build_worker_count'):                       int,
+        Optional('slow_lane_worker_count'):                   int,
+        Optional('enable_step_result_cache'):                 bool,
+        Optional('step_result_cache_max_mb'):                 int,
+        Optional('enable_incremental_index'):                 bool,
+        Optional('index_memory_budget_mb'):                   int,
+        Optional('enable_ast_cache'):                         bool,
+        Optional('ast_cache_max_mb'):                         int,
         Optional('dep_build_exclusion'):                      Maybe(str),
         Optional('dep_build_limitation'):                     Maybe(str),
+        Optional('dep_build_concurrency'):                    int,
+        Optional('dep_mirror_dirpath'):                       Maybe(str),
+        Optional('dep_fetch_concurrency'):                    int,
+        Optional('enable_dep_build_cache'):                   bool,
         Optional('optimisation_module'):                      Maybe(str),
         Extra:                                                Reject
     })
 
+    build_optimisation = Schema({
+        Optional('parameters'):         {str: All([object], Length(min = 1))},
+        Optional('strategy'):           Any('grid',
+                                            'random',
+                                            'successive_halving'),
+        Optional('num_samples'):        int,
+        Optional('seed'):               Maybe(int),
+        Optional('concurrency'):        int,
+        Optional('objective'):          Maybe(str),
+        Optional('min_budget'):         int,
+        Optional('reduction_factor'):   int,
+        Extra:                          Reject
+    })
+
     build_steps = Schema({
         Optional('enable_dep_fetch_src'):                     bool,
         Optional('enable_dep_build'):                         bool,
@@ -97,9 +141,10 @@ def get(idclass_tab):
     })
 
     return Schema({
-        Required('title'):      common.TITLE_TEXT,
-        Optional('scope'):      build_scope,
-        Optional('options'):    build_options,
-        Optional('steps'):      build_steps,
-        Extra:                  Reject
+        Required('title'):          common.TITLE_TEXT,
+        Optional('scope'):          build_scope,
+        Optional('options'):        build_options,
+        Optional('optimisation'):   build_optimisation,
+        Optional('steps'):          build_steps,
+        Extra:                      Reject
     })
@@ -32,6 +32,7 @@ license:
 
 from good import (Any,
                   Extra,
+                  Optional,
                   Reject,
                   Schema)
 
@@ -93,7 +94,8 @@ def get():
                                             'python_distutils',
                                             'make',
                                             'n/a',
-                                            'TBD')
+                                            'TBD'),
+                    Optional('requires'): [common.LOWERCASE_NAME]
                 }
             }
 
@@ -120,3 +120,20 @@ class Specify_FormatRegister:
         returned_string = da.check.dependencies._format_register(
                                         json.loads(mock_dependencies_register))
         assert returned_string == mock_dependencies_register
+
+    # -------------------------------------------------------------------------
+    def it_preserves_the_prerequisites_of_a_build(
+                                            self, mock_dependencies_register):
+        """
+        A list of required dependencies is written on a single line.
+
+        """
+        import da.check.dependencies
+        register = mock_dependencies_register.replace(
+                    '"tool":         "some/bash/script.sh"\n',
+                    '"tool":         "some/bash/script.sh",\n'
+                    '                "requires":     ["dep_one", "dep_two"]\n')
+        assert '"requires"' in register
+        returned_string = da.check.dependencies._format_register(
+                                                    json.loads(register))
+        assert returned_string == register
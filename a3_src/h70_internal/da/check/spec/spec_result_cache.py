@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.check.result_cache module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# =============================================================================
+class SpecifyOpenCache:
+    """
+    Specify the da.check.result_cache.open_cache() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_none_when_the_cache_is_disabled(self):
+        """
+        The open_cache() function returns None unless the cache is enabled.
+
+        """
+        import da.check.result_cache
+        cfg = {'options': {'enable_step_result_cache': False}}
+        assert da.check.result_cache.open_cache(cfg) is None
+
+
+# =============================================================================
+class SpecifyFingerprint:
+    """
+    Specify the da.check.result_cache.fingerprint() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_changes_when_a_configuration_file_changes(self, tmpdir):
+        """
+        The fingerprint() function depends on configuration file content.
+
+        """
+        import da.check.result_cache
+        filepath_rc = os.path.join(str(tmpdir), 'test.rc')
+        with open(filepath_rc, 'wt') as file:
+            file.write('first')
+        modules     = (da.check.result_cache,)
+        first       = da.check.result_cache.fingerprint(
+                                            modules   = modules,
+                                            filepaths = (filepath_rc,))
+        with open(filepath_rc, 'wt') as file:
+            file.write('second')
+        second = da.check.result_cache.fingerprint(
+                                            modules   = modules,
+                                            filepaths = (filepath_rc,))
+        assert first != second
+
+
+# =============================================================================
+class SpecifyCoro:
+    """
+    Specify the da.check.result_cache.coro() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_replays_cached_nonconformities_without_rerunning(self, tmpdir):
+        """
+        The coro() function only runs the wrapped checker on a cache miss.
+
+        """
+        import da.check.result_cache
+        import da.monitor
+        import da.util
+        import da.util.diskcache
+
+        dirpath_src = os.path.join(str(tmpdir), 'src')
+        calls       = []
+
+        @da.util.coroutine
+        def checker_ctor(monitor):
+            """
+            Mock checker coroutine.
+
+            """
+            while True:
+                build_unit = (yield)
+                calls.append(build_unit['relpath'])
+                monitor.report_nonconformity(
+                            tool   = 'TEST_TOOL',
+                            msg_id = 'TEST_ID',
+                            msg    = 'TEST_MSG',
+                            path   = os.path.join(dirpath_src, 'a.py'))
+
+        build_unit = {'relpath':     'a.py',
+                      'bytes':       b'TEST_CONTENT',
+                      'dirpath_log': os.path.join(str(tmpdir), 'log')}
+        cache      = da.util.diskcache.DiskCache(
+                                        os.path.join(str(tmpdir), 'cache'),
+                                        max_bytes = 1024 * 1024)
+        monitors   = [da.monitor.NonconformityRecorder() for _ in range(2)]
+        for monitor in monitors:
+            step = da.check.result_cache.coro(
+                                        cache            = cache,
+                                        step_id          = 'TEST_STEP',
+                                        step_fingerprint = 'TEST_FINGERPRINT',
+                                        dirpath_src      = dirpath_src,
+                                        build_monitor    = monitor,
+                                        checker_ctor     = checker_ctor)
+            step.send(build_unit)
+
+        assert calls == ['a.py']
+        assert monitors[0].drain() == monitors[1].drain()
+
+    # -------------------------------------------------------------------------
+    def it_reruns_the_checker_when_an_imported_module_changes(self, tmpdir):
+        """
+        With an import graph, keys include the digests of imported modules.
+
+        """
+        import da.check.result_cache
+        import da.monitor
+        import da.util
+        import da.util.diskcache
+
+        dirpath_src = os.path.join(str(tmpdir), 'lwc')
+        calls       = []
+
+        @da.util.coroutine
+        def checker_ctor(monitor):                      # pylint: disable=W0613
+            """
+            Mock checker coroutine.
+
+            """
+            while True:
+                build_unit = (yield)
+                calls.append(build_unit['relpath'])
+
+        build_unit = {'relpath':     'a3_src/h00/a.py',
+                      'filepath':    os.path.join(dirpath_src,
+                                                  'a3_src', 'h00', 'a.py'),
+                      'bytes':       b'import b',
+                      'dirpath_log': os.path.join(str(tmpdir), 'log')}
+        cache      = da.util.diskcache.DiskCache(
+                                        os.path.join(str(tmpdir), 'cache'),
+                                        max_bytes = 1024 * 1024)
+        monitor    = da.monitor.NonconformityRecorder()
+        for digest_b in ('DIGEST_1', 'DIGEST_1', 'DIGEST_2'):
+            graph = {'h00/a.py': {'imports': ['b'], 'digest': 'DIGEST_A'},
+                     'h00/b.py': {'imports': [],    'digest': digest_b}}
+            step  = da.check.result_cache.coro(
+                                    cache            = cache,
+                                    step_id          = 'TEST_STEP',
+                                    step_fingerprint = 'TEST_FINGERPRINT',
+                                    dirpath_src      = dirpath_src,
+                                    build_monitor    = monitor,
+                                    checker_ctor     = checker_ctor,
+                                    import_graph     = graph)
+            step.send(build_unit)
+
+        assert calls == ['a3_src/h00/a.py', 'a3_src/h00/a.py']
@@ -405,6 +405,190 @@ def build(click_ctx, da_ctx, cfg_name, datetime_utc):
         exit_application(exit_code)
 
 
+# -----------------------------------------------------------------------------
+@main.command(
+    cls  = ExplicitInfoNameCommand,
+    name = 'benchmark')
+@pass_custom_ctx
+@click.option(
+    '-n', '--num_trials',
+    help    = 'Number of faults to inject.',
+    type    = click.INT,
+    default = 10)
+@click.option(
+    '-s', '--seed',
+    help    = 'Random seed for fault and unit selection.',
+    type    = click.INT,
+    default = None)
+def benchmark(da_ctx, num_trials, seed):
+    """
+    Measure time-to-first-nonconformity for injected faults.
+
+    Results are appended to the benchmark results
+    file in the tmp directory, labelled with the
+    current commit, and a summary of the detection
+    latency is printed.
+
+    """
+    import da.benchmark as _benchmark
+    import da.vcs       as _vcs
+
+    dirpath_lwc_root = da_ctx['dirpath_lwc_root']
+    filepath_results = os.path.join(
+                            da.lwc.discover.path(
+                                        key              = 'tmp',
+                                        dirpath_lwc_root = dirpath_lwc_root),
+                            'benchmark',
+                            'time_to_first_nonconformity.jseq')
+    label = _vcs.commit_info(dirpath_root = dirpath_lwc_root)['short_hexsha']
+    record_list = _benchmark.run(dirpath_lwc_root = dirpath_lwc_root,
+                                 filepath_results = filepath_results,
+                                 num_trials       = num_trials,
+                                 seed             = seed,
+                                 label            = label)
+    click.echo(_benchmark.format_summary(_benchmark.summarise(record_list)))
+
+
+# -----------------------------------------------------------------------------
+@main.command(
+    cls  = ExplicitInfoNameCommand,
+    name = 'watch',
+    context_settings = {'allow_extra_args': True})
+@pass_custom_ctx
+@click.pass_context
+@click.argument(
+    'cfg_name',
+    type     = click.STRING,
+    required = False,
+    default  = 'default',
+    envvar   = 'DA_CFG_NAME')
+@click.option(
+    '-f', '--foreground',
+    help    = 'Run in the foreground rather than as a daemon.',
+    is_flag = True,
+    default = False)
+@click.option(
+    '--stop',
+    help    = 'Stop the running continuous build service.',
+    is_flag = True,
+    default = False)
+def watch(click_ctx, da_ctx, cfg_name, foreground, stop):
+    """
+    Build the current LWC continuously as it is changed.
+
+    Each time design documents are changed, the
+    changed files are built with the CFG_NAME
+    build config, in the background and at low
+    priority. Builds that are made stale by newer
+    changes are cancelled.
+
+    Unlike 'da build', nothing is committed to (or
+    rolled back in) the LWC repository.
+
+    """
+    import da.watch as _watch
+
+    if stop:
+        return _watch.stop(dirpath_lwc_root = da_ctx['dirpath_lwc_root'])
+
+    cfg_extras = {
+        'build_context': {
+            'pid':              da_ctx['pid'],
+            'outer_cmd':        da_ctx['outer_cmd'],
+            'cmd_args':         da_ctx['args'],
+            'unmatched_args':   click_ctx.args
+        },
+        'paths': {
+            'dirpath_lwc_root': da_ctx['dirpath_lwc_root'],
+            'dirpath_cwd':      da_ctx['dirpath_cwd']
+        },
+        'options': {}
+    }
+    return _watch.main(cfg_key          = cfg_name,
+                       cfg_extras       = cfg_extras,
+                       dirpath_lwc_root = da_ctx['dirpath_lwc_root'],
+                       foreground       = foreground)
+
+
+# -----------------------------------------------------------------------------
+@main.command(
+    cls  = ExplicitInfoNameCommand,
+    name = 'index')
+@pass_custom_ctx
+@click.argument(
+    'idstr',
+    type     = click.STRING,
+    required = True)
+@click.option(
+    '-c', '--cfg_name',
+    help    = 'Build config whose index files are searched.',
+    type    = click.STRING,
+    default = 'default',
+    envvar  = 'DA_CFG_NAME')
+@click.option(
+    '-d', '--dirpath',
+    help    = 'Directory holding the index files.',
+    type    = click.Path(exists = True, file_okay = False),
+    default = None)
+@click.option(
+    '--json', 'as_json',
+    help    = 'Print the results as a JSON document.',
+    is_flag = True,
+    default = False)
+def index(da_ctx, idstr, cfg_name, dirpath, as_json):
+    """
+    Show where an identifier is defined, contained and referenced.
+
+    The index files written by the most recent
+    build with the CFG_NAME build config are
+    searched, unless a directory is given. Each
+    location is printed as relpath:line:col,
+    followed by the kind of location and (for
+    definitions and containers) the path to the
+    object within its YAML data structure.
+
+    """
+    import json
+    import da.index_query as _index_query
+
+    dirpath_lwc_root = da_ctx['dirpath_lwc_root']
+    if dirpath is None:
+        dirpath = _index_query.find_dirpath(
+                                        dirpath_lwc_root = dirpath_lwc_root,
+                                        cfg_name         = cfg_name)
+    if dirpath is None:
+        exit_application(
+            exit_code = 1,
+            message   = 'No index files found for build config: {cfg}'.format(
+                                                            cfg = cfg_name))
+
+    reader = _index_query.IndexReader(dirpath_index    = dirpath,
+                                      dirpath_lwc_root = dirpath_lwc_root)
+    try:
+        result = reader.lookup(idstr)
+    finally:
+        reader.close()
+
+    if as_json:
+        click.echo(json.dumps(result, indent = 4, sort_keys = True))
+        return
+
+    if result['idclass'] is None:
+        exit_application(
+            exit_code = 1,
+            message   = 'Not a registered identifier: {idstr}'.format(
+                                                            idstr = idstr))
+    for kind in ('definition', 'container', 'reference'):
+        for location in result[kind + 's']:
+            path = '.'.join(str(key) for key in location.get('path', ()))
+            click.echo('{relpath}:{line}:{col}: {kind} {path}'.format(
+                                            relpath = location['relpath'],
+                                            line    = location['line'],
+                                            col     = location['col'],
+                                            kind    = kind,
+                                            path    = path).rstrip())
+
+
 # -----------------------------------------------------------------------------
 @main.command(
     cls  = ExplicitInfoNameCommand,
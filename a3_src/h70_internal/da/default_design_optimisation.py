@@ -2,6 +2,60 @@
 """
 Default design proposal parameter optimisation module.
 
+Design parameters are tuned by building each of
+a number of candidate design configurations (or
+"deltas") on top of a defined baseline, and then
+evaluating an objective function for each build.
+
+The parameter space is declared in the optimisation
+section of the build configuration. Each parameter
+is identified by the dotted path of a configuration
+item (e.g. options.build_worker_count), and has a
+list of candidate values. A delta is a mapping from
+each parameter to one of its values, and is applied
+to the build configuration before it is built, so
+that it is available to the build and to the design
+being built. The delta is also recorded in the build
+configuration under the design_delta key.
+
+Three search strategies are supported:
+
+grid:               Every combination of values is
+                    built and evaluated.
+
+random:             A random sample of combinations
+                    (num_samples in all) is built and
+                    evaluated.
+
+successive_halving: A random sample of combinations
+                    is evaluated at a low budget
+                    (min_budget). The best fraction
+                    (1 / reduction_factor) of these
+                    are then evaluated again at a
+                    budget reduction_factor times
+                    larger, and so on, until only one
+                    remains. The budget is passed to
+                    the build in design_delta, so
+                    that the design can (for example)
+                    train for more or fewer epochs.
+                    It is None for the other
+                    strategies.
+
+Candidate builds are run concurrently, each in
+its own build directory. The objective function
+is given by the dotted name of a function which
+takes the build configuration of the delta and
+returns a number, where lower is better. If no
+objective function is configured, the wall clock
+time of the build is used.
+
+Objective values are memoised in a persistent cache,
+keyed by the baseline commit hash, the objective,
+the parameter vector and the budget, so that
+repeated optimisation runs never rebuild an
+identical configuration. The cache is kept in the
+build tmp dir, so it is cleared by clean_tmp_dir.
+
 ---
 type:
     python_module
@@ -30,13 +84,372 @@ license:
 ...
 """
 
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import random
+import time
+
 import da.exception
+import da.util
+import da.util.diskcache
+
+
+STRATEGIES = ('grid', 'random', 'successive_halving')
+
+# Objective values are tiny, so the cache is
+# never expected to approach this size.
+#
+_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Top level configuration items which differ
+# from one build to the next without changing
+# what is built. They are left out of the key
+# for cached objective values. The baseline is
+# identified by its hexsha instead.
+#
+_VOLATILE_CFG_KEYS = frozenset(('auto_commit_baseline',
+                                'baseline_results',
+                                'build_codename',
+                                'build_id',
+                                'changed_files',
+                                'defined_baseline',
+                                'paths',
+                                'safe_branch_name',
+                                'timestamp'))
+
+
+# -----------------------------------------------------------------------------
+def optimise_build(build_fcn, cfg):
+    """
+    Return the best design parameters found for the baseline described by cfg.
+
+    Each candidate delta is built with build_fcn,
+    which raises an exception if the build fails.
+    Failed candidates are treated as infeasible,
+    unless errors_abort_immediately is set, in
+    which case the first failure is raised.
+
+    """
+    settings   = cfg.get('optimisation', {})
+    parameters = settings.get('parameters', {})
+    strategy   = settings.get('strategy', 'grid')
+    rng        = random.Random(settings.get('seed', None))
+    num_sample = settings.get('num_samples', 8)
+
+    if strategy == 'grid':
+        trials = evaluate(build_fcn, cfg, list(grid(parameters)))
+
+    elif strategy == 'random':
+        trials = evaluate(build_fcn, cfg, sample(parameters, rng, num_sample))
+
+    elif strategy == 'successive_halving':
+        trials = successive_halving(
+                            build_fcn        = build_fcn,
+                            cfg              = cfg,
+                            candidates       = sample(parameters,
+                                                      rng,
+                                                      num_sample),
+                            min_budget       = settings.get('min_budget', 1),
+                            reduction_factor = settings.get(
+                                                    'reduction_factor', 2))
+
+    else:
+        raise da.exception.AbortWithoutStackTrace(
+            'Unknown optimisation strategy: {strategy}. '
+            'Expecting one of: {strategies}.'.format(
+                                strategy   = strategy,
+                                strategies = ', '.join(STRATEGIES)))
+
+    if not trials:
+        raise da.exception.AbortWithoutStackTrace(
+                        'No candidate design configurations to optimise.')
+    final_budget = trials[-1]['budget']
+    best         = min((trial for trial in trials
+                        if trial['budget'] == final_budget),
+                       key = lambda trial: trial['objective'])
+    if math.isinf(best['objective']):
+        raise da.exception.AbortWithoutStackTrace(
+                'No feasible design configuration was found for {ref}.'.format(
+                                    ref = cfg['defined_baseline']['hexsha']))
+    logging.info('Best design parameters: %s (objective: %s)',
+                 best['parameters'], best['objective'])
+    return {'parameters': best['parameters'],
+            'objective':  best['objective'],
+            'trials':     trials}
+
+
+# -----------------------------------------------------------------------------
+def grid(parameters):
+    """
+    Yield every combination of parameter values, in a deterministic order.
+
+    """
+    names = sorted(parameters)
+    for index in range(_num_combinations(parameters)):
+        yield _combination(parameters, names, index)
+
+
+# -----------------------------------------------------------------------------
+def sample(parameters, rng, num_samples):
+    """
+    Return a list of distinct combinations of parameter values chosen by rng.
+
+    Combinations are chosen by index, so the
+    full grid is never enumerated. If the grid
+    has no more than num_samples combinations,
+    all of them are returned.
+
+    """
+    names    = sorted(parameters)
+    num_grid = _num_combinations(parameters)
+    if num_grid <= num_samples:
+        return list(grid(parameters))
+    return [_combination(parameters, names, index)
+            for index in rng.sample(range(num_grid), num_samples)]
+
+
+# -----------------------------------------------------------------------------
+def _num_combinations(parameters):
+    """
+    Return the number of combinations of parameter values.
+
+    """
+    num = 1
+    for values in parameters.values():
+        num *= len(values)
+    return num
 
 
 # -----------------------------------------------------------------------------
-def optimise_build(build_fcn, cfg):                     # pylint: disable=W0613
+def _combination(parameters, names, index):
     """
-    Run design proposal parameter optimisation.
+    Return the combination of parameter values with the specified index.
+
+    The index is decoded as a mixed radix number,
+    with the last name varying fastest.
 
     """
-    raise da.exception.ImplementationNotPresentError()
+    combination = {}
+    for name in reversed(names):
+        values = parameters[name]
+        (index, digit)    = divmod(index, len(values))
+        combination[name] = values[digit]
+    return {name: combination[name] for name in names}
+
+
+# -----------------------------------------------------------------------------
+def successive_halving(build_fcn,                       # pylint: disable=R0913
+                       cfg,
+                       candidates,
+                       min_budget,
+                       reduction_factor):
+    """
+    Return trials from successive rounds of evaluation of fewer candidates.
+
+    Each round evaluates the candidates at a
+    budget reduction_factor times larger than the
+    previous round, keeping the best 1 in every
+    reduction_factor for the next round. The last
+    round evaluates a single candidate.
+
+    """
+    if reduction_factor < 2:
+        raise da.exception.AbortWithoutStackTrace(
+                        'Optimisation reduction_factor must be at least 2.')
+    trials = []
+    budget = min_budget
+    while True:
+        round_trials = evaluate(build_fcn, cfg, candidates, budget)
+        trials.extend(round_trials)
+        if len(candidates) <= 1:
+            return trials
+        num_kept   = int(math.ceil(len(candidates) / reduction_factor))
+        ranked     = sorted(round_trials,
+                            key = lambda trial: trial['objective'])
+        candidates = [trial['parameters'] for trial in ranked[:num_kept]]
+        budget    *= reduction_factor
+
+
+# -----------------------------------------------------------------------------
+def evaluate(build_fcn, cfg, candidates, budget = None):
+    """
+    Return a trial record for each candidate, building them concurrently.
+
+    Trials are returned in the same order as the
+    candidates. Objective values which are found
+    in the cache are not rebuilt. Failed builds
+    are not cached, so they are retried the next
+    time that they are evaluated.
+
+    """
+    settings = cfg.get('optimisation', {})
+    num_max  = settings.get('concurrency', 1)
+    if num_max < 1:
+        num_max = multiprocessing.cpu_count()
+    num_max = min(num_max, max(len(candidates), 1))
+
+    # Each concurrent build has its own build
+    # directory, identified by a slot number.
+    #
+    slots = queue.Queue()
+    for slot in range(num_max):
+        slots.put(slot)
+
+    cache = da.util.diskcache.DiskCache(
+                dirpath   = os.path.join(cfg['paths']['dirpath_meta_cache'],
+                                         'objective'),
+                max_bytes = _CACHE_MAX_BYTES)
+
+    def _trial(parameters):
+        """
+        Return a trial record for a single candidate.
+
+        """
+        key       = _cache_key(cfg, parameters, budget)
+        objective = cache.get(key)
+        is_cached = objective is not None
+        if not is_cached:
+            slot = slots.get()
+            try:
+                objective = _build_and_evaluate(
+                    build_fcn = build_fcn,
+                    cfg       = delta_cfg(cfg, parameters, budget, slot,
+                                          is_concurrent = num_max > 1))
+            finally:
+                slots.put(slot)
+            if not math.isinf(objective):
+                cache.put(key, objective)
+        logging.info('Design delta %s (budget %s): objective %s%s',
+                     parameters, budget, objective,
+                     ' (cached)' if is_cached else '')
+        return {'parameters': parameters,
+                'budget':     budget,
+                'objective':  objective,
+                'is_cached':  is_cached}
+
+    with concurrent.futures.ThreadPoolExecutor(num_max) as executor:
+        return list(executor.map(_trial, candidates))
+
+
+# -----------------------------------------------------------------------------
+def delta_cfg(cfg, parameters, budget, slot, is_concurrent = False):
+    """
+    Return the build configuration for a delta on top of the baseline cfg.
+
+    Parameter values are applied to the build
+    configuration, which is also given a build id
+    and build directory of its own. The persistent
+    build server serves one build at a time, so it
+    is not used for concurrent builds. When the
+    objective is the wall clock time of the build,
+    the artifact store is not used, as a build
+    which is a cache hit takes no time at all.
+
+    """
+    delta_id          = hashlib.sha1(json.dumps(
+                                parameters, sort_keys = True).encode(
+                                                'utf-8')).hexdigest()[:8]
+    dirpath_delta_tmp = os.path.join(cfg['paths']['dirpath_branch_tmp'],
+                                     'delta',
+                                     str(slot))
+    overlay = {
+        'design_delta': {
+            'id':                   delta_id,
+            'parameters':           parameters,
+            'budget':               budget
+        },
+        'build_id':                 '{build_id}.{delta_id}'.format(
+                                            build_id = cfg['build_id'],
+                                            delta_id = delta_id),
+        'paths': {
+            'dirpath_branch_tmp':   dirpath_delta_tmp,
+            'dirpath_branch_log':   os.path.join(dirpath_delta_tmp, 'log')
+        }
+    }
+    overlay['options'] = {}
+    if is_concurrent:
+        overlay['options']['enable_build_server'] = False
+    if cfg.get('optimisation', {}).get('objective', None) is None:
+        overlay['options']['enable_artifact_store'] = False
+    return da.util.merge_dicts(cfg, da.util.merge_dicts(_nested(parameters),
+                                                        overlay))
+
+
+# -----------------------------------------------------------------------------
+def _nested(parameters):
+    """
+    Return a nested dict equivalent to a dict keyed by dotted paths.
+
+    """
+    nested = {}
+    for (dotted_path, value) in parameters.items():
+        keys  = dotted_path.split('.')
+        inner = nested
+        for key in keys[:-1]:
+            inner = inner.setdefault(key, {})
+        inner[keys[-1]] = value
+    return nested
+
+
+# -----------------------------------------------------------------------------
+def _cache_key(cfg, parameters, budget):
+    """
+    Return the cache key for the objective value of a delta.
+
+    The key includes the build configuration, so
+    changes to options or steps which are not
+    design parameters also invalidate the cache.
+
+    """
+    stable_cfg = {key: value for (key, value) in cfg.items()
+                                        if key not in _VOLATILE_CFG_KEYS}
+    return da.util.diskcache.DiskCache.key(
+                        cfg['defined_baseline']['hexsha'],
+                        cfg.get('optimisation', {}).get('objective', None),
+                        json.dumps(parameters, sort_keys = True),
+                        budget,
+                        json.dumps(stable_cfg,
+                                   sort_keys = True,
+                                   default   = str))
+
+
+# -----------------------------------------------------------------------------
+def _build_and_evaluate(build_fcn, cfg):
+    """
+    Build a delta and return the value of the objective function for it.
+
+    The value is infinite if the build fails.
+
+    """
+    objective = cfg.get('optimisation', {}).get('objective', None)
+    try:
+        time_start = time.monotonic()
+        build_fcn(cfg)
+        time_end   = time.monotonic()
+
+    except da.exception.AbortSilently:
+        raise
+
+    # Pylint rule W0703 (broad-except) disabled.
+    # A delta which does not build is simply an
+    # infeasible design configuration; we only
+    # stop if we are configured to stop on the
+    # first error.
+    #
+    except Exception as err:                            # pylint: disable=W0703
+        if cfg['options'].get('errors_abort_immediately', False):
+            raise
+        logging.warning('Design delta %s failed to build: %s',
+                        cfg['design_delta']['parameters'], repr(err))
+        return math.inf
+
+    if objective is None:
+        return time_end - time_start
+    return float(da.util.import_fcn(objective)(cfg))
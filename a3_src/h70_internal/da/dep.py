@@ -30,7 +30,11 @@ license:
 ...
 """
 
+import concurrent.futures
+import hashlib
+import json
 import logging
+import multiprocessing
 import os
 import re
 import shutil
@@ -42,9 +46,18 @@ import da.lwc
 import da.lwc.discover
 import da.lwc.env
 import da.lwc.run
+import da.machine
 import da.util
 
 
+# Each dependency built has a manifest recording
+# the inputs to, and outputs from, its last build.
+#
+_MANIFEST_FILENAME = 'build.manifest.json'
+
+_VCS_DIRNAMES = ('.bzr', '.git', '.hg', '.svn', '_darcs')
+
+
 # -----------------------------------------------------------------------------
 @da.log.trace
 def build(dirpath_lwc_root, dirpath_log, dep_build_cfg):
@@ -54,6 +67,12 @@ def build(dirpath_lwc_root, dirpath_log, dep_build_cfg):
     For all dependencies that support it, build executables
     that are compatible with the current runtime environment.
 
+    Dependencies are built in a bounded pool of
+    concurrent jobs, each of which starts once
+    the build prerequisites declared for it in the
+    dependencies register have been built. Each
+    job writes its own log files.
+
     """
     limitation = dep_build_cfg['limitation']
     exclusion  = dep_build_cfg['exclusion']
@@ -84,6 +103,7 @@ def build(dirpath_lwc_root, dirpath_log, dep_build_cfg):
     keylist.remove('setuptools')
     keylist.insert(0, 'setuptools')
 
+    selected = []
     for key in keylist:
 
         # Skip dependency module if it matches our
@@ -98,13 +118,53 @@ def build(dirpath_lwc_root, dirpath_log, dep_build_cfg):
         if (limitation is not None) and (not re.match(limitation, key)):
             continue
 
-        if dep_build_cfg['enable_dep_fetch_src']:
-            logging.debug('Fetch source for: %s', key)
-            _fetch_dependency_source_files(register[key])
+        selected.append(key)
 
-        if dep_build_cfg['enable_dep_build']:
-            logging.debug('Build: %s', key)
-            _build_dependency(register[key], dirpath_log, dirpath_lwc_root)
+    # Dependencies may declare other dependencies
+    # that must be built before they are (e.g.
+    # for Cython headers). Prerequisites that are
+    # not selected are assumed to be built already.
+    #
+    prerequisites = _prerequisites(register, selected)
+    order         = _build_order(prerequisites, selected)
+
+    # Sources are fetched concurrently, through a
+    # local mirror of each remote repository. The
+    # mirrors are kept outside of the environment
+    # directory, so a fresh environment can be
+    # populated from them with only an incremental
+    # fetch from each remote.
+    #
+    if dep_build_cfg['enable_dep_fetch_src']:
+        dirpath_mirror = dep_build_cfg.get('dirpath_mirror', None)
+        if dirpath_mirror is None:
+            dirpath_mirror = os.path.join(
+                    da.lwc.discover.path('tmp',
+                                         dirpath_lwc_root = dirpath_lwc_root),
+                    'dep_mirror')
+        _run_concurrently(
+            job_fcn       = lambda key: _fetch_dependency_source_files(
+                                                            register[key],
+                                                            dirpath_mirror),
+            prerequisites = {key: set() for key in order},
+            order         = order,
+            num_workers   = dep_build_cfg.get('fetch_concurrency', 1))
+
+    if dep_build_cfg['enable_dep_build']:
+        enable_cache = dep_build_cfg.get('enable_cache', True)
+        _run_concurrently(
+            job_fcn       = lambda key: _build_dependency(
+                                    dep               = register[key],
+                                    dirpath_log       = dirpath_log,
+                                    dirpath_lwc_root  = dirpath_lwc_root,
+                                    prerequisite_deps = [
+                                        register[name] for name
+                                        in register[key]['build'].get(
+                                                            'requires', [])],
+                                    enable_cache      = enable_cache),
+            prerequisites = prerequisites,
+            order         = order,
+            num_workers   = dep_build_cfg.get('concurrency', 1))
 
     # Log missing configuration and documentation
     # dirpath_env    = da.lwc.discover.path('env')
@@ -120,9 +180,152 @@ def build(dirpath_lwc_root, dirpath_log, dep_build_cfg):
     return
 
 
+# -----------------------------------------------------------------------------
+def _prerequisites(register, keylist):
+    """
+    Return a map from each key to the set of its prerequisites in keylist.
+
+    Prerequisites are declared in the requires list
+    in the build section of each register entry.
+
+    """
+    selected      = set(keylist)
+    prerequisites = {}
+    for key in keylist:
+        requires = register[key]['build'].get('requires', [])
+        unknown  = [name for name in requires if name not in register]
+        if unknown:
+            raise da.exception.AbortWithoutStackTrace(
+                'Unknown build prerequisites for {dep}: {names}'.format(
+                                                dep   = key,
+                                                names = ', '.join(unknown)))
+        prerequisites[key] = set(requires) & selected
+    return prerequisites
+
+
+# -----------------------------------------------------------------------------
+def _build_order(prerequisites, keylist):
+    """
+    Return keylist sorted so that each key follows all of its prerequisites.
+
+    Otherwise, keys stay in the same order as in
+    keylist. An exception is raised if there is a
+    cycle of prerequisites.
+
+    """
+    remaining = {key: set(prerequisites[key]) for key in keylist}
+    order     = []
+    while remaining:
+        ready = [key for key in keylist
+                 if key in remaining and not remaining[key]]
+        if not ready:
+            raise da.exception.AbortWithoutStackTrace(
+                'Cycle in dependency build prerequisites: {names}'.format(
+                                    names = ', '.join(sorted(remaining))))
+        for key in ready:
+            del remaining[key]
+        for unbuilt in remaining.values():
+            unbuilt.difference_update(ready)
+        order.extend(ready)
+    return order
+
+
+# -----------------------------------------------------------------------------
+def _run_concurrently(job_fcn, prerequisites, order, num_workers):
+    """
+    Call job_fcn for each key in order, after the jobs for its prerequisites.
+
+    Up to num_workers jobs are run at the same
+    time (one per CPU if num_workers is less than
+    one). Keys that are ready are started in the
+    specified order. If a job fails, no more jobs
+    are started, but those that are already in
+    progress are allowed to finish before the
+    first error is raised.
+
+    """
+    if num_workers < 1:
+        num_workers = multiprocessing.cpu_count()
+    remaining = {key: set(prerequisites[key]) for key in order}
+    pending   = {}
+    error     = None
+    with concurrent.futures.ThreadPoolExecutor(num_workers) as executor:
+        while True:
+
+            if error is None:
+                _submit_ready(executor, job_fcn, order, remaining, pending,
+                              num_workers)
+
+            if not pending:
+                break
+
+            (done, _) = concurrent.futures.wait(
+                        pending,
+                        return_when = concurrent.futures.FIRST_COMPLETED)
+            err = _collect_done(done, pending, remaining)
+            if error is None:
+                error = err
+
+    if error is not None:
+        raise error
+
+
+# -----------------------------------------------------------------------------
+def _submit_ready(executor,                             # pylint: disable=R0913
+                  job_fcn,
+                  order,
+                  remaining,
+                  pending,
+                  num_workers):
+    """
+    Submit jobs with no unfinished prerequisites, up to num_workers in total.
+
+    Submitted keys are removed from remaining and
+    the futures for them are added to pending.
+
+    """
+    for key in order:
+        if len(pending) >= num_workers:
+            break
+        if key in remaining and not remaining[key]:
+            del remaining[key]
+            pending[executor.submit(job_fcn, key)] = key
+
+
+# -----------------------------------------------------------------------------
+def _collect_done(done, pending, remaining):
+    """
+    Record the completion of finished jobs; return the first error, if any.
+
+    Jobs which succeed are removed from the
+    prerequisites of the jobs which remain.
+
+    """
+    error = None
+    for future in done:
+        key = pending.pop(future)
+
+        # Pylint rule W0703 (broad-except) disabled.
+        # The error is re-raised once the jobs in
+        # progress have finished, so that their
+        # log files are complete.
+        #
+        try:
+            future.result()
+        except Exception as err:                        # pylint: disable=W0703
+            logging.error('Dependency job failed: %s', key)
+            if error is None:
+                error = err
+            continue
+
+        for unfinished in remaining.values():
+            unfinished.discard(key)
+    return error
+
+
 # -----------------------------------------------------------------------------
 @da.log.trace
-def _fetch_dependency_source_files(dep):
+def _fetch_dependency_source_files(dep, dirpath_mirror):
     """
     Fetch and update source files for the specified dependency.
 
@@ -135,6 +338,8 @@ def _fetch_dependency_source_files(dep):
     if dep['config']['method'] == 'manual':
         return
 
+    logging.debug('Fetch source for: %s', dep['name'])
+
     tool    = dep['config']['tool']
 
     configuration_function_table = {
@@ -149,7 +354,7 @@ def _fetch_dependency_source_files(dep):
     if tool in configuration_function_table:
 
         configuration_function = configuration_function_table[tool]
-        configuration_function(dep)
+        configuration_function(dep, dirpath_mirror)
 
     else:
         raise da.exception.ImplementationNotPresentError(
@@ -157,7 +362,7 @@ def _fetch_dependency_source_files(dep):
 
 
 # -----------------------------------------------------------------------------
-def _bzr_update(_):
+def _bzr_update(*_):
     """
     Update dependency source design documents using Bazaar.
 
@@ -167,19 +372,28 @@ def _bzr_update(_):
 
 
 # -----------------------------------------------------------------------------
-def _git_update(dep):
+def _git_update(dep, dirpath_mirror):
     """
     Update dependency source design documents using Git.
 
+    The working copy is cloned from (and fetches
+    from) a local mirror of the remote repository,
+    which is itself updated from the remote first.
+
     """
     import git
     import da.vcs as _vcs  # Rename to prevent conflict w/outer da import.
     try:
 
         da.util.ensure_dir_exists(dep['dirpath_src'])
-        _vcs.delete_untracked(dep['dirpath_src'])
+        try:
+            _vcs.delete_untracked(dep['dirpath_src'])
+        except git.exc.InvalidGitRepositoryError:
+            pass  # Not cloned yet.
         _vcs.ensure_cloned(dirpath_local = dep['dirpath_src'],
-                           url_remote    = dep['config']['url'],
+                           url_remote    = _vcs.ensure_mirrored(
+                                                dirpath_mirror,
+                                                dep['config']['url']),
                            ref           = _get_version(dep))
 
     except git.GitCommandError:
@@ -191,7 +405,7 @@ def _git_update(dep):
 
 
 # -----------------------------------------------------------------------------
-def _darcs_update(_):
+def _darcs_update(*_):
     """
     Update dependency source design documents using Darcs.
 
@@ -201,7 +415,7 @@ def _darcs_update(_):
 
 
 # -----------------------------------------------------------------------------
-def _hg_update(_):
+def _hg_update(*_):
     """
     Update dependency source design documents using Mercurial.
 
@@ -211,7 +425,7 @@ def _hg_update(_):
 
 
 # -----------------------------------------------------------------------------
-def _svn_update(_):
+def _svn_update(*_):
     """
     Update dependency source design documents using Subversion.
 
@@ -221,7 +435,7 @@ def _svn_update(_):
 
 
 # -----------------------------------------------------------------------------
-def _manual_update(_):
+def _manual_update(*_):
     """
     Update dependency source design documents manually.
 
@@ -264,16 +478,46 @@ def _get_version(dep):
 
 # -----------------------------------------------------------------------------
 @da.log.trace
-def _build_dependency(dep, dirpath_log, dirpath_lwc_root):
+def _build_dependency(dep,                              # pylint: disable=R0913
+                      dirpath_log,
+                      dirpath_lwc_root,
+                      prerequisite_deps = (),
+                      enable_cache      = True):
     """
     Construct the dependency from its design documents.
 
+    If the cache is enabled, the dependency is
+    only rebuilt if its inputs have changed since
+    it was last built, or if its outputs no longer
+    match those recorded in its build manifest.
+
     """
     if dep['build']['method'] == 'manual':
         logging.debug('Manual build. (Skip)')
         return
 
-    elif dep['build']['tool'] == 'python_distutils':
+    if dep['build']['tool'] not in ('python_distutils', 'python_setuptools'):
+        raise RuntimeError(
+                    'Did not recognise build tool for {dep}'.format(
+                                                                dep = dep))
+
+    # Some builds generate files in the source
+    # tree (e.g. from Cython sources, or egg-info
+    # metadata), so the inputs are recorded as
+    # they were before the build.
+    #
+    inputs = _manifest_inputs(dep, prerequisite_deps)
+    if enable_cache and _is_up_to_date(dep, inputs):
+        logging.debug('Up to date: %s (Skip)', dep['name'])
+        return
+
+    # The manifest no longer describes what is
+    # installed, even if the build fails.
+    #
+    if os.path.isfile(_manifest_filepath(dep)):
+        os.remove(_manifest_filepath(dep))
+
+    if dep['build']['tool'] == 'python_distutils':
         logging.debug('Build python library using distutils')
         _build_python_library(
                     dep              = dep,
@@ -297,10 +541,7 @@ def _build_dependency(dep, dirpath_log, dirpath_lwc_root):
     #             --mandir=man
     #             --xdgdatadir=xdg && make && make install
 
-    else:
-        raise RuntimeError(
-                    'Did not recognise build tool for {dep}'.format(
-                                                                dep = dep))
+    _write_manifest(dep, inputs)
 
 
 # -----------------------------------------------------------------------------
@@ -387,12 +628,192 @@ def _build_python_library(dep, dirpath_log, extra_args, dirpath_lwc_root):
     #
     _remove_temp_dir_or_throw(dirpath_build)
 
-    # Calculate checksum of input files.
-    # Calculate checksum of output files.
+    # Checksums of input and output files are
+    # recorded in the build manifest by the caller.
     # Get semantic version of input files from repo.
     # Get version ID of input files from repo.
 
 
+# -----------------------------------------------------------------------------
+def _manifest_inputs(dep, prerequisite_deps):
+    """
+    Return a record of the inputs to the build of the specified dependency.
+
+    The outputs of prerequisites are identified
+    by the output digest in their own manifests,
+    so a dependency is rebuilt if any of its
+    prerequisites produce different outputs.
+
+    """
+    prerequisites = {}
+    for prerequisite in prerequisite_deps:
+        manifest = _read_manifest(prerequisite) or {}
+        prerequisites[prerequisite['name']] = manifest.get('output_digest')
+    return {
+        'source_digest':    _source_digest(dep['dirpath_src']),
+        'policy':           dep['policy'],
+        'env_id':           da.machine.env_id(),
+        'tool':             dep['build']['tool'],
+        'api':              dep['api'],
+        'prerequisites':    prerequisites
+    }
+
+
+# -----------------------------------------------------------------------------
+def _is_up_to_date(dep, inputs):
+    """
+    Return True if the dependency was built from inputs and is unchanged since.
+
+    """
+    manifest = _read_manifest(dep)
+    if manifest is None or manifest['inputs'] != inputs:
+        return False
+    if _output_digests(dep) != manifest['outputs']:
+        logging.warning('Outputs changed since last build: %s', dep['name'])
+        return False
+    return True
+
+
+# -----------------------------------------------------------------------------
+def _read_manifest(dep):
+    """
+    Return the build manifest for the dependency, or None if there is none.
+
+    """
+    try:
+        with open(_manifest_filepath(dep), 'rt') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+# -----------------------------------------------------------------------------
+def _write_manifest(dep, inputs):
+    """
+    Record the inputs and outputs of the build of the specified dependency.
+
+    The manifest is replaced atomically, so an
+    interrupted write never leaves behind one
+    that could be mistaken for a valid record.
+
+    """
+    outputs  = _output_digests(dep)
+    manifest = {
+        'inputs':           inputs,
+        'outputs':          outputs,
+        'output_digest':    hashlib.sha256(json.dumps(
+                                outputs, sort_keys = True).encode(
+                                                        'utf-8')).hexdigest()
+    }
+    filepath = _manifest_filepath(dep)
+    da.util.ensure_dir_exists(os.path.dirname(filepath))
+    with open(filepath + '.tmp', 'wt') as file:
+        json.dump(manifest, file, indent = 4, sort_keys = True)
+    os.replace(filepath + '.tmp', filepath)
+
+
+# -----------------------------------------------------------------------------
+def _manifest_filepath(dep):
+    """
+    Return the path of the build manifest for the specified dependency.
+
+    """
+    return os.path.join(dep['dirpath_dep'], _MANIFEST_FILENAME)
+
+
+# -----------------------------------------------------------------------------
+def _output_digests(dep):
+    """
+    Return a map from relpath to digest for each file built for dependency.
+
+    Compiled bytecode is not included, as it may
+    be rewritten whenever the library is imported.
+
+    """
+    digests = {}
+    for (api_name, relpath_api) in dep['api'].items():
+        if api_name not in ('lib_python2', 'lib_python3'):
+            continue
+        dirpath_dst = os.path.join(dep['dirpath_dep'], relpath_api)
+        for (dirpath, dirnames, filenames) in os.walk(dirpath_dst):
+            if '__pycache__' in dirnames:
+                dirnames.remove('__pycache__')
+            for filename in filenames:
+                if filename.endswith('.pyc'):
+                    continue
+                filepath = os.path.join(dirpath, filename)
+                digests[os.path.relpath(filepath, dep['dirpath_dep'])] = (
+                                                        _file_digest(filepath))
+    return digests
+
+
+# -----------------------------------------------------------------------------
+def _source_digest(dirpath_src):
+    """
+    Return a digest which identifies the source of a dependency.
+
+    For a git working copy, only tracked files
+    are identified (by the tree hash of HEAD and
+    any changes made to them), so files that are
+    generated in the source tree by the build are
+    ignored. Other source trees are hashed in full.
+
+    """
+    if not os.path.isdir(os.path.join(dirpath_src, '.git')):
+        return _tree_digest(dirpath_src)
+    import git
+    try:
+        repo = git.Repo(dirpath_src)
+        tree = repo.head.commit.tree.hexsha
+        diff = repo.git.diff('HEAD', '--binary')
+    except (git.exc.InvalidGitRepositoryError,
+            git.exc.GitCommandError,
+            ValueError):
+        return _tree_digest(dirpath_src)
+    hasher = hashlib.sha256(tree.encode('utf-8'))
+    hasher.update(b'\0')
+    hasher.update(diff.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+# -----------------------------------------------------------------------------
+def _tree_digest(dirpath_root):
+    """
+    Return a digest of the paths and content of files under dirpath_root.
+
+    VCS metadata is not included.
+
+    """
+    hasher = hashlib.sha256()
+    for (dirpath, dirnames, filenames) in os.walk(dirpath_root):
+        dirnames[:] = sorted(name for name in dirnames
+                             if name not in _VCS_DIRNAMES)
+        for filename in sorted(filenames):
+            filepath = os.path.join(dirpath, filename)
+            hasher.update(os.path.relpath(filepath,
+                                          dirpath_root).encode('utf-8'))
+            hasher.update(b'\0')
+            if os.path.islink(filepath):
+                hasher.update(os.readlink(filepath).encode('utf-8'))
+            else:
+                hasher.update(_file_digest(filepath).encode('utf-8'))
+            hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+# -----------------------------------------------------------------------------
+def _file_digest(filepath):
+    """
+    Return a digest of the content of the specified file.
+
+    """
+    hasher = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
 # -----------------------------------------------------------------------------
 @da.log.trace
 def _prep_log_files(dirpath_log, dep_id, api_name):
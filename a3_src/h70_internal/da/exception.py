@@ -69,6 +69,20 @@ class AbortSilently(Exception):
     pass
 
 
+# =============================================================================
+class BuildAborted(AbortSilently):
+    """
+    Exception to be raised when the metabuild has asked a build to abort.
+
+    This happens when a build for another baseline
+    has failed, and the error for that build has
+    already been displayed.
+
+    """
+
+    pass
+
+
 # =============================================================================
 class AbortWithoutStackTrace(Exception):
     """
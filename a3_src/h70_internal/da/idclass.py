@@ -37,6 +37,7 @@ license:
 
 import re
 
+import da.memo
 import da.register
 
 
@@ -45,6 +46,37 @@ def regex_table(dirpath_lwc_root):
     """
     Build table of regular expressions to detect controlled item identifiers.
 
+    """
+    return {idclass: re.compile(expr)
+            for (idclass, expr) in _expr_table(dirpath_lwc_root).items()}
+
+
+# -----------------------------------------------------------------------------
+@da.memo.var
+def combined_regex(dirpath_lwc_root):
+    """
+    Return a single regular expression matching any registered identifier.
+
+    The expression for each identifier class is
+    wrapped in a group named after the class, and
+    the groups are combined into one alternation in
+    register order, so the lastgroup attribute of a
+    match gives the first class in the register
+    which matches. This lets the class of each
+    identifier be found with a single match rather
+    than by trying each expression in turn.
+
+    """
+    return re.compile('|'.join(
+        '(?P<{idclass}>{expr})'.format(idclass = idclass, expr = expr)
+        for (idclass, expr) in _expr_table(dirpath_lwc_root).items()))
+
+
+# -----------------------------------------------------------------------------
+def _expr_table(dirpath_lwc_root):
+    """
+    Return a map from identifier class to regular expression source text.
+
     """
     register = da.register.load(register_name    = 'idclass',
                                 dirpath_lwc_root = dirpath_lwc_root)
@@ -57,5 +89,4 @@ def regex_table(dirpath_lwc_root):
                                                             pfx = spec['pfix'],
                                                             dgt = spec['dgts'])
         tab[idclass] = expr
-    tab = {key: re.compile(val) for key, val in tab.items()}
     return tab
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Static import graph for Python source documents in the local working copy.
+
+When only a handful of files have changed, we want
+to re-check the changed files together with every
+module that (directly or indirectly) imports them,
+and nothing else. This module maintains a static
+import graph over the source tree for that purpose.
+
+The graph is built from Import and ImportFrom nodes
+in the (cached) syntax tree of each Python file, and
+is maintained incrementally: only files which have
+changed since the graph was last saved are re-read,
+and only files with changed content are re-parsed.
+
+Module names are resolved against the top level
+directories under a3_src, which are the directories
+that get added to the python import path.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import ast
+import collections
+import hashlib
+import json
+import os
+
+import da.ast_cache
+import da.lwc.discover
+import da.lwc.file
+import da.python_source
+import da.util
+
+
+# -----------------------------------------------------------------------------
+def update(filepath_graph, dirpath_lwc_root, ast_cache = None):
+    """
+    Return the import graph for the LWC, updating the saved copy on disk.
+
+    The graph is a mapping from the path of each
+    Python file (relative to the src directory) to
+    a record holding the file's size, mtime, content
+    digest and the list of absolute names of the
+    modules that it imports.
+
+    """
+    dirpath_src = da.lwc.discover.path(key              = 'src',
+                                       dirpath_lwc_root = dirpath_lwc_root)
+    graph_old   = _load(filepath_graph)
+    graph_new   = {}
+    for filepath in da.lwc.discover.gen_src_files(dirpath_lwc_root):
+        if not da.lwc.file.is_python_file(filepath):
+            continue
+        relpath = os.path.relpath(filepath, dirpath_src)
+        graph_new[relpath] = _update_record(filepath,
+                                            relpath,
+                                            graph_old.get(relpath),
+                                            ast_cache)
+    if graph_new != graph_old:
+        _save(filepath_graph, graph_new)
+    return graph_new
+
+
+# -----------------------------------------------------------------------------
+def open_graph(cfg):
+    """
+    Return the up to date import graph for the isolated source tree.
+
+    The graph is saved in the build cache directory,
+    and syntax trees are shared with the AST cache,
+    if it is enabled.
+
+    """
+    return update(
+        filepath_graph   = os.path.join(cfg['paths']['dirpath_meta_cache'],
+                                        'import_graph.json'),
+        dirpath_lwc_root = cfg['paths']['dirpath_isolated_src'],
+        ast_cache        = da.ast_cache.open_cache(cfg))
+
+
+# -----------------------------------------------------------------------------
+def dependencies(graph, relpath):
+    """
+    Return a sorted list of the files which the specified file imports.
+
+    The (forward) dependency closure of the file
+    is returned: every file which it imports
+    either directly or indirectly, including the
+    packages which contain them. The file itself
+    is not included.
+
+    """
+    module_index = {module_name(relpath): relpath for relpath in graph}
+    found        = set()
+    queue        = collections.deque([relpath])
+    while queue:
+        record = graph.get(queue.popleft(), None)
+        if record is None:
+            continue
+        for name in record['imports']:
+            for candidate in _self_and_parents(name):
+                imported = module_index.get(candidate, None)
+                if imported is not None and imported not in found:
+                    found.add(imported)
+                    queue.append(imported)
+    found.discard(relpath)
+    return sorted(found)
+
+
+# -----------------------------------------------------------------------------
+def dependents(graph, relpath_list):
+    """
+    Return (distance, relpath) tuples for files which import the listed files.
+
+    The reverse dependency closure of the specified
+    files is returned, with each file tagged by its
+    distance (in import edges) from the nearest of
+    the specified files, and sorted by distance.
+    The specified files themselves are not included.
+
+    """
+    module_index = {module_name(relpath): relpath for relpath in graph}
+    importers    = collections.defaultdict(set)
+    for (relpath, record) in graph.items():
+        for name in record['imports']:
+            for candidate in _self_and_parents(name):
+                if candidate in module_index:
+                    importers[module_index[candidate]].add(relpath)
+
+    distance = {relpath: 0 for relpath in relpath_list}
+    queue    = collections.deque(relpath_list)
+    while queue:
+        relpath = queue.popleft()
+        for importer in sorted(importers[relpath]):
+            if importer not in distance:
+                distance[importer] = distance[relpath] + 1
+                queue.append(importer)
+
+    return sorted((dist, relpath) for (relpath, dist) in distance.items()
+                                                            if dist > 0)
+
+
+# -----------------------------------------------------------------------------
+def module_name(relpath):
+    """
+    Return the absolute module name for a path relative to the src directory.
+
+    The first component of the path is the top level
+    directory which is placed on the import path, so
+    it does not form part of the module name.
+
+    """
+    parts = os.path.splitext(os.path.normpath(relpath))[0].split(os.sep)[1:]
+    if parts and parts[-1] == '__init__':
+        parts = parts[:-1]
+    return '.'.join(parts)
+
+
+# -----------------------------------------------------------------------------
+def imported_modules(root, name, is_package = False):
+    """
+    Return a sorted list of the absolute names of modules imported by root.
+
+    Names imported with "from x import y" are
+    included both as x and as x.y, as y may be
+    either a submodule or a member of x. Imports
+    anywhere in the module are included, not just
+    those at the top level.
+
+    """
+    package = name if is_package else name.rpartition('.')[0]
+    names   = set()
+    for node in ast.walk(root):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package
+                for _ in range(node.level - 1):
+                    base = base.rpartition('.')[0]
+                base = '.'.join(part for part in (base, node.module) if part)
+            else:
+                base = node.module
+            if not base:
+                continue
+            names.add(base)
+            names.update('{base}.{name}'.format(base = base, name = alias.name)
+                         for alias in node.names if alias.name != '*')
+    return sorted(names)
+
+
+# -----------------------------------------------------------------------------
+def _update_record(filepath, relpath, record, ast_cache):
+    """
+    Return an up to date graph record for the specified file.
+
+    """
+    stat      = os.stat(filepath)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    if record is not None and record['signature'] == signature:
+        return record
+
+    with open(filepath, 'rb') as file:
+        content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if record is not None and record['digest'] == digest:
+        return dict(record, signature = signature)
+
+    # The AST cache is keyed on the same (short)
+    # module name that is used by the rest of the
+    # build, so the ASTs parsed here are shared.
+    #
+    is_package = os.path.basename(relpath) == '__init__.py'
+    try:
+        (root, _) = da.ast_cache.parse(
+                    source_text = content.decode('utf-8'),
+                    module_name = da.python_source.get_module_name(filepath),
+                    cache       = ast_cache)
+        imports   = imported_modules(root       = root,
+                                     name       = module_name(relpath),
+                                     is_package = is_package)
+    except (SyntaxError, UnicodeDecodeError, ValueError):
+        imports = []
+    return {'signature': signature, 'digest': digest, 'imports': imports}
+
+
+# -----------------------------------------------------------------------------
+def _self_and_parents(name):
+    """
+    Yield the specified module name and the names of its parent packages.
+
+    Importing a module also imports each of the
+    packages that contain it.
+
+    """
+    while name:
+        yield name
+        name = name.rpartition('.')[0]
+
+
+# -----------------------------------------------------------------------------
+def _load(filepath_graph):
+    """
+    Return the saved import graph, or an empty graph if none has been saved.
+
+    """
+    try:
+        with open(filepath_graph, 'rt') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+# -----------------------------------------------------------------------------
+def _save(filepath_graph, graph):
+    """
+    Save the import graph atomically, so concurrent builds never see a partial.
+
+    """
+    da.util.ensure_dir_exists(os.path.dirname(filepath_graph))
+    filepath_tmp = '{path}.{pid}.tmp'.format(path = filepath_graph,
+                                             pid  = os.getpid())
+    with open(filepath_tmp, 'wt') as file:
+        json.dump(graph, file, sort_keys = True)
+    os.replace(filepath_tmp, filepath_graph)
@@ -30,6 +30,8 @@ license:
 ...
 """
 
+import bisect
+import functools
 import itertools
 import os
 import re
@@ -37,11 +39,19 @@ import re
 import yaml
 
 import da.idclass
+import da.index_spill
+import da.index_store
 import da.python_source
 import da.util
 import da.util.marked_yaml
 
 
+# The number of parsed blocks of embedded YAML
+# which are kept, keyed by the text of the block.
+#
+_YAML_BLOCK_CACHE_SIZE = 4096
+
+
 # -----------------------------------------------------------------------------
 def iter_embed_data(file, relpath):
     """
@@ -67,6 +77,27 @@ def write(indices, dirpath_idxfiles):
 
     data[idclass][idstr][filepath] -> (iline, icol)
 
+    The indices may also be given as an IndexStore
+    (see da.index_store) or a SpillingIndex (see
+    da.index_spill), each of which writes the same
+    files from the records that it holds.
+
+    """
+    if isinstance(indices, (da.index_store.IndexStore,
+                            da.index_spill.SpillingIndex)):
+        return indices.write(dirpath_idxfiles)
+    return _write_in_memory(indices, dirpath_idxfiles)
+
+
+# -----------------------------------------------------------------------------
+def _write_in_memory(indices, dirpath_idxfiles):
+    """
+    Persist index data held in memory as a tuple of dicts.
+
+    The tuple holds the line index, and the
+    references and objects indices (either of
+    which may be None).
+
     """
     (line_index, references_index, objects_index) = indices
 
@@ -116,6 +147,61 @@ def write(indices, dirpath_idxfiles):
     return True
 
 
+# -----------------------------------------------------------------------------
+def unit_coro(cfg):
+    """
+    Return the indexing coroutine for the unit processing phase of a build.
+
+    If the incremental index is enabled, indices
+    are kept in an IndexStore, which is updated
+    only with those build units whose content has
+    changed. Otherwise they are kept in a
+    SpillingIndex, which writes them to disk if
+    they grow larger than the memory budget.
+
+    """
+    dirpath_lwc_root = cfg['paths']['dirpath_isolated_src']
+    store            = da.index_store.open_store(cfg)
+    if store is None:
+        return spilling_index_coro(dirpath_lwc_root = dirpath_lwc_root,
+                                   index = da.index_spill.open_index(cfg))
+    return incremental_index_coro(dirpath_lwc_root = dirpath_lwc_root,
+                                  store            = store)
+
+
+# -----------------------------------------------------------------------------
+@da.util.coroutine
+def spilling_index_coro(dirpath_lwc_root, index):
+    """
+    Yield the SpillingIndex after adding the tuples from each build unit.
+
+    """
+    while True:
+        build_unit = (yield index)
+        index.add(index_fragment(dirpath_lwc_root, build_unit))
+
+
+# -----------------------------------------------------------------------------
+@da.util.coroutine
+def incremental_index_coro(dirpath_lwc_root, store):
+    """
+    Yield the IndexStore after updating it with each sent build unit.
+
+    Build units whose content has not changed
+    since they were last indexed are not indexed
+    again.
+
+    """
+    while True:
+        build_unit = (yield store)
+        relpath    = build_unit['relpath']
+        digest     = da.index_store.unit_digest(build_unit)
+        fragment   = None
+        if not store.is_current(relpath, digest):
+            fragment = index_fragment(dirpath_lwc_root, build_unit)
+        store.update(relpath, digest, fragment)
+
+
 # -----------------------------------------------------------------------------
 # TODO: Refactor to reduce number of branches.
 #       (Rule disabled to facilitate tightening of the threshold)
@@ -141,7 +227,6 @@ def index_coro(dirpath_lwc_root, indices = None):       # pylint: disable=R0912
 
         indices    = (line_index, references_index, objects_index)
         build_unit = (yield indices)
-        file       = build_unit['file']
         relpath    = build_unit['relpath']
 
         # The first pass over the file is for
@@ -150,9 +235,7 @@ def index_coro(dirpath_lwc_root, indices = None):       # pylint: disable=R0912
         # of the file other than the presence
         # of newline delimiters.
         #
-        file.seek(0)
-        for iline, binary_line in enumerate(file):
-            text_line = binary_line.decode('utf-8')
+        for iline, text_line in enumerate(build_unit['lines']):
             for (match_class, idstr,
                  line_offset, col_offset) in matcher.send(text_line):
                 line_num   = 1 + iline + line_offset
@@ -169,14 +252,13 @@ def index_coro(dirpath_lwc_root, indices = None):       # pylint: disable=R0912
         # context within which each identifier
         # is placed.
         #
-        file.seek(0, os.SEEK_SET)
 
         # YAML files are grist to the mill --
         # any part of a YAML data structure
         # is potentially of interest to us.
         #
         if relpath.endswith('yaml'):
-            for data in yaml.load_all(file,
+            for data in yaml.load_all(build_unit['content'],
                                       Loader = da.util.marked_yaml.Loader):
 
                 (maybe_ref_idx, maybe_obj_idx) = _index_yaml(
@@ -211,26 +293,89 @@ def index_coro(dirpath_lwc_root, indices = None):       # pylint: disable=R0912
         #   - state: draft
         # ...
         if relpath.endswith('py'):
-            pass
-        # for data in da.python_source.iter_embedded_data(file, relpath):
-        #     (maybe_ref_idx, maybe_obj_idx) = _index_yaml(
-        #                                             references_idx_builder,
-        #                                             objects_idx_builder,
-        #                                             matcher,
-        #                                             relpath,
-        #                                             data)
-        #     if maybe_ref_idx is not None:
-        #         references_index = maybe_ref_idx
-        #     if maybe_obj_idx is not None:
-        #         objects_index    = maybe_obj_idx
+            for (data,
+                 block_line_offset,
+                 block_col_offset) in _iter_python_embedded_data(build_unit):
+
+                (maybe_ref_idx, maybe_obj_idx) = _index_yaml(
+                                                        references_idx_builder,
+                                                        objects_idx_builder,
+                                                        matcher,
+                                                        relpath,
+                                                        data,
+                                                        block_line_offset,
+                                                        block_col_offset)
+                if maybe_ref_idx is not None:
+                    references_index = maybe_ref_idx
+                if maybe_obj_idx is not None:
+                    objects_index    = maybe_obj_idx
+
+
+# -----------------------------------------------------------------------------
+def index_fragment(dirpath_lwc_root, build_unit):
+    """
+    Return the index tuples contributed by a single build unit.
+
+    The returned fragment is a tuple of three lists
+    of multi-key tuples, one list for each of the
+    line, references and objects indices. Fragments
+    are easily sent between processes and may be
+    combined into a single set of indices using
+    merge_coro().
+
+    """
+    indexer = index_coro(dirpath_lwc_root = dirpath_lwc_root)
+    indices = indexer.send(build_unit)
+    return tuple(list(da.util.iter_index_tuples(index)) for index in indices)
 
 
 # -----------------------------------------------------------------------------
-def _index_yaml(
-        references_idx_builder, objects_idx_builder, matcher, relpath, data):
+@da.util.coroutine
+def merge_coro(index = None):
+    """
+    Yield indices built by merging the sent sequence of index fragments.
+
+    If a SpillingIndex is given, fragments are
+    added to it and it is yielded in place of
+    the in-memory indices.
+
+    """
+    if index is not None:
+        while True:
+            fragment = (yield index)
+            index.add(fragment)
+    builders = [da.util.index_builder_coro() for _ in range(3)]
+    indices  = [None, None, None]
+    while True:
+        fragment = (yield tuple(indices))
+        for (idx, tuple_list) in enumerate(fragment):
+            for tupl in tuple_list:
+                indices[idx] = builders[idx].send(tupl)
+
+
+# -----------------------------------------------------------------------------
+def _index_yaml(                                        # pylint: disable=R0913
+        references_idx_builder,
+        objects_idx_builder,
+        matcher,
+        relpath,
+        data,
+        block_line_offset = 0,
+        block_col_offset  = 0):
     """
     Return indices built using the specified nested line-marked mapping object.
 
+    The block line and column offsets are added
+    to the line marks in the data, for data which
+    has been loaded from a block of YAML embedded
+    in a larger file.
+
+    The payload of each entry in the objects index
+    is a compact reference to the named object
+    (the relpath, line and column at which it
+    starts, and its path within the data) rather
+    than the object itself.
+
     """
     references_index = None
     objects_index    = None
@@ -243,8 +388,8 @@ def _index_yaml(
         if not hasattr(obj, 'start_mark'):
             continue
 
-        obj_line   = 1 + obj.start_mark.line
-        obj_column = 1 + obj.start_mark.column
+        obj_line   = 1 + obj.start_mark.line   + block_line_offset
+        obj_column = 1 + obj.start_mark.column + block_col_offset
         if da.util.is_string(obj):
             for (match_class, idstr, line_offset, col_offset) in matcher.send(
                                                                         obj):
@@ -267,11 +412,94 @@ def _index_yaml(
                 col_num       = 1 + obj_column + col_offset
                 pos           = (line_num, col_num)
                 objects_index = objects_idx_builder.send(
-                    (match_class, idstr, relpath, str(pos), str(path), obj))
+                    (match_class, idstr, relpath, str(pos), str(path),
+                     (relpath, obj_line, obj_column, list(path))))
 
     return (references_index, objects_index)
 
 
+# -----------------------------------------------------------------------------
+def _iter_python_embedded_data(build_unit):
+    """
+    Yield data embedded in the comments and docstrings of a Python file.
+
+    The comment and docstring tokens which have
+    already been found for the build unit (and
+    which may have been restored from the AST
+    cache) are reused, so the file is not
+    tokenized again.
+
+    Each item of data is yielded together with
+    the line and column offsets of its block of
+    YAML within the file.
+
+    """
+    comments = build_unit.get('comments', None)
+    if not comments:
+        return
+    for (text, meta) in da.python_source.gen_yaml_blocks(comments):
+        data = _load_yaml_block(text)
+        if data is not None:
+            (line_offset, col_offset) = _yaml_block_offsets(
+                                                    build_unit['lines'],
+                                                    text,
+                                                    meta)
+            yield (data, line_offset, col_offset)
+
+
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize = _YAML_BLOCK_CACHE_SIZE)
+def _load_yaml_block(text):
+    """
+    Return line-marked data loaded from a block of YAML, or None if invalid.
+
+    Blocks are cached by their text. Line marks
+    are relative to the start of the block, so a
+    block which has not changed is not parsed
+    again, even if it has moved within its file,
+    or if other parts of the file have changed.
+
+    Invalid YAML is not indexed. It is left to the
+    data validation step to report it.
+
+    """
+    try:
+        return yaml.load(text, Loader = da.util.marked_yaml.FastLoader)
+    except yaml.YAMLError:
+        return None
+
+
+# -----------------------------------------------------------------------------
+def _yaml_block_offsets(lines, text, meta):
+    """
+    Return the line and column offsets of a block of embedded YAML.
+
+    The block starts on the line after the first
+    start marker at or after the line recorded in
+    its metadata. (Leading blank lines are removed
+    from docstrings, so the recorded line may be
+    too early). The column offset is found by
+    aligning the first non-blank line of the block
+    with the same line in the file, as the text of
+    the block has had comment characters and the
+    indentation of docstrings removed.
+
+    """
+    iline = meta.lo - 1
+    while (iline < len(lines) - 1
+           and lines[iline].strip().lstrip('#').strip() != '---'):
+        iline += 1
+
+    col_offset = 0
+    for (iblock, block_line) in enumerate(text.splitlines()):
+        content = block_line.strip()
+        if content and iline + 1 + iblock < len(lines):
+            col_offset = (lines[iline + 1 + iblock].find(content)
+                          - block_line.find(content))
+            break
+    return (iline + 1, max(col_offset, 0))
+
+
 # -----------------------------------------------------------------------------
 @da.util.coroutine
 def _id_matcher_coro(dirpath_lwc_root):
@@ -302,7 +530,7 @@ def _id_matcher_coro(dirpath_lwc_root):
                       'd3_timer',
                       'd3_transition',
                       'd3_zoom']
-    regextab       = da.idclass.regex_table(dirpath_lwc_root)
+    regex_idclass  = da.idclass.combined_regex(dirpath_lwc_root)
     regex_generic  = re.compile(
                         r"\b[a-zA-Z]{1,2}[0-9]{1,12}_[a-zA-Z0-9_]{2,200}")
     matchlist      = []
@@ -311,27 +539,31 @@ def _id_matcher_coro(dirpath_lwc_root):
 
         text      = (yield matchlist)
         matchlist = []
+        newlines  = None
 
         for match in regex_generic.finditer(text):
 
             idstr  = match.group(0)
             istart = match.start()
-            if istart == 0:
-                line_offset = 0
-                col_offset  = 0
-            else:
-                prev_lines  = text[:istart].splitlines()
-                line_offset = len(prev_lines) - 1
-                col_offset  = len(prev_lines[-1])
-
-            # We can (will) make this a lot faster in future ... but
-            # for now it serves well enough.
-            is_exact = False
-            for idclass, idregex in regextab.items():
-                if idregex.match(idstr):
-                    is_exact = True
-                    matchlist.append((idclass, idstr, line_offset, col_offset))
-                    break
+
+            # The newline index is only built for
+            # text which contains an identifier,
+            # and is then shared by all of them.
+            #
+            if newlines is None:
+                newlines = _newline_index(text)
+            (line_offset, col_offset) = _offsets(newlines, istart)
+
+            # A single match against the combined
+            # expression identifies the first class
+            # in the register which matches.
+            #
+            match_idclass = regex_idclass.match(idstr)
+            if match_idclass is not None:
+                matchlist.append((match_idclass.lastgroup,
+                                  idstr,
+                                  line_offset,
+                                  col_offset))
 
             # If we find something that is plausibly
             # an identifier, but does not exactly
@@ -342,6 +574,38 @@ def _id_matcher_coro(dirpath_lwc_root):
             # to let the developer fix it, (or else
             # add it to the whitelist)
             #
-            if (not is_exact) and (idstr not in exception_list):
+            elif idstr not in exception_list:
                 raise RuntimeError(
                         'Possibly malformed id: %s', idstr)
+
+
+# -----------------------------------------------------------------------------
+def _newline_index(text):
+    """
+    Return a sorted list of the positions of each newline in text.
+
+    """
+    newlines = []
+    ipos     = text.find('\n')
+    while ipos != -1:
+        newlines.append(ipos)
+        ipos = text.find('\n', ipos + 1)
+    return newlines
+
+
+# -----------------------------------------------------------------------------
+def _offsets(newlines, ipos):
+    """
+    Return the zero based line and column of a position in a block of text.
+
+    The newlines list is the newline index of
+    the text, as returned by _newline_index().
+    The number of newlines before the position
+    is found by bisection, so the cost does not
+    grow with the length of the text before it.
+
+    """
+    line_offset = bisect.bisect_left(newlines, ipos)
+    if line_offset == 0:
+        return (0, ipos)
+    return (line_offset, ipos - newlines[line_offset - 1] - 1)
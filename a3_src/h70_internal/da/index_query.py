@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Identifier lookup and cross-reference queries.
+
+The index files written by da.index.write() hold
+one JSON object per line, each with a single key:
+the identifier string. Within each file, the lines
+are sorted by identifier string. This means that
+the entry for an identifier can be found with a
+binary search over a memory map of the file, so
+only the line which holds the entry is read and
+decoded, and a lookup takes a small fraction of a
+millisecond, even for the largest index files.
+
+The class of an identifier (and therefore the
+names of the index files which may hold it) is
+found with the combined identifier class regex
+(see da.idclass.combined_regex).
+
+Three questions may be asked of an identifier:
+
+definitions:    Where is it defined? (i.e. where
+                is it the name of an object in a
+                YAML data structure)
+
+containers:     Which objects contain it? (i.e.
+                where is it in the text of a YAML
+                data structure)
+
+references:     Where is it referred to at all?
+                (i.e. where does it appear in the
+                text of any design document)
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import ast
+import glob
+import json
+import mmap
+import os
+
+import da.idclass
+import da.lwc.discover
+
+
+# -----------------------------------------------------------------------------
+def find_dirpath(dirpath_lwc_root, cfg_name = 'default'):
+    """
+    Return the directory holding the most recently written index files.
+
+    Only the branch log directories of builds
+    with the specified build configuration are
+    searched. None is returned if no index files
+    have been written.
+
+    """
+    rootpath_tmp = da.lwc.discover.path(key              = 'tmp',
+                                        dirpath_lwc_root = dirpath_lwc_root)
+    newest       = None
+    for filepath in glob.glob(os.path.join(rootpath_tmp,
+                                           cfg_name,
+                                           '*',
+                                           'log',
+                                           '*.line_index.jseq')):
+        mtime = os.stat(filepath).st_mtime
+        if newest is None or mtime > newest[0]:
+            newest = (mtime, os.path.dirname(filepath))
+    if newest is None:
+        return None
+    return newest[1]
+
+
+# =============================================================================
+class IndexReader:
+    """
+    Answers queries about identifiers from a directory of index files.
+
+    Index files are memory mapped when they are
+    first needed, and stay mapped until close()
+    is called, so a single IndexReader should be
+    used for a series of queries.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath_index, dirpath_lwc_root = None):
+        """
+        Return an initialised instance of the IndexReader class.
+
+        """
+        self.dirpath_index = dirpath_index
+        self._regex        = da.idclass.combined_regex(dirpath_lwc_root)
+        self._maps         = {}
+
+    # -------------------------------------------------------------------------
+    def lookup(self, idstr):
+        """
+        Return a map holding the answers to all queries about idstr.
+
+        """
+        return {
+            'idstr':        idstr,
+            'idclass':      self.idclass(idstr),
+            'definitions':  self.definitions(idstr),
+            'containers':   self.containers(idstr),
+            'references':   self.references(idstr)
+        }
+
+    # -------------------------------------------------------------------------
+    def idclass(self, idstr):
+        """
+        Return the identifier class of idstr, or None if it has none.
+
+        """
+        match = self._regex.match(idstr)
+        if match is None:
+            return None
+        return match.lastgroup
+
+    # -------------------------------------------------------------------------
+    def definitions(self, idstr):
+        """
+        Return the location of each object named by idstr.
+
+        """
+        entry = self._entry('objects_index', idstr)
+        return [_location(relpath, pos, path = ast.literal_eval(path))
+                for (relpath, by_pos) in entry.items()
+                for (pos, by_path) in _sorted_by_pos(by_pos)
+                for path in sorted(by_path)]
+
+    # -------------------------------------------------------------------------
+    def containers(self, idstr):
+        """
+        Return the location of each object whose text includes idstr.
+
+        """
+        entry = self._entry('references_index', idstr)
+        return [_location(relpath, pos, path = path)
+                for (relpath, by_pos) in entry.items()
+                for (pos, path_list) in _sorted_by_pos(by_pos)
+                for path in path_list]
+
+    # -------------------------------------------------------------------------
+    def references(self, idstr):
+        """
+        Return the location of each occurrence of idstr in any document.
+
+        """
+        entry = self._entry('line_index', idstr)
+        return [{'relpath': relpath, 'line': line, 'col': col}
+                for (relpath, pos_list) in entry.items()
+                for (line, col) in pos_list]
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Unmap all of the index files.
+
+        """
+        for buf in self._maps.values():
+            if buf is not None:
+                buf.close()
+        self._maps = {}
+
+    # -------------------------------------------------------------------------
+    def _entry(self, index_name, idstr):
+        """
+        Return the entry for idstr in the specified index, or an empty dict.
+
+        """
+        idclass = self.idclass(idstr)
+        if idclass is None:
+            return {}
+        buf = self._map('{idclass}.{index_name}.jseq'.format(
+                                                    idclass    = idclass,
+                                                    index_name = index_name))
+        if buf is None:
+            return {}
+        line = _search(buf, idstr.encode('utf-8'))
+        if line is None:
+            return {}
+        entry = json.loads(line.decode('utf-8'))[idstr]
+        return {relpath: entry[relpath] for relpath in sorted(entry)}
+
+    # -------------------------------------------------------------------------
+    def _map(self, filename):
+        """
+        Return a memory map of the specified index file, or None.
+
+        """
+        if filename not in self._maps:
+            filepath = os.path.join(self.dirpath_index, filename)
+            buf      = None
+            if os.path.isfile(filepath) and os.path.getsize(filepath) > 0:
+                with open(filepath, 'rb') as file:
+                    buf = mmap.mmap(file.fileno(),
+                                    0,
+                                    access = mmap.ACCESS_READ)
+            self._maps[filename] = buf
+        return self._maps[filename]
+
+
+# -----------------------------------------------------------------------------
+def _search(buf, key):
+    """
+    Return the line in buf with the specified key, or None if there is none.
+
+    Each line in buf starts with the JSON text
+    {"key": and the lines are sorted by key. We
+    bisect on byte offsets, reading only the key
+    of the line that contains each midpoint.
+
+    """
+    (ilo, ihi) = (0, len(buf))
+    while ilo < ihi:
+        imid   = (ilo + ihi) // 2
+        istart = buf.rfind(b'\n', 0, imid) + 1
+        iend   = buf.find(b'\n', istart)
+        if iend == -1:
+            iend = len(buf)
+        line_key = buf[istart + 2:buf.find(b'"', istart + 2)]
+        if line_key < key:
+            ilo = iend + 1
+        elif line_key > key:
+            ihi = istart
+        else:
+            return buf[istart:iend]
+    return None
+
+
+# -----------------------------------------------------------------------------
+def _sorted_by_pos(by_pos):
+    """
+    Return the items of a mapping keyed by str((line, col)) in line order.
+
+    """
+    return sorted(((ast.literal_eval(pos), value)
+                   for (pos, value) in by_pos.items()),
+                  key = lambda item: item[0])
+
+
+# -----------------------------------------------------------------------------
+def _location(relpath, pos, path):
+    """
+    Return a record of the location of an object in a YAML data structure.
+
+    """
+    (line, col) = pos
+    return {'relpath': relpath, 'line': line, 'col': col, 'path': list(path)}
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Identifier traceability indices built within a fixed memory budget.
+
+An index built with da.util.index_builder_coro()
+holds every index tuple for every build unit in
+nested dictionaries until the index files are
+written, so memory use grows with the size of
+the design. The SpillingIndex class instead holds
+the tuples for each index as a flat list of
+compact JSON records, each with a sort key. Once
+the estimated size of the records exceeds the
+memory budget, they are sorted and written to a
+run file in a temporary directory, and the list
+is emptied.
+
+When the index files are written, the runs and
+the records still held in memory are combined
+with a k-way merge, which yields the records for
+each identifier class, and each identifier within
+it, in turn. Only the records for one identifier
+are ever held in memory at the same time. The
+sort key of each record ends with a sequence
+number, so payloads are listed in the order in
+which they were added, and the index files are
+the same as those written from an in-memory index
+of the same build.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import heapq
+import itertools
+import json
+import operator
+import os
+import shutil
+import tempfile
+
+import da.index_store
+import da.util
+
+
+# Index names, in the order in which they appear
+# in index fragments.
+#
+_INDEX_NAMES = da.index_store.INDEX_NAMES
+
+# A rough estimate of the memory used by each record
+# in addition to the length of its JSON text (the
+# record tuple, the sort key and the objects which
+# they refer to).
+#
+_RECORD_OVERHEAD_BYTES = 200
+
+# The maximum number of runs which are merged at
+# once. When an index has this many runs, they are
+# merged into a single run, which limits the number
+# of files which are open at the same time.
+#
+_MAX_MERGE_WIDTH = 64
+
+# Records are sorted by the identifier class, the
+# identifier string and the sequence number which
+# start each record.
+#
+_SORT_KEY = operator.itemgetter(0, 1, 2)
+
+
+# -----------------------------------------------------------------------------
+def open_index(cfg):
+    """
+    Return an empty SpillingIndex for the build.
+
+    Runs are written to a new temporary directory
+    in the branch tmp directory, so concurrent
+    builds do not interfere with each other.
+
+    """
+    budget_mb = cfg['options'].get('index_memory_budget_mb', 64)
+    return SpillingIndex(
+        dirpath_tmp   = os.path.join(cfg['paths']['dirpath_branch_tmp'],
+                                     'index'),
+        memory_budget = budget_mb * 1024 * 1024)
+
+
+# =============================================================================
+class SpillingIndex:
+    """
+    Index tuples held in memory and in sorted runs on disk.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath_tmp, memory_budget):
+        """
+        Return an initialised instance of the SpillingIndex class.
+
+        """
+        self.dirpath_tmp   = dirpath_tmp
+        self.memory_budget = memory_budget
+        self._dirpath_runs = None
+        self._records      = {name: [] for name in _INDEX_NAMES}
+        self._runs         = {name: [] for name in _INDEX_NAMES}
+        self._num_bytes    = 0
+        self._seq          = itertools.count()
+
+    # -------------------------------------------------------------------------
+    def add(self, fragment):
+        """
+        Add the index tuples in a fragment, spilling to disk if need be.
+
+        The fragment is a tuple of three lists of
+        multi-key tuples, as returned from the
+        da.index.index_fragment() function.
+
+        """
+        for (index_name, tuple_list) in zip(_INDEX_NAMES, fragment):
+            record_list = self._records[index_name]
+            for tupl in tuple_list:
+                key  = (tupl[0], tupl[1], next(self._seq))
+                text = json.dumps(key + tuple(tupl[2:]))
+                record_list.append((key, text))
+                self._num_bytes += len(text) + _RECORD_OVERHEAD_BYTES
+        if self._num_bytes > self.memory_budget:
+            self._spill()
+
+    # -------------------------------------------------------------------------
+    def write(self, dirpath_idxfiles):
+        """
+        Persist the indices to jseq files and delete any runs.
+
+        """
+        try:
+            self._check_duplicates()
+            da.util.ensure_dir_exists(dirpath_idxfiles)
+            for index_name in _INDEX_NAMES:
+                for (idclass, records) in itertools.groupby(
+                                        self._iter_records(index_name),
+                                        key = operator.itemgetter(0)):
+                    filename = '{idclass}.{index_name}.jseq'.format(
+                                                    idclass    = idclass,
+                                                    index_name = index_name)
+                    da.util.write_jseq(os.path.join(dirpath_idxfiles,
+                                                    filename),
+                                       _iter_entries(records))
+        finally:
+            self.close()
+        return True
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Delete any runs and discard the records held in memory.
+
+        """
+        if self._dirpath_runs is not None:
+            shutil.rmtree(self._dirpath_runs, ignore_errors = True)
+            self._dirpath_runs = None
+        self._records   = {name: [] for name in _INDEX_NAMES}
+        self._runs      = {name: [] for name in _INDEX_NAMES}
+        self._num_bytes = 0
+
+    # -------------------------------------------------------------------------
+    def _check_duplicates(self):
+        """
+        Raise an exception if identifier numbers or descriptions are reused.
+
+        Two different identifiers in the same class
+        must not have the same number, nor the same
+        description.
+
+        """
+        for (_, records) in itertools.groupby(self._iter_records('line_index'),
+                                              key = operator.itemgetter(0)):
+            set_nums  = set()
+            set_descs = set()
+            for (idstr, _) in itertools.groupby(records,
+                                                key = operator.itemgetter(1)):
+                (idnum, description) = idstr.split('_', maxsplit = 1)
+                if idnum in set_nums:
+                    raise RuntimeError(
+                        'Duplicate identifier num: "{idnum}" in "{idstr}"'
+                        .format(idnum = idnum, idstr = idstr))
+                if description in set_descs:
+                    raise RuntimeError(
+                        'Duplicate description: "{desc}" in "{idstr}"'
+                        .format(desc = description, idstr = idstr))
+                set_nums.add(idnum)
+                set_descs.add(description)
+
+    # -------------------------------------------------------------------------
+    def _iter_records(self, index_name):
+        """
+        Yield all records in the specified index in sort key order.
+
+        Each record is a list holding the identifier
+        class, the identifier string, the sequence
+        number, the relpath, any further keys and
+        finally the payload.
+
+        """
+        in_memory = (json.loads(text) for (_, text)
+                     in sorted(self._records[index_name],
+                               key = operator.itemgetter(0)))
+        runs      = [_read_run(filepath)
+                     for filepath in self._runs[index_name]]
+        return heapq.merge(in_memory, *runs, key = _SORT_KEY)
+
+    # -------------------------------------------------------------------------
+    def _spill(self):
+        """
+        Write the records held in memory to sorted runs and forget them.
+
+        """
+        if self._dirpath_runs is None:
+            da.util.ensure_dir_exists(self.dirpath_tmp)
+            self._dirpath_runs = tempfile.mkdtemp(prefix = 'runs.',
+                                                  dir    = self.dirpath_tmp)
+        for index_name in _INDEX_NAMES:
+            if not self._records[index_name]:
+                continue
+            self._write_run(index_name,
+                            (text for (_, text)
+                             in sorted(self._records[index_name],
+                                       key = operator.itemgetter(0))))
+            self._records[index_name] = []
+            if len(self._runs[index_name]) >= _MAX_MERGE_WIDTH:
+                run_list = self._runs[index_name]
+                self._runs[index_name] = []
+                self._write_run(index_name,
+                                (json.dumps(record) for record in heapq.merge(
+                                    *[_read_run(filepath)
+                                      for filepath in run_list],
+                                    key = _SORT_KEY)))
+                for filepath in run_list:
+                    os.remove(filepath)
+        self._num_bytes = 0
+
+    # -------------------------------------------------------------------------
+    def _write_run(self, index_name, lines):
+        """
+        Write the supplied lines of JSON text to a new run for the index.
+
+        """
+        filepath = os.path.join(self._dirpath_runs, '{name}.{num}.jseq'.format(
+                                            name = index_name,
+                                            num  = next(self._seq)))
+        with open(filepath, 'wt', encoding = 'utf-8') as file:
+            for line in lines:
+                file.write(line)
+                file.write('\n')
+        self._runs[index_name].append(filepath)
+
+
+# -----------------------------------------------------------------------------
+def _read_run(filepath):
+    """
+    Yield the records in the specified run file.
+
+    """
+    with open(filepath, 'rt', encoding = 'utf-8') as file:
+        for line in file:
+            yield json.loads(line)
+
+
+# -----------------------------------------------------------------------------
+def _iter_entries(records):
+    """
+    Yield a single entry dict for each identifier in a sequence of records.
+
+    The records for each identifier are rebuilt
+    into the same nested index structure as is
+    built by da.util.index_builder_coro().
+
+    """
+    for (idstr, group) in itertools.groupby(records,
+                                            key = operator.itemgetter(1)):
+        builder = da.util.index_builder_coro()
+        index   = None
+        for record in group:
+            index = builder.send(tuple(record[3:]))
+        yield {idstr: index}
@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent, incremental store for identifier traceability indices.
+
+Without the store, the line, references and
+objects indices are rebuilt from scratch in memory
+on every build. With the store, the index tuples
+contributed by each build unit are kept in an
+SQLite database in the branch tmp directory,
+together with a digest of the content of the unit.
+A unit whose digest has not changed since it was
+last indexed is not indexed again, and the rows for
+a unit which has changed are replaced in a single
+transaction.
+
+Rows for units which were not part of the current
+build (e.g. because the file has been deleted) are
+removed before the index files are written, so the
+index files are the same as those written from an
+in-memory index of the same build. The check for
+duplicate identifier numbers and descriptions is
+run as a query against indexed columns.
+
+The whole store is discarded whenever the indexer
+(or the identifier class register) changes, as the
+stored rows would then be stale.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import itertools
+import json
+import operator
+import os
+import sqlite3
+
+import da.util
+import da.util.diskcache
+
+
+# Incremented whenever the layout of the database
+# changes, so that old databases are discarded.
+#
+_SCHEMA_VERSION = 1
+
+# Index names, in the order in which they appear
+# in index fragments (see da.index.index_fragment).
+#
+INDEX_NAMES = ('line_index', 'references_index', 'objects_index')
+
+
+# -----------------------------------------------------------------------------
+def open_store(cfg):
+    """
+    Return the IndexStore for the build, or None if it is not enabled.
+
+    """
+    if not cfg['options'].get('enable_incremental_index', False):
+        return None
+    import da.check.result_cache
+    import da.idclass
+    import da.index
+    import da.python_source
+    import da.util.marked_yaml
+    dirpath_src = cfg['paths']['dirpath_isolated_src']
+    fingerprint = da.util.diskcache.DiskCache.key(
+                        _SCHEMA_VERSION,
+                        da.check.result_cache.fingerprint(
+                                modules = (da.index,
+                                           da.idclass,
+                                           da.python_source,
+                                           da.util.marked_yaml)),
+                        da.idclass.combined_regex(dirpath_src).pattern)
+    return IndexStore(
+                filepath    = os.path.join(cfg['paths']['dirpath_branch_tmp'],
+                                           'index',
+                                           'index.sqlite'),
+                fingerprint = fingerprint)
+
+
+# -----------------------------------------------------------------------------
+def unit_digest(build_unit):
+    """
+    Return a digest of the content of the design document.
+
+    """
+    return da.util.diskcache.DiskCache.key(build_unit['bytes'])
+
+
+# =============================================================================
+class IndexStore:
+    """
+    An SQLite database of the index tuples contributed by each build unit.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, filepath, fingerprint):
+        """
+        Return an initialised instance of the IndexStore class.
+
+        """
+        da.util.ensure_dir_exists(os.path.dirname(filepath))
+        self._connection = sqlite3.connect(filepath)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        if self._fingerprint() != fingerprint:
+            self._create(fingerprint)
+        self.digests  = dict(self._connection.execute(
+                                        'SELECT relpath, digest FROM unit'))
+        self._visited = set()
+
+    # -------------------------------------------------------------------------
+    def is_current(self, relpath, digest):
+        """
+        Return True if the stored rows for relpath were indexed from digest.
+
+        """
+        return self.digests.get(relpath, None) == digest
+
+    # -------------------------------------------------------------------------
+    def update(self, relpath, digest, fragment = None):
+        """
+        Record that relpath is part of the build, replacing its rows if given.
+
+        The fragment is a tuple of three lists of
+        multi-key tuples, as returned from the
+        da.index.index_fragment() function. If it
+        is None, the stored rows for relpath are
+        kept as they are.
+
+        """
+        self._visited.add(relpath)
+        if fragment is None:
+            return
+        with self._connection:
+            self._delete(relpath)
+            for (index_name, tuple_list) in zip(INDEX_NAMES, fragment):
+                self._connection.executemany(
+                    'INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?)'.format(
+                                                        table = index_name),
+                    (_row(tupl) for tupl in tuple_list))
+            self._connection.execute(
+                    'INSERT INTO unit (relpath, digest) VALUES (?, ?)',
+                    (relpath, digest))
+        self.digests[relpath] = digest
+
+    # -------------------------------------------------------------------------
+    def write(self, dirpath_idxfiles):
+        """
+        Persist the indices for the units in the build to jseq files.
+
+        Rows for units which were not updated in
+        this build are removed first.
+
+        """
+        with self._connection:
+            for relpath in set(self.digests) - self._visited:
+                self._delete(relpath)
+                del self.digests[relpath]
+        self._check_duplicates()
+
+        da.util.ensure_dir_exists(dirpath_idxfiles)
+        for index_name in INDEX_NAMES:
+            for (idclass,) in self._connection.execute(
+                    'SELECT DISTINCT idclass FROM {table} '
+                    'ORDER BY idclass'.format(table = index_name)).fetchall():
+                filename = '{idclass}.{index_name}.jseq'.format(
+                                                    idclass    = idclass,
+                                                    index_name = index_name)
+                da.util.write_jseq(os.path.join(dirpath_idxfiles, filename),
+                                   self._iter_entries(index_name, idclass))
+        return True
+
+    # -------------------------------------------------------------------------
+    def _check_duplicates(self):
+        """
+        Raise an exception if identifier numbers or descriptions are reused.
+
+        Two different identifiers in the same class
+        must not have the same number, nor the same
+        description.
+
+        """
+        for (column, message) in (
+                ('idnum',       'Duplicate identifier num: "{dup}" in "{id}"'),
+                ('description', 'Duplicate description: "{dup}" in "{id}"')):
+            row = self._connection.execute(
+                    'SELECT {column}, MAX(idstr) FROM line_index '
+                    'GROUP BY idclass, {column} '
+                    'HAVING COUNT(DISTINCT idstr) > 1 '
+                    'ORDER BY idclass, {column} LIMIT 1'.format(
+                                                column = column)).fetchone()
+            if row is not None:
+                raise RuntimeError(message.format(dup = row[0], id = row[1]))
+
+    # -------------------------------------------------------------------------
+    def _iter_entries(self, index_name, idclass):
+        """
+        Yield a single entry dict for each identifier in the specified index.
+
+        The rows for each identifier are rebuilt
+        into the same nested index structure as
+        is built by da.util.index_builder_coro().
+
+        """
+        cursor = self._connection.execute(
+                    'SELECT idstr, relpath, keys, payload FROM {table} '
+                    'WHERE idclass = ? '
+                    'ORDER BY idstr, relpath, rowid'.format(
+                                                        table = index_name),
+                    (idclass,))
+        for (idstr, rows) in itertools.groupby(cursor,
+                                               key = operator.itemgetter(0)):
+            builder = da.util.index_builder_coro()
+            index   = None
+            for (_, relpath, keys, payload) in rows:
+                index = builder.send((relpath,)
+                                     + tuple(json.loads(keys))
+                                     + (json.loads(payload),))
+            yield {idstr: index}
+
+    # -------------------------------------------------------------------------
+    def _delete(self, relpath):
+        """
+        Delete all rows for the specified unit (within a transaction).
+
+        """
+        for table in INDEX_NAMES + ('unit',):
+            self._connection.execute(
+                    'DELETE FROM {table} WHERE relpath = ?'.format(
+                                                            table = table),
+                    (relpath,))
+
+    # -------------------------------------------------------------------------
+    def _fingerprint(self):
+        """
+        Return the fingerprint of the indexer that wrote the store, or None.
+
+        """
+        try:
+            row = self._connection.execute(
+                    "SELECT value FROM meta WHERE key = 'fingerprint'"
+                                                                ).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row is not None else None
+
+    # -------------------------------------------------------------------------
+    def _create(self, fingerprint):
+        """
+        Discard any existing content and create empty tables.
+
+        """
+        with self._connection:
+            for table in INDEX_NAMES + ('unit', 'meta'):
+                self._connection.execute(
+                    'DROP TABLE IF EXISTS {table}'.format(table = table))
+            self._connection.execute(
+                    'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._connection.execute(
+                    'CREATE TABLE unit (relpath TEXT PRIMARY KEY, '
+                    '                   digest  TEXT)')
+            for table in INDEX_NAMES:
+                self._connection.execute(
+                    'CREATE TABLE {table} (relpath     TEXT,'
+                    '                      idclass     TEXT,'
+                    '                      idstr       TEXT,'
+                    '                      idnum       TEXT,'
+                    '                      description TEXT,'
+                    '                      keys        TEXT,'
+                    '                      payload     TEXT)'.format(
+                                                            table = table))
+                self._connection.execute(
+                    'CREATE INDEX {table}_relpath ON {table} (relpath)'.format(
+                                                            table = table))
+                self._connection.execute(
+                    'CREATE INDEX {table}_idstr ON {table} '
+                    '(idclass, idstr, relpath)'.format(table = table))
+
+            # Only the line index is checked for
+            # duplicate numbers and descriptions.
+            #
+            for column in ('idnum', 'description'):
+                self._connection.execute(
+                    'CREATE INDEX line_index_{column} ON line_index '
+                    '(idclass, {column})'.format(column = column))
+            self._connection.execute(
+                    "INSERT INTO meta VALUES ('fingerprint', ?)",
+                    (fingerprint,))
+
+
+# -----------------------------------------------------------------------------
+def _row(tupl):
+    """
+    Return the database row for a multi-key index tuple.
+
+    The tuple holds the identifier class, the
+    identifier string, the relpath, any further
+    keys and finally the payload.
+
+    """
+    (idclass, idstr, relpath) = tupl[:3]
+    (idnum, description)      = idstr.split('_', maxsplit = 1)
+    return (relpath,
+            idclass,
+            idstr,
+            idnum,
+            description,
+            json.dumps(tupl[3:-1]),
+            json.dumps(tupl[-1]))
@@ -74,7 +74,8 @@ def python3(arglist,                                    # pylint: disable=R0913
             stderr           = None,
             cwd              = None,
             env              = None,
-            dirpath_lwc_root = None):
+            dirpath_lwc_root = None,
+            pass_fds         = ()):
     """
     Launch the python 3 interpreter in a subprocess.
 
@@ -89,7 +90,8 @@ def python3(arglist,                                    # pylint: disable=R0913
                 stderr              = stderr,
                 cwd                 = cwd,
                 env                 = env,
-                dirpath_lwc_root    = dirpath_lwc_root)
+                dirpath_lwc_root    = dirpath_lwc_root,
+                pass_fds            = pass_fds)
 
 
 # -----------------------------------------------------------------------------
@@ -100,7 +102,8 @@ def _python(arglist,                                    # pylint: disable=R0913
             stderr           = None,
             cwd              = None,
             env              = None,
-            dirpath_lwc_root = None):
+            dirpath_lwc_root = None,
+            pass_fds         = ()):
     """
     Launch the python interpreter in a subprocess.
 
@@ -122,10 +125,11 @@ def _python(arglist,                                    # pylint: disable=R0913
     try:
         return _subprocess_call(
                     [filepath_python] + arglist,
-                    stdout = stdout,
-                    stderr = stderr,
-                    cwd    = cwd,
-                    env    = env)
+                    stdout   = stdout,
+                    stderr   = stderr,
+                    cwd      = cwd,
+                    env      = env,
+                    pass_fds = pass_fds)
     except OSError:
         # TODO: This is the exception that you get when you don't have an
         #       environment -- try to print a helpful error message here.
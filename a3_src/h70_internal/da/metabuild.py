@@ -17,6 +17,7 @@ A number of different use-cases are supported.
 4.  Provide continuous feedback by listening for
     file changes and triggering incremental builds
     that run in the background at low priority.
+    (See da.watch).
 
 ---
 type:
@@ -48,20 +49,30 @@ license:
 
 import base64
 import collections
+import concurrent.futures
 import contextlib
+import functools
 import hashlib
 import importlib
 import logging
+import multiprocessing
 import os
 import pickle
 import shutil
+import socket
 import sys
+import threading
 
 import tblib
 import tblib.pickling_support
 
+import da.artifact_store
 import da.bldcfg
+import da.build_channel
+import da.build_server
+import da.cms
 import da.constants
+import da.exception
 import da.log
 import da.profiling
 import da.register
@@ -77,6 +88,17 @@ import da.vcs
 #
 tblib.pickling_support.install()
 
+# The interval at which we check whether there
+# are enough free resources to start another
+# concurrent build.
+#
+ADMISSION_POLL_SECS = 1.0
+
+# The name of the build directory that is
+# shared by all continuous builds.
+#
+CONTINUOUS_BRANCH_NAME = 'continuous'
+
 
 # -----------------------------------------------------------------------------
 def main(cfg_key, cfg_extras, dirpath_lwc_root):
@@ -123,11 +145,11 @@ def main(cfg_key, cfg_extras, dirpath_lwc_root):
                              cfg_extras       = cfg_extras,
                              dirpath_lwc_root = dirpath_lwc_root)
 
-    # TODO: WHEN THE ONLINE/CONTINUOUS BUILD SERVICE
-    #       IS BEING USED, CONFIGURE THINGS SO THAT
-    #       WE DO NOT AUTOCOMMIT AND WE DO NOT ROLL
-    #       BACK. THIS SHOULD AVOID CHURNING THE GIT
-    #       REPOSITORY UNNECESSARILY...
+    # The continuous build service (da.watch) does
+    # not come through here, as it must neither
+    # autocommit nor roll back; otherwise it would
+    # churn the git repository unnecessarily. See
+    # continuous_build_cfg() and run_continuous_build().
     #
     with _signal_file_context(cfg):
         with da.vcs.rollback_context(dirpath_root = dirpath_lwc_root):
@@ -136,6 +158,54 @@ def main(cfg_key, cfg_extras, dirpath_lwc_root):
     return da.constants.META_BUILD_COMPLETED
 
 
+# -----------------------------------------------------------------------------
+def continuous_build_cfg(cfg_key, cfg_extras, dirpath_lwc_root):
+    """
+    Return the configuration for a build made by the continuous build service.
+
+    Continuous builds are made from the files in
+    the local working copy as they are, so there
+    is no auto-commit baseline, and the defined
+    baseline is simply the current HEAD, on which
+    the isolated copy of the design documents is
+    based. All continuous builds share the same
+    build directory so that they can be
+    incremental. The isolated copy includes
+    uncommitted changes, so the tree of the
+    defined baseline does not identify it, and
+    the artifact store is not used.
+
+    """
+    cfg = da.bldcfg.load_cfg(cfg_key          = cfg_key,
+                             cfg_extras       = cfg_extras,
+                             dirpath_lwc_root = dirpath_lwc_root)
+    cfg['defined_baseline'] = da.vcs.commit_info(
+                                            dirpath_root = dirpath_lwc_root)
+    cfg['safe_branch_name'] = CONTINUOUS_BRANCH_NAME
+    cfg['options']['enable_artifact_store'] = False
+    cfg = _set_build_paths(cfg,
+                           cfg['paths']['dirpath_meta_tmp'],
+                           CONTINUOUS_BRANCH_NAME)
+    return _set_build_id(cfg, CONTINUOUS_BRANCH_NAME)
+
+
+# -----------------------------------------------------------------------------
+def run_continuous_build(cfg, changed_files, abort_event = None):
+    """
+    Build the isolated copy of the design documents for the changed files.
+
+    The changed files are given as paths in the
+    local working copy, and must already have been
+    copied to the isolated source directory. They
+    are checked first. If abort_event is set while
+    the build is running, the build is asked to
+    abort, and BuildAborted is raised.
+
+    """
+    cfg = da.util.merge_dicts(cfg, {'changed_files': sorted(changed_files)})
+    return _build_and_evaluate_design(cfg, abort_event)
+
+
 # ------------------------------------------------------------------------------
 @contextlib.contextmanager
 def _signal_file_context(cfg):
@@ -231,77 +301,42 @@ def _metabuild(cfg, dirpath_lwc_root):
     # restriction configuration file as
     # a list of 'defined_baselines'.
     #
-    # We process each in turn, generating
-    # deltas and optimising as needed.
+    # Each proposal gets its own copy of the
+    # configuration, with build paths named
+    # after its branch and commit, so that
+    # competing proposals on the same branch
+    # do not share a temporary build directory.
     #
+    baseline_cfg_list = []
     for defined_baseline_id in cfg['scope']['defined_baselines']:
 
         commit_info = da.vcs.commit_info(
                                     dirpath_root = dirpath_lwc_root,
                                     ref          = defined_baseline_id)
-        cfg = da.util.merge_dicts(cfg, { 'defined_baseline': commit_info })
-        safe_branch_name = _safe_branch_name(commit_info['branch'])
-        cfg['safe_branch_name'] = safe_branch_name
-        cfg = _set_build_paths(cfg, dirpath_meta_tmp, safe_branch_name)
-
-        # Use the hash code as an absolute
-        # identifier for the system configuration
-        # under test. Relative references such
-        # as "HEAD" or "master" will be different
-        # for the repository clone in the isolated
-        # temporary build directory and so cannot
-        # be used.
-        #
-        system_configuration_under_test = commit_info['hexsha']
-
-        # Isolate a clean copy of the design
-        # documents to be built.
-        #
-        da.vcs.clone_all_design_documents(
-            dirpath_lwc_root    = dirpath_lwc_root,
-            dirpath_destination = cfg['paths']['dirpath_isolated_src'],
-            configuration       = system_configuration_under_test)
-
-        # TODO: Consider eagerly mounting
-        #       "a0_env"; "a2_dat" and "a5_cms"
-        #       so that they are in the 'correct'
-        #       position relative to the isolated
-        #       src directory. Alternatively,
-        #       consider using an idempotent
-        #       ensure-available function
-        #       that mounts resources lazily
-        #       (on demand).
-
-        # We want to be able to tune each
-        # design proposal using a configurable
-        # optimisation algorithm and objective
-        # function.
-        #
-        # Both the optimisation algorithm and
-        # the objective function are provided
-        # by the "optimisation_module" specified
-        # in the configuration, which acts as
-        # an adapter to the build function
-        # itself. The build function is supplied
-        # to the optimisation module as a
-        # callback so that the system design
-        # may be rebuilt and re-evaluated after
-        # each "delta" change.
-        #
-        optimisation_module = cfg['options']['optimisation_module']
-        design_optimisation_enabled = optimisation_module is not None
-        if design_optimisation_enabled:
-
-            importlib.import_module(optimisation_module).optimise_build(
-                                    _build_and_evaluate_design, cfg)
-
-        # When system design optimisation is not configured, we only
-        # need to build the null delta.
-        #
-        else:
-
-            cfg = _set_build_id(cfg, safe_branch_name)
-            _build_and_evaluate_design(cfg)
+        baseline_cfg = da.util.merge_dicts(
+                                    cfg, { 'defined_baseline': commit_info })
+        safe_branch_name   = _safe_branch_name(commit_info['branch'])
+        safe_baseline_name = '{branch}_{hexsha}'.format(
+                                    branch = safe_branch_name,
+                                    hexsha = commit_info['short_hexsha'])
+        baseline_cfg['safe_branch_name']   = safe_branch_name
+        baseline_cfg['safe_baseline_name'] = safe_baseline_name
+        baseline_cfg = _set_build_paths(
+                            baseline_cfg,
+                            dirpath_meta_tmp,
+                            safe_branch_name,
+                            safe_baseline_name = safe_baseline_name)
+        baseline_cfg_list.append(baseline_cfg)
+
+    # We process proposals concurrently,
+    # generating deltas and optimising as
+    # needed. Results are gathered in the
+    # order in which the proposals are
+    # defined.
+    #
+    cfg['baseline_results'] = _evaluate_baselines(cfg,
+                                                  baseline_cfg_list,
+                                                  dirpath_lwc_root)
 
     # Once the subsidiary builds have finished,
     # each proposal should have an associated
@@ -320,6 +355,242 @@ def _metabuild(cfg, dirpath_lwc_root):
     _report.metabuild(cfg)
 
 
+# -----------------------------------------------------------------------------
+def _evaluate_baselines(cfg, baseline_cfg_list, dirpath_lwc_root):
+    """
+    Return results for each defined baseline, building them concurrently.
+
+    Baselines that name the same commit on the
+    same branch share the same temporary build
+    directory, so they are evaluated in turn, in
+    a single lane. Separate lanes are evaluated
+    concurrently, up to the configured limit, and
+    a new lane is only started when there is CPU
+    and memory available for it.
+
+    Results are returned in the order in which the
+    baselines are defined. If any baseline fails,
+    no new lanes are started, and the exception
+    from the first failed baseline (in the order
+    in which they are defined) is raised once the
+    lanes already running have finished.
+
+    If errors_abort_immediately is set, the builds
+    of the other baselines are asked to abort as
+    soon as the first nonconformity is reported.
+
+    """
+    options = cfg['options']
+    num_max = options.get('metabuild_concurrency', 0)
+    if num_max < 1:
+        num_max = multiprocessing.cpu_count()
+
+    lanes = collections.OrderedDict()
+    for (idx, baseline_cfg) in enumerate(baseline_cfg_list):
+        lanes.setdefault(baseline_cfg['safe_baseline_name'], []).append(
+                                                        (idx, baseline_cfg))
+    lanes_pending = list(lanes.values())
+    lanes_running = {}
+    result_map    = {}
+    error_map     = {}
+    abort_event   = threading.Event()
+
+    num_workers = max(1, min(num_max, len(lanes)))
+    with concurrent.futures.ThreadPoolExecutor(
+                                    max_workers = num_workers) as pool:
+
+        while lanes_pending or lanes_running:
+
+            while (    lanes_pending
+                   and not error_map
+                   and len(lanes_running) < num_max
+                   and _is_admissible(options, len(lanes_running))):
+                lane   = lanes_pending.pop(0)
+                future = pool.submit(_evaluate_lane,
+                                     lane,
+                                     dirpath_lwc_root,
+                                     abort_event)
+                lanes_running[future] = lane
+
+            if error_map:
+                lanes_pending = []
+
+            (done, _) = concurrent.futures.wait(
+                            lanes_running,
+                            timeout     = ADMISSION_POLL_SECS,
+                            return_when = concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                del lanes_running[future]
+                (lane_results, lane_error) = future.result()
+                result_map.update(lane_results)
+                if lane_error is not None:
+                    error_map[lane_error[0]] = lane_error[1]
+                    if options.get('errors_abort_immediately', False):
+                        abort_event.set()
+
+    # Builds which were aborted because another
+    # build failed are not the cause of failure.
+    #
+    failure_map = {idx: err for (idx, err) in error_map.items()
+                   if not isinstance(err, da.exception.BuildAborted)}
+    if failure_map or error_map:
+        raise (failure_map or error_map)[min(failure_map or error_map)]
+
+    return [{'defined_baseline': baseline_cfg['defined_baseline'],
+             'result':           result_map[idx]}
+            for (idx, baseline_cfg) in enumerate(baseline_cfg_list)]
+
+
+# -----------------------------------------------------------------------------
+def _evaluate_lane(lane, dirpath_lwc_root, abort_event):
+    """
+    Evaluate a sequence of baselines in turn, stopping at the first failure.
+
+    Return a map from baseline index to result,
+    and either None or an (index, exception) tuple
+    for the baseline that failed (or that was not
+    started, because abort_event was set).
+
+    """
+    lane_results = {}
+    for (idx, baseline_cfg) in lane:
+        if abort_event.is_set():
+            return (lane_results, (idx, da.exception.BuildAborted()))
+        try:
+            lane_results[idx] = _evaluate_baseline(baseline_cfg,
+                                                   dirpath_lwc_root,
+                                                   abort_event)
+
+        # Pylint rule W0703 (broad-except) disabled.
+        # Exceptions are re-raised in the metabuild
+        # thread once all running lanes are finished.
+        #
+        except Exception as err:                        # pylint: disable=W0703
+            return (lane_results, (idx, err))
+    return (lane_results, None)
+
+
+# -----------------------------------------------------------------------------
+def _evaluate_baseline(cfg, dirpath_lwc_root, abort_event = None):
+    """
+    Isolate, build and evaluate a single defined baseline.
+
+    """
+    # Use the hash code as an absolute
+    # identifier for the system configuration
+    # under test. Relative references such
+    # as "HEAD" or "master" will be different
+    # for the repository clone in the isolated
+    # temporary build directory and so cannot
+    # be used.
+    #
+    system_configuration_under_test = cfg['defined_baseline']['hexsha']
+
+    # Isolate a clean copy of the design
+    # documents to be built.
+    #
+    da.vcs.clone_all_design_documents(
+        dirpath_lwc_root    = dirpath_lwc_root,
+        dirpath_destination = cfg['paths']['dirpath_isolated_src'],
+        configuration       = system_configuration_under_test,
+        incremental         = cfg['options'].get(
+                                        'enable_incremental_isolation', True))
+
+    # TODO: Consider eagerly mounting
+    #       "a0_env"; "a2_dat" and "a5_cms"
+    #       so that they are in the 'correct'
+    #       position relative to the isolated
+    #       src directory. Alternatively,
+    #       consider using an idempotent
+    #       ensure-available function
+    #       that mounts resources lazily
+    #       (on demand).
+
+    # We want to be able to tune each
+    # design proposal using a configurable
+    # optimisation algorithm and objective
+    # function.
+    #
+    # Both the optimisation algorithm and
+    # the objective function are provided
+    # by the "optimisation_module" specified
+    # in the configuration, which acts as
+    # an adapter to the build function
+    # itself. The build function is supplied
+    # to the optimisation module as a
+    # callback so that the system design
+    # may be rebuilt and re-evaluated after
+    # each "delta" change.
+    #
+    # Deltas are identified by extending the
+    # build id of the baseline.
+    #
+    cfg = _set_build_id(cfg, cfg['safe_branch_name'])
+    optimisation_module = cfg['options']['optimisation_module']
+    design_optimisation_enabled = optimisation_module is not None
+    if design_optimisation_enabled:
+
+        return importlib.import_module(optimisation_module).optimise_build(
+                                    functools.partial(
+                                                _build_and_evaluate_design,
+                                                abort_event = abort_event),
+                                    cfg)
+
+    # When system design optimisation is not configured, we only
+    # need to build the null delta.
+    #
+    else:
+
+        return _build_and_evaluate_design(cfg, abort_event)
+
+
+# -----------------------------------------------------------------------------
+def _is_admissible(options, num_running):
+    """
+    Return True if there are enough free resources to start another build.
+
+    The first build is always admitted. The load
+    average lags behind the true load, so the
+    concurrency limit remains the main control;
+    this check stops us from piling more builds
+    onto a machine that is already busy.
+
+    """
+    if num_running == 0:
+        return True
+
+    max_load_per_cpu = options.get('metabuild_max_load_per_cpu', 1.0)
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        load = 0.0
+    if load + 1.0 > max_load_per_cpu * multiprocessing.cpu_count():
+        return False
+
+    min_free_mb = options.get('metabuild_min_free_memory_mb', 1024)
+    free_mb     = _available_memory_mb()
+    if free_mb is not None and free_mb < min_free_mb:
+        return False
+
+    return True
+
+
+# -----------------------------------------------------------------------------
+def _available_memory_mb():
+    """
+    Return the available memory in MB, or None if it cannot be determined.
+
+    """
+    try:
+        with open('/proc/meminfo', 'r') as file:
+            for line in file:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
 # -----------------------------------------------------------------------------
 def _tmp_dir_cleaning(cfg, dirpath_meta_tmp):
     """
@@ -358,7 +629,10 @@ def _safe_branch_name(branch_name):
 
 
 # -----------------------------------------------------------------------------
-def _set_build_paths(cfg, dirpath_meta_tmp, safe_branch_name):
+def _set_build_paths(cfg,
+                     dirpath_meta_tmp,
+                     safe_branch_name,
+                     safe_baseline_name = None):
     """
     Update the cfg structure with build-specific paths.
 
@@ -374,14 +648,20 @@ def _set_build_paths(cfg, dirpath_meta_tmp, safe_branch_name):
     being built are similar, but different
     otherwise.
 
-    We assume that different configurations on the
-    same branch are similar enough to permit
-    incremental builds to be used.
+    The temporary build directory is named after
+    safe_baseline_name if it is given, so that
+    baselines which may be built concurrently do
+    not share an isolated clone or index store.
+    Otherwise it is named after the branch. The
+    cms directory is always named after the branch,
+    as the build id already identifies the commit.
 
     """
+    if safe_baseline_name is None:
+        safe_baseline_name = safe_branch_name
     dirpath_meta_cms   = cfg['paths']['dirpath_meta_cms']
     dirpath_branch_cms = os.path.join(dirpath_meta_cms, safe_branch_name)
-    dirpath_branch_tmp = os.path.join(dirpath_meta_tmp, safe_branch_name)
+    dirpath_branch_tmp = os.path.join(dirpath_meta_tmp, safe_baseline_name)
     dirpath_branch_log = os.path.join(dirpath_branch_tmp, 'log')
     dirpath_branch_src = os.path.join(dirpath_branch_tmp, 'src')
     cfg['paths']['dirpath_branch_cms']   = dirpath_branch_cms
@@ -428,30 +708,103 @@ def _mnemonic_codeword(text, dirpath_lwc_root = None):
 
 
 # -----------------------------------------------------------------------------
-def _build_and_evaluate_design(cfg):
+def _build_and_evaluate_design(cfg, abort_event = None):
     """
     Build the "current" design proposal and evaluate its performance.
 
+    The build streams messages back to us as it
+    runs (see da.build_channel). If abort_event is
+    set while the build is running, the build is
+    asked to abort.
+
     """
     # We want to treat the build process as an
     # integrated part of the product, so as soon
     # as we know which system configuration is
-    # to be built, we launch a new (sub)process
-    # so that the remainder of the build process
-    # can be taken from that system configuration.
+    # to be built, we hand over to a separate
+    # process so that the remainder of the build
+    # process can be taken from that system
+    # configuration.
     #
-
-    # We define a pickle file that we use to record
-    # the result of the build and make sure that
-    # any old files with the same name have been
-    # removed from the temporary directory.
+    # By default this is a persistent build server
+    # for the isolated source tree, which avoids
+    # paying the cost of importing the build
+    # dependencies for every build. If the server
+    # is disabled or cannot be reached, we launch
+    # a new (sub)process instead.
+    #
+    # Outputs from a completed build of the same
+    # tree and build configuration (e.g. on some
+    # other branch) are reused if they are in the
+    # artifact store, so we do not need to build
+    # at all.
     #
-    dirpath_branch_tmp   = cfg['paths']['dirpath_branch_tmp']
-    filepath_result      = os.path.join(dirpath_branch_tmp, 'result.pickle')
-    cfg['paths']['filepath_result'] = filepath_result
-    if os.path.isfile(filepath_result):
-        os.remove(filepath_result)
+    dirpath_log = cfg['paths']['dirpath_branch_log']
+    store       = da.artifact_store.open_store(cfg)
+    key         = None if store is None else da.artifact_store.build_key(cfg)
+    if key is not None:
+        if store.link(key, dirpath_log):
+            logging.info('Build outputs reused from artifact store: %s', key)
+            if cfg['options']['enable_cms_registration']:
+                da.cms.register(cfg)
+            return da.constants.BUILD_COMPLETED
+        store.prepare(dirpath_log)
+
+    on_message = _message_handler(cfg, abort_event)
+    result     = None
+    if cfg['options'].get('enable_build_server', False):
+        result = da.build_server.request_build(cfg, on_message, abort_event)
+    if result is None:
+        result = _run_build_subprocess(cfg, on_message, abort_event)
+
+    # Examine output and raise exception if required.
+    if result == da.constants.BUILD_COMPLETED:
+        if key is not None:
+            store.put(key, dirpath_log)
+        return result
+    else:
+        _reraise_build_exception(cfg, result)
+
+
+# -----------------------------------------------------------------------------
+def _message_handler(cfg, abort_event):
+    """
+    Return a function to handle messages streamed from a build.
+
+    If the build is configured to abort on the
+    first error, the first nonconformity in any
+    build sets abort_event, so the builds for
+    other baselines are aborted straight away.
+
+    """
+    options          = cfg['options']
+    is_abort_enabled = (    abort_event is not None
+                        and options.get('errors_abort_immediately', False))
 
+    def _on_message(message):
+        """
+        Log nonconformities, and set abort_event if appropriate.
+
+        """
+        if message['type'] != da.build_channel.NONCONFORMITY:
+            return
+        nonconformity = message['payload']
+        logging.info('%s: %s (%s:%s)', nonconformity['tool'],
+                                       nonconformity['msg_id'],
+                                       nonconformity['path'],
+                                       nonconformity['line'])
+        if is_abort_enabled:
+            abort_event.set()
+
+    return _on_message
+
+
+# -----------------------------------------------------------------------------
+def _run_build_subprocess(cfg, on_message = None, abort_event = None):
+    """
+    Run the build in a new subprocess and return the result.
+
+    """
     # We pickle the configuration and base64 encode
     # it so we can send it as a command-line parameter
     # to the build process.
@@ -459,7 +812,12 @@ def _build_and_evaluate_design(cfg):
     pickled_cfg = base64.b64encode(
                     pickle.dumps(cfg, protocol = da.constants.PICKLE_PROTOCOL))
 
-    # Call the build in a subprocess.
+    # Call the build in a subprocess, which inherits
+    # one end of a socket pair to use as a channel
+    # for streaming messages (and the final result)
+    # back to us. We wait for the subprocess in a
+    # separate thread, so that we can listen to the
+    # channel while it is running.
     #
     # NOTE: We communicate with the subprocess
     #       using pickled data -- so there are
@@ -467,57 +825,85 @@ def _build_and_evaluate_design(cfg):
     #       we need to be careful to keep this
     #       data secure.
     #
-    dirpath_isolated_src = cfg['paths']['dirpath_isolated_src']
-    da.lwc.run.python3(['-m', 'da.metabuild', pickled_cfg],
-                       dirpath_lwc_root = dirpath_isolated_src)
+    dirpath_isolated_src  = cfg['paths']['dirpath_isolated_src']
+    (conn, conn_child)    = socket.socketpair(socket.AF_UNIX)
+    fd_child              = conn_child.fileno()
+    subprocess_error_list = []
+
+    def _call_subprocess():
+        """
+        Run the build subprocess, closing our end of its channel afterwards.
+
+        """
+        try:
+            da.lwc.run.python3(
+                        ['-m', 'da.metabuild', pickled_cfg, str(fd_child)],
+                        dirpath_lwc_root = dirpath_isolated_src,
+                        pass_fds         = (fd_child,))
+        # Pylint rule W0703 (broad-except) disabled.
+        # Exceptions are re-raised in the calling
+        # thread.
+        #
+        except Exception as err:                        # pylint: disable=W0703
+            subprocess_error_list.append(err)
+        finally:
+            conn_child.close()
+
+    thread = threading.Thread(target = _call_subprocess)
+    thread.start()
+    with conn:
+        try:
+            return da.build_channel.listen(conn, on_message, abort_event)
+        except EOFError:
+            thread.join()
+            if subprocess_error_list:
+                raise subprocess_error_list[0]
+            raise RuntimeError(
+                'No result from subsidiary build process. '
+                'It seems to have terminated unexpectedly.')
+        finally:
+            thread.join()
 
-    # We expect the subprocess to pickle the
-    # results (Exception or success) in our
-    # defined results file.
-    #
-    if not os.path.isfile(filepath_result):
-        raise RuntimeError(
-            'Could not find result file from subsidiary build process. '
-            'It seems to have terminated unexpectedly.')
-    with open(filepath_result, 'rb', buffering = 1) as file_result:
-        result = pickle.load(file_result)
 
-    # Examine output and raise exception if required.
-    if result == da.constants.BUILD_COMPLETED:
-        return result
-    else:
-        (_, exception_value, trace_back) = result
-
-        # We want to be able to open our text editor
-        # or IDE at the location where an exception
-        # was thrown - but we don't want to open
-        # the file *inside* the isolation dir, as
-        # our changes will simply be overwritten
-        # on the next build. Instead, we want to
-        # open the *real* source file in our local
-        # working copy.
-        #
-        # To do this, we re-write the contents of
-        # the traceback data structure so that
-        # references to the isolated source
-        # directory get replaced by references
-        # to the "outer" local working copy
-        # directory.
-        #
-        dirpath_outer_lwc_root = cfg['paths']['dirpath_lwc_root']
-        trace_back_dict        = tblib.Traceback(trace_back).to_dict()
-        for obj in da.util.walkobj(trace_back_dict, gen_leaf    = False,
-                                                    gen_nonleaf = True,
-                                                    gen_path    = False,
-                                                    gen_obj     = True):
-            if isinstance(obj, collections.Mapping):
-                for key in ('co_filename', '__file__'):
-                    if key in obj:
-                        obj[key] = obj[key].replace(dirpath_isolated_src,
-                                                    dirpath_outer_lwc_root)
-
-        raise exception_value.with_traceback(
-                    tblib.Traceback.from_dict(trace_back_dict).as_traceback())
+# -----------------------------------------------------------------------------
+def _reraise_build_exception(cfg, exc_info):
+    """
+    Raise the exception from a failed build in the metabuild process.
+
+    """
+    (_, exception_value, trace_back) = exc_info
+
+    # We want to be able to open our text editor
+    # or IDE at the location where an exception
+    # was thrown - but we don't want to open
+    # the file *inside* the isolation dir, as
+    # our changes will simply be overwritten
+    # on the next build. Instead, we want to
+    # open the *real* source file in our local
+    # working copy.
+    #
+    # To do this, we re-write the contents of
+    # the traceback data structure so that
+    # references to the isolated source
+    # directory get replaced by references
+    # to the "outer" local working copy
+    # directory.
+    #
+    dirpath_isolated_src   = cfg['paths']['dirpath_isolated_src']
+    dirpath_outer_lwc_root = cfg['paths']['dirpath_lwc_root']
+    trace_back_dict        = tblib.Traceback(trace_back).to_dict()
+    for obj in da.util.walkobj(trace_back_dict, gen_leaf    = False,
+                                                gen_nonleaf = True,
+                                                gen_path    = False,
+                                                gen_obj     = True):
+        if isinstance(obj, collections.Mapping):
+            for key in ('co_filename', '__file__'):
+                if key in obj:
+                    obj[key] = obj[key].replace(dirpath_isolated_src,
+                                                dirpath_outer_lwc_root)
+
+    raise exception_value.with_traceback(
+                tblib.Traceback.from_dict(trace_back_dict).as_traceback())
 
 
 # -----------------------------------------------------------------------------
@@ -526,17 +912,58 @@ def run_subsidiary_build(argv = None):
     Decode the build configuration, run the build, then encode the result.
 
     """
-    # We expect a single input argument holding
-    # a pickled and base64 encoded representation
-    # of the meta-build configuration.
+    # We expect an input argument holding a pickled
+    # and base64 encoded representation of the
+    # meta-build configuration, followed by the
+    # file descriptor of the channel on which we
+    # report back to the metabuild process.
     #
     if argv is None:
         argv = sys.argv
-    cfg = pickle.loads(base64.b64decode(argv[1]))
+    cfg  = pickle.loads(base64.b64decode(argv[1]))
+    conn = socket.socket(fileno = int(argv[2]))
+
+    # We expect the result to either be da.constants.BUILD_COMPLETED (0)
+    # or exception information.
+    #
+    # We send the serialised result over the channel
+    # so that the metabuild process can rethrow any
+    # exceptions raised in this process.
+    #
+    # We are not using stdout for this inter-process
+    # communication because many of the various
+    # third-party build tools that we will be
+    # launching will need to use stdout for their
+    # own HMI display, so I don't want to redirect
+    # it or screw with it in any way. (py.test does
+    # some pretty advanced stuff to stdout -- which
+    # I especially do not wish to screw with in
+    # any way).
+    #
+    with conn:
+        with da.build_channel.context(conn):
+            result = run_build(cfg)
+        da.build_channel.send_message(
+                                    conn, {'type':    da.build_channel.RESULT,
+                                           'payload': result})
+    return 0
+
 
+# -----------------------------------------------------------------------------
+def run_build(cfg):
+    """
+    Run the build in this process and return the result.
+
+    This is called in the build subprocess, or by
+    the build server, with the Python environment
+    and the da package taken from the isolated
+    source tree.
+
+    """
     # The constant da.constants.BUILD_COMPLETED is
     # returned if the build is succesful. Otherwise,
-    # a pickled exception object is returned.
+    # exception information (as returned by
+    # sys.exc_info()) is returned.
     #
     try:
 
@@ -589,7 +1016,11 @@ def run_subsidiary_build(argv = None):
                     'enable_dep_fetch_src':  steps['enable_dep_fetch_src'],
                     'enable_dep_build':      steps['enable_dep_build'],
                     'exclusion':             options['dep_build_exclusion'],
-                    'limitation':            options['dep_build_limitation']}
+                    'limitation':            options['dep_build_limitation'],
+                    'concurrency':           options['dep_build_concurrency'],
+                    'enable_cache':          options['enable_dep_build_cache'],
+                    'dirpath_mirror':        options['dep_mirror_dirpath'],
+                    'fetch_concurrency':     options['dep_fetch_concurrency']}
                 _dep.build(
                     dirpath_lwc_root = cfg['paths']['dirpath_lwc_root'],
                     dirpath_log      = dirpath_branch_log,
@@ -613,28 +1044,7 @@ def run_subsidiary_build(argv = None):
     except Exception:                                   # pylint: disable=W0703
         result = sys.exc_info()
 
-    # We expect the result to either be da.constants.BUILD_COMPLETED (0)
-    # or an instance of an exception class.
-    #
-    # We write the serialised result to a temporary
-    # file so that the metabuild process can rethrow
-    # any exceptions raised in this process.
-    #
-    # We are not using stdout for this inter-process
-    # communication because many of the various
-    # third-party build tools that we will be
-    # launching will need to use stdout for their
-    # own HMI display, so I don't want to redirect
-    # it or screw with it in any way. (py.test does
-    # some pretty advanced stuff to stdout -- which
-    # I especially do not wish to screw with in
-    # any way).
-    #
-    filepath_result = cfg['paths']['filepath_result']
-    with open(filepath_result, 'wb', buffering = 1) as file_result:
-        pickle.dump(
-                result, file_result, protocol = da.constants.PICKLE_PROTOCOL)
-    return 0
+    return result
 
 
 # -----------------------------------------------------------------------------
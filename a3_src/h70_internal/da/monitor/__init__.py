@@ -35,10 +35,15 @@ import os
 import os.path
 
 import da
+import da.build_channel
 import da.constants
+import da.exception
+import da.lwc.file
 import da.lwc.run
 import da.monitor.console_reporter
 import da.monitor.html_reporter
+import da.monitor.step_timing
+import da.prioritisation
 import da.util
 
 
@@ -61,26 +66,45 @@ class BuildMonitor:
                                             filepath = filepath_build_report)
 
         da.util.ensure_dir_exists(dirpath_branch_log)
-        self.dirpath_branch_log    = dirpath_branch_log
-        self.filepath_build_report = filepath_build_report
-        self.url_build_report      = url_build_report
-        self.cfg                   = cfg
-        self.nonconformity_list    = []
-        self.html_reporter         = da.monitor.html_reporter.coro(
+        self.cfg                = cfg
+        self.nonconformity_list = []
+        self.step_timer         = da.monitor.step_timing.open_timer(cfg)
+        self.html_reporter      = da.monitor.html_reporter.coro(
                                                         filepath_build_report,
                                                         dirpath_branch_log)
-        self.console_reporter      = da.monitor.console_reporter.coro(
+        self.console_reporter   = da.monitor.console_reporter.coro(
                                                         cfg,
-                                                        url_build_report)
+                                                        url_build_report,
+                                                        self.step_timer)
+
+        # Outcomes are recorded to inform the
+        # prioritisation of subsequent builds.
+        self.risk_model         = None
+        if cfg.get('options', {}).get('enable_risk_prioritisation', False):
+            self.risk_model = da.prioritisation.RiskModel(
+                                    da.prioritisation.statistics_filepath(cfg))
 
     # -------------------------------------------------------------------------
     def report_progress(self, build_unit):
         """
         Method to handle build monitoring and progress reporting.
 
+        If the metabuild has asked us to abort (because
+        the build for another baseline has failed),
+        the build is aborted before the next build unit
+        is processed.
+
         """
+        if da.build_channel.is_abort_requested():
+            raise da.exception.BuildAborted(
+                                    'Build aborted by the metabuild process.')
+        da.build_channel.publish(da.build_channel.PROGRESS,
+                                 build_unit['relpath'])
         self.html_reporter.send(build_unit)
         self.console_reporter.send(build_unit)
+        if self.risk_model is not None:
+            self.risk_model.start_unit(build_unit['relpath'],
+                                       build_unit.get('seconds', None))
 
     # -------------------------------------------------------------------------
     # Pylint error R0913 (Too many arguments) has
@@ -131,13 +155,21 @@ class BuildMonitor:
                 with open(path) as hfile:
                     line = sum(1 for line_of_text in hfile)
 
-        self.nonconformity_list.append({'tool':   tool,
-                                        'msg_id': msg_id,
-                                        'msg':    msg,
-                                        'path':   path,
-                                        'line':   line,
-                                        'col':    col})
+        nonconformity = {'tool':   tool,
+                         'msg_id': msg_id,
+                         'msg':    msg,
+                         'path':   path,
+                         'line':   line,
+                         'col':    col}
+        self.nonconformity_list.append(nonconformity)
+        da.build_channel.publish(da.build_channel.NONCONFORMITY, nonconformity)
+        if self.risk_model is not None:
+            dirpath_lwc_root = self.cfg['paths']['dirpath_lwc_root']
+            self.risk_model.record_nonconformity(
+                            tool    = tool,
+                            relpath = _unit_relpath(path, dirpath_lwc_root))
         if self.cfg['options']['errors_abort_immediately']:
+            self._save_risk_model()
             _log_and_abort(self.cfg, self.nonconformity_list)
 
     # -------------------------------------------------------------------------
@@ -148,9 +180,95 @@ class BuildMonitor:
         """
         self.html_reporter.send(da.constants.BUILD_COMPLETED)
         self.console_reporter.send(da.constants.BUILD_COMPLETED)
+        if self.step_timer is not None:
+            self.step_timer.close()
+        self._save_risk_model()
         if self.nonconformity_list:
             _log_and_abort(self.cfg, self.nonconformity_list)
 
+    # -------------------------------------------------------------------------
+    def _save_risk_model(self):
+        """
+        Save the outcomes recorded so far for use in prioritising later builds.
+
+        """
+        if self.risk_model is not None:
+            self.risk_model.save()
+
+
+# =============================================================================
+class NonconformityRecorder:
+    """
+    Class for recording nonconformities in a build worker process.
+
+    This class provides the subset of the BuildMonitor
+    interface that is used by the unit processing steps.
+    Nonconformities are recorded without any path
+    translation, reporting or abort logic, so that they
+    can be sent back to the parent process and replayed
+    into the real BuildMonitor, which then applies the
+    configured nonconformity response policy.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Return an initialised instance of the NonconformityRecorder class.
+
+        """
+        self.nonconformity_list = []
+
+    # -------------------------------------------------------------------------
+    def report_progress(self, build_unit):            # pylint: disable=R0201
+        """
+        Ignore progress reports. Progress is reported by the parent process.
+
+        """
+        pass
+
+    # -------------------------------------------------------------------------
+    def report_nonconformity(                           # pylint: disable=R0913
+                        self, tool, msg_id, msg, path, line = 1, col = 0):
+        """
+        Record a nonconformity for later replay into a BuildMonitor.
+
+        """
+        self.nonconformity_list.append({'tool':   tool,
+                                        'msg_id': msg_id,
+                                        'msg':    msg,
+                                        'path':   path,
+                                        'line':   line,
+                                        'col':    col})
+
+    # -------------------------------------------------------------------------
+    def drain(self):
+        """
+        Return and clear the list of recorded nonconformities.
+
+        """
+        nonconformity_list      = self.nonconformity_list
+        self.nonconformity_list = []
+        return nonconformity_list
+
+
+# -----------------------------------------------------------------------------
+def _unit_relpath(path, dirpath_lwc_root):
+    """
+    Return the relpath of the build unit for a nonconformity path, or None.
+
+    Nonconformities in specification files are
+    attributed to the corresponding design document.
+    None is returned for paths outside the local
+    working copy.
+
+    """
+    if not path.startswith(os.path.join(dirpath_lwc_root, '')):
+        return None
+    if da.lwc.file.is_specification_file(path):
+        path = da.lwc.file.design_filepath_for(path)
+    return os.path.relpath(path, dirpath_lwc_root)
+
 
 # -----------------------------------------------------------------------------
 def _log_and_abort(cfg, nonconformity_list):
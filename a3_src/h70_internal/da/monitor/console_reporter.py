@@ -47,10 +47,14 @@ import da.util
 
 # -----------------------------------------------------------------------------
 @da.util.coroutine
-def coro(cfg, url_build_report):
+def coro(cfg, url_build_report, step_timer = None):
     """
     Coroutine for reporting build progress to the command line interface.
 
+    If a step_timer is supplied, the slowest
+    processing steps are listed in the footer
+    printed at the end of the build.
+
     """
     _print_cli_header(
         build_id         = cfg['build_id'],
@@ -106,9 +110,14 @@ def coro(cfg, url_build_report):
         # Update the cache.
         cache['num_build_units'] = iunit
 
+    slowest_steps = []
+    if step_timer is not None:
+        slowest_steps = step_timer.slowest(
+                            cfg['options'].get('step_timing_top_n', 10))
     _print_cli_footer(
-        start_time = cfg['timestamp']['datetime_utc'],
-        end_time   = datetime.datetime.utcnow())
+        start_time    = cfg['timestamp']['datetime_utc'],
+        end_time      = datetime.datetime.utcnow(),
+        slowest_steps = slowest_steps)
     os.sync()
 
     _ = (yield)  # Prevent StopIteration from being raised.
@@ -151,13 +160,22 @@ def _print_cli_header(build_id, commit_summary, url_build_report):
 
 
 # -----------------------------------------------------------------------------
-def _print_cli_footer(start_time, end_time):
+def _print_cli_footer(start_time, end_time, slowest_steps = ()):
     """
     Print a build-process footer to the console.
 
     """
     delta_secs = (end_time - start_time).total_seconds()
     _msg('Completed in:', '{secs:0.0f}s.'.format(secs = delta_secs))
+    if slowest_steps:
+        _msg('Slowest steps:')
+        for timing in slowest_steps:
+            _msg('', '{wall:7.2f}s {cpu:7.2f}s cpu {rss:+8d}kB {step:12s} '
+                     '{relpath}'.format(wall    = timing['wall_secs'],
+                                        cpu     = timing['cpu_secs'],
+                                        rss     = timing['rss_delta_kb'],
+                                        step    = timing['step'],
+                                        relpath = timing['relpath']))
 
 
 # -----------------------------------------------------------------------------
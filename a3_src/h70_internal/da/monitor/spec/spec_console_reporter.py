@@ -110,6 +110,50 @@ class SpecifyPrintAllNonconformities:
         assert len(out) > 0  # TODO: CHECK MORE STRICTLY
 
 
+# =============================================================================
+class Specify_PrintCliFooter:
+    """
+    Specify the da.monitor.console_reporter._print_cli_footer() function.
+
+    """
+
+    def it_lists_the_slowest_steps(self, capsys):
+        """
+        The _print_cli_footer() function prints each of the slowest steps.
+
+        """
+        import da.monitor.console_reporter
+        start_time = datetime.datetime(2016, 1, 1, 0, 0, 0)
+        end_time   = datetime.datetime(2016, 1, 1, 0, 0, 5)
+        da.monitor.console_reporter._print_cli_footer(
+                    start_time    = start_time,
+                    end_time      = end_time,
+                    slowest_steps = [{'relpath':         'TEST_RELPATH',
+                                      'step':            'pylint',
+                                      'wall_secs':       2.5,
+                                      'cpu_secs':        2.0,
+                                      'rss_delta_kb':    1024}])
+        (out, err) = capsys.readouterr()
+        assert err == ''
+        lines = out.splitlines()
+        assert lines[0] == 'Completed in:   5s.'
+        assert lines[1].startswith('Slowest steps:')
+        assert 'pylint' in lines[2]
+        assert lines[2].endswith('TEST_RELPATH')
+
+    def it_omits_the_step_list_when_there_are_no_steps(self, capsys):
+        """
+        The _print_cli_footer() function prints only the duration by default.
+
+        """
+        import da.monitor.console_reporter
+        da.monitor.console_reporter._print_cli_footer(
+                    start_time = datetime.datetime(2016, 1, 1, 0, 0, 0),
+                    end_time   = datetime.datetime(2016, 1, 1, 0, 0, 5))
+        (out, _) = capsys.readouterr()
+        assert out == 'Completed in:   5s.\n'
+
+
 # =============================================================================
 class Specify_Msg:
     """
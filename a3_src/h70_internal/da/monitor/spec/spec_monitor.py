@@ -167,3 +167,66 @@ class SpecifyBuildMonitorNotifyBuildEnd:
         """
         import da.monitor
         assert callable(da.monitor.BuildMonitor.notify_build_end)
+
+
+# =============================================================================
+class SpecifyNonconformityRecorderReportProgress:
+    """
+    Specify the da.monitor.NonconformityRecorder.report_progress() function.
+
+    """
+
+    def it_is_callable(self):
+        """
+        The report_progress() method is callable.
+
+        """
+        import da.monitor
+        assert callable(da.monitor.NonconformityRecorder.report_progress)
+
+
+# =============================================================================
+class SpecifyNonconformityRecorderReportNonconformity:
+    """
+    Specify the da.monitor.NonconformityRecorder.report_nonconformity() func.
+
+    """
+
+    def it_records_nonconformities_unchanged(self):
+        """
+        The report_nonconformity() method records its arguments verbatim.
+
+        """
+        import da.monitor
+        recorder = da.monitor.NonconformityRecorder()
+        recorder.report_nonconformity(tool   = 'TEST_TOOL',
+                                      msg_id = 'TEST_ID',
+                                      msg    = 'TEST_MSG',
+                                      path   = '/no/such/path')
+        assert recorder.nonconformity_list == [{'tool':   'TEST_TOOL',
+                                                'msg_id': 'TEST_ID',
+                                                'msg':    'TEST_MSG',
+                                                'path':   '/no/such/path',
+                                                'line':   1,
+                                                'col':    0}]
+
+
+# =============================================================================
+class SpecifyNonconformityRecorderDrain:
+    """
+    Specify the da.monitor.NonconformityRecorder.drain() function.
+
+    """
+
+    def it_returns_and_clears_recorded_nonconformities(self):
+        """
+        The drain() method returns recorded items and empties the recorder.
+
+        """
+        import da.monitor
+        recorder = da.monitor.NonconformityRecorder()
+        recorder.report_nonconformity('TOOL', 'ID', 'MSG', 'PATH', 2, 3)
+        drained = recorder.drain()
+        assert len(drained) == 1
+        assert drained[0]['line'] == 2
+        assert recorder.drain() == []
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.monitor.step_timing module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import json
+
+
+# =============================================================================
+class SpecifyOpenTimer:
+    """
+    Specify the da.monitor.step_timing.open_timer() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_none_when_step_timing_is_disabled(self, tmpdir):
+        """
+        The open_timer() function returns None unless enable_step_timing.
+
+        """
+        import da.monitor.step_timing
+        cfg = {'options': {},
+               'paths':   {'dirpath_branch_log': str(tmpdir)}}
+        assert da.monitor.step_timing.open_timer(cfg) is None
+        cfg['options']['enable_step_timing'] = False
+        assert da.monitor.step_timing.open_timer(cfg) is None
+
+    # -------------------------------------------------------------------------
+    def it_writes_to_the_branch_log_directory(self, tmpdir):
+        """
+        The open_timer() function streams records to steps.timing.jseq.
+
+        """
+        import da.monitor.step_timing
+        cfg = {'options': {'enable_step_timing': True},
+               'paths':   {'dirpath_branch_log': str(tmpdir)}}
+        step_timer = da.monitor.step_timing.open_timer(cfg)
+        step_timer.record({'step': 'TEST', 'wall_secs': 1.0})
+        assert tmpdir.join('steps.timing.jseq').read() == (
+                                    '{"step": "TEST", "wall_secs": 1.0}\n')
+        step_timer.close()
+
+
+# =============================================================================
+class SpecifyStepTimerWrap:
+    """
+    Specify the da.monitor.step_timing.StepTimer.wrap() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_records_each_item_and_passes_results_through(self, tmpdir):
+        """
+        The wrapped coroutine returns results and records one line per unit.
+
+        """
+        import da.util
+        import da.monitor.step_timing
+
+        @da.util.coroutine
+        def double():
+            """
+            Yield double the number of each build unit received.
+
+            """
+            result = None
+            while True:
+                build_unit = (yield result)
+                result     = build_unit['number'] * 2
+
+        filepath   = str(tmpdir.join('steps.timing.jseq'))
+        step_timer = da.monitor.step_timing.StepTimer(filepath)
+        wrapped    = step_timer.wrap('double', double())
+        assert wrapped.send({'relpath': 'a', 'number': 1}) == 2
+        assert wrapped.send({'relpath': 'b', 'number': 2}) == 4
+        step_timer.close()
+
+        with open(filepath) as file:
+            record_list = [json.loads(line) for line in file]
+        assert [record['relpath'] for record in record_list] == ['a', 'b']
+        for record in record_list:
+            assert record['step'] == 'double'
+            assert record['wall_secs'] >= 0.0
+            assert record['cpu_secs'] >= 0.0
+            assert 'rss_delta_kb' in record
+
+    # -------------------------------------------------------------------------
+    def it_records_steps_which_raise(self):
+        """
+        A step is recorded even if the wrapped coroutine raises an exception.
+
+        """
+        import pytest
+        import da.util
+        import da.monitor.step_timing
+
+        @da.util.coroutine
+        def fail():
+            """
+            Raise RuntimeError for each build unit received.
+
+            """
+            while True:
+                _ = (yield)
+                raise RuntimeError('TEST')
+
+        step_timer = da.monitor.step_timing.StepTimer()
+        wrapped    = step_timer.wrap('fail', fail())
+        with pytest.raises(RuntimeError):
+            wrapped.send({'relpath': 'a'})
+        assert [record['step'] for record in step_timer.record_list] == [
+                                                                    'fail']
+
+
+# =============================================================================
+class SpecifyStepTimerRecord:
+    """
+    Specify the da.monitor.step_timing.StepTimer.record() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_keeps_records_in_memory_without_a_file(self):
+        """
+        Records are kept in memory when the StepTimer has no filepath.
+
+        """
+        import da.monitor.step_timing
+        step_timer = da.monitor.step_timing.StepTimer()
+        step_timer.record({'wall_secs': 1.0})
+        assert step_timer.record_list == [{'wall_secs': 1.0}]
+
+
+# =============================================================================
+class SpecifyStepTimerDrain:
+    """
+    Specify the da.monitor.step_timing.StepTimer.drain() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_records_made_since_the_last_drain(self):
+        """
+        Each record is returned by exactly one call to drain().
+
+        """
+        import da.monitor.step_timing
+        step_timer = da.monitor.step_timing.StepTimer()
+        step_timer.record({'wall_secs': 1.0})
+        assert step_timer.drain() == [{'wall_secs': 1.0}]
+        assert step_timer.drain() == []
+        step_timer.record({'wall_secs': 2.0})
+        assert step_timer.drain() == [{'wall_secs': 2.0}]
+
+
+# =============================================================================
+class SpecifyStepTimerSlowest:
+    """
+    Specify the da.monitor.step_timing.StepTimer.slowest() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_records_with_the_longest_wall_time(self):
+        """
+        The slowest() method returns the top N records by wall time.
+
+        """
+        import da.monitor.step_timing
+        step_timer = da.monitor.step_timing.StepTimer()
+        for wall_secs in (1.0, 3.0, 2.0):
+            step_timer.record({'wall_secs': wall_secs})
+        assert step_timer.slowest(2) == [{'wall_secs': 3.0},
+                                         {'wall_secs': 2.0}]
+
+
+# =============================================================================
+class SpecifyStepTimerClose:
+    """
+    Specify the da.monitor.step_timing.StepTimer.close() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_can_be_called_more_than_once(self, tmpdir):
+        """
+        The close() method is idempotent.
+
+        """
+        import da.monitor.step_timing
+        step_timer = da.monitor.step_timing.StepTimer(
+                                        str(tmpdir.join('steps.timing.jseq')))
+        step_timer.close()
+        step_timer.close()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+The step_timing module measures the resources used by each processing step.
+
+When step timing is enabled, each processing step
+coroutine in the unit processing pipeline is
+wrapped so that the wall clock time, CPU time and
+change in resident set size are measured for each
+(build unit, step) pair. CPU time includes
+that used by any child processes (e.g. mypy)
+which were waited for during the step.
+
+Records are streamed to a jseq file as they are
+made, and the slowest steps are summarised at the
+end of the build. When step timing is disabled,
+the coroutines are not wrapped at all, so there
+is no overhead.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import contextlib
+import json
+import os
+import resource
+import time
+
+import da.build_channel
+import da.util
+
+
+FILENAME = 'steps.timing.jseq'
+
+
+# -----------------------------------------------------------------------------
+def open_timer(cfg):
+    """
+    Return a StepTimer for the build, or None if step timing is not enabled.
+
+    """
+    if not cfg.get('options', {}).get('enable_step_timing', False):
+        return None
+    return StepTimer(os.path.join(cfg['paths']['dirpath_branch_log'],
+                                  FILENAME))
+
+
+# =============================================================================
+class StepTimer:
+    """
+    Class for recording the resources used by each processing step.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, filepath = None):
+        """
+        Return an initialised instance of the StepTimer class.
+
+        If a filepath is given, records are written
+        to it as they are made. Otherwise they are
+        only kept in memory.
+
+        """
+        import psutil
+        self.record_list  = []
+        self._num_drained = 0
+        self._file        = None
+        self._process     = psutil.Process()
+        if filepath is not None:
+            da.util.ensure_dir_exists(os.path.dirname(filepath))
+            self._file = open(filepath, 'wt')
+
+    # -------------------------------------------------------------------------
+    def wrap(self, step_id, coro):
+        """
+        Return a coroutine which times each item sent to the supplied one.
+
+        """
+        return _timed_coro(self, step_id, coro)
+
+    # -------------------------------------------------------------------------
+    @contextlib.contextmanager
+    def measure(self, step_id, relpath):
+        """
+        Record the resources used within the context as a single step.
+
+        The step is recorded even if an exception
+        is raised within the context.
+
+        """
+        before = _snapshot(self._process)
+        try:
+            yield
+        finally:
+            after = _snapshot(self._process)
+            self.record({
+                'relpath':          relpath,
+                'step':             step_id,
+                'wall_secs':        after[0] - before[0],
+                'cpu_secs':         after[1] - before[1],
+                'rss_delta_kb':     after[2] - before[2]})
+
+    # -------------------------------------------------------------------------
+    def record(self, timing):
+        """
+        Add a timing record, writing it to the jseq file if there is one.
+
+        The record is also published on the channel
+        to the metabuild, if there is one.
+
+        """
+        self.record_list.append(timing)
+        da.build_channel.publish(da.build_channel.TIMING, timing)
+        if self._file is not None:
+            self._file.write('{line}\n'.format(
+                                line = json.dumps(timing, sort_keys = True)))
+            self._file.flush()
+
+    # -------------------------------------------------------------------------
+    def drain(self):
+        """
+        Return the records made since the last call to drain().
+
+        """
+        record_list       = self.record_list[self._num_drained:]
+        self._num_drained = len(self.record_list)
+        return record_list
+
+    # -------------------------------------------------------------------------
+    def slowest(self, num_records):
+        """
+        Return the specified number of records with the longest wall time.
+
+        """
+        return sorted(self.record_list,
+                      key     = lambda timing: timing['wall_secs'],
+                      reverse = True)[:num_records]
+
+    # -------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the jseq file, if there is one.
+
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# -----------------------------------------------------------------------------
+@da.util.coroutine
+def _timed_coro(step_timer, step_id, coro):
+    """
+    Forward each build unit to coro, recording the resources used.
+
+    The value returned by coro is passed back to
+    the sender. If coro raises an exception (e.g.
+    because a nonconformity has aborted the build)
+    the step is still recorded.
+
+    """
+    result = None
+    while True:
+        build_unit = (yield result)
+        with step_timer.measure(step_id, build_unit['relpath']):
+            result = coro.send(build_unit)
+
+
+# -----------------------------------------------------------------------------
+def _snapshot(process):
+    """
+    Return wall time, CPU time and current RSS for the supplied process.
+
+    The current rather than the peak resident set
+    size is used, as the peak is a high water mark
+    for the whole build and so rarely changes from
+    one step to the next.
+
+    """
+    usage_self     = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_secs       = (  usage_self.ru_utime     + usage_self.ru_stime
+                      + usage_children.ru_utime + usage_children.ru_stime)
+    rss_kb         = process.memory_info().rss // 1024
+    return (time.perf_counter(), cpu_secs, rss_kb)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Risk-based prioritisation of build units.
+
+We want to report nonconformities to the developer
+as soon as possible after the start of the build.
+To do this, we order the build units so that those
+which are most likely to yield nonconformities
+quickly are processed first.
+
+For each build unit we keep a recency-weighted
+history of the builds in which each checker found
+a nonconformity in that unit, together with a
+recency-weighted average of the time taken to
+process the unit. From these we estimate the
+expected number of checkers that will report a
+nonconformity for the unit, per second spent
+processing it, and sort in decreasing order of
+that estimate.
+
+Units without any history are assumed to be the
+riskiest of all, and are placed first.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import itertools
+import json
+import os
+import time
+
+import da.util
+
+
+# Weight given to the history of a unit relative
+# to the outcome of the latest build. Lower values
+# forget old failures more quickly.
+#
+DECAY = 0.8
+
+# Processing times are clamped to this minimum to
+# stop very fast (e.g. cached) units from gaining
+# an unbounded priority.
+#
+MIN_SECONDS = 0.01
+
+# Additive (Laplace) smoothing for failure rates.
+#
+PRIOR_FAILED   = 0.1
+PRIOR_OBSERVED = 1.0
+
+
+# -----------------------------------------------------------------------------
+def statistics_filepath(cfg):
+    """
+    Return the path of the file holding risk statistics from previous builds.
+
+    Like the build monitor cache, statistics are
+    kept separately for each branch and build
+    configuration, in the branch tmp directory.
+
+    """
+    return os.path.join(cfg['paths']['dirpath_branch_tmp'],
+                        'build_risk_stats.json')
+
+
+# =============================================================================
+class RiskModel:
+    """
+    Per build unit nonconformity and duration statistics.
+
+    The statistics are updated as the build progresses,
+    by calls to start_unit() and record_nonconformity(),
+    and are saved to disk by save(). The time taken to
+    process a unit is measured from the call to
+    start_unit() for that unit to the call to
+    start_unit() for the next unit (or to the call
+    to save()), unless it is given explicitly (e.g.
+    because the unit was processed in a worker).
+
+    Nonconformities are attributed to the unit that
+    they were reported against, which need not be
+    the unit in progress: results from the slow lane
+    and from worker processes arrive after other
+    units have been started.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, filepath):
+        """
+        Return an instance of the RiskModel class loaded from filepath.
+
+        """
+        self.filepath = filepath
+        self.stats    = {}
+        if os.path.isfile(filepath):
+            try:
+                self.stats = da.util.load(filepath)
+            except ValueError:
+                self.stats = {}
+        self._current = None
+        self._pending = {}
+        self._counted = {}
+
+    # -------------------------------------------------------------------------
+    def start_unit(self, relpath, seconds = None):
+        """
+        Record the start of processing for the specified build unit.
+
+        If the time taken to process the unit is
+        already known, it may be given, in which
+        case the unit is recorded straight away,
+        rather than being treated as in progress.
+
+        """
+        self._finish_unit()
+        if seconds is not None:
+            self._fold(relpath, seconds)
+        else:
+            self._current = {'relpath': relpath,
+                             'start':   time.monotonic()}
+
+    # -------------------------------------------------------------------------
+    def record_nonconformity(self, tool, relpath = None):
+        """
+        Record a nonconformity against the specified build unit.
+
+        If relpath is None, the nonconformity is
+        recorded against the unit in progress.
+
+        """
+        if relpath is None:
+            if self._current is None:
+                return
+            relpath = self._current['relpath']
+
+        # Units which have already been recorded in
+        # this build have their failure counts for
+        # this build corrected in place.
+        #
+        counted = self._counted.get(relpath, None)
+        if counted is None:
+            self._pending.setdefault(relpath, set()).add(tool)
+        elif tool not in counted:
+            counted.add(tool)
+            failed       = self.stats[relpath]['failed']
+            failed[tool] = failed.get(tool, 0.0) + 1.0
+
+    # -------------------------------------------------------------------------
+    def save(self):
+        """
+        Update statistics for the unit in progress and save them to disk.
+
+        The statistics are written to a temporary
+        file which then replaces the old one, so a
+        concurrent build never reads a partial file.
+
+        """
+        self._finish_unit()
+        da.util.ensure_dir_exists(os.path.dirname(self.filepath))
+        filepath_tmp = '{path}.{pid}.tmp'.format(path = self.filepath,
+                                                 pid  = os.getpid())
+        with open(filepath_tmp, 'wt') as file:
+            json.dump(self.stats, file, sort_keys = True)
+        os.replace(filepath_tmp, self.filepath)
+
+    # -------------------------------------------------------------------------
+    def expected_yield(self, relpath):
+        """
+        Return the expected number of failing checkers per second for a unit.
+
+        """
+        record = self.stats.get(relpath)
+        if record is None:
+            return float('inf')
+        observed = record['observed'] + PRIOR_OBSERVED
+        expected = sum((failed + PRIOR_FAILED) / observed
+                       for failed in record['failed'].values())
+        expected = max(expected, PRIOR_FAILED / observed)
+        return expected / max(record['seconds'], MIN_SECONDS)
+
+    # -------------------------------------------------------------------------
+    def rank(self, iter_tiered):
+        """
+        Yield (tier, relpath) pairs ranked by expected yield within each tier.
+
+        The tier ordering is preserved: each run of
+        consecutive items with the same tier is sorted
+        by decreasing expected yield. The sort is
+        stable, so ties keep their original order.
+
+        """
+        for (_, group) in itertools.groupby(iter_tiered,
+                                            key = lambda item: item[0]):
+            for item in sorted(group,
+                               key = lambda item: -self.expected_yield(
+                                                                    item[1])):
+                yield item
+
+    # -------------------------------------------------------------------------
+    def _finish_unit(self):
+        """
+        Record the outcome for the unit in progress, if there is one.
+
+        """
+        if self._current is None:
+            return
+        self._fold(self._current['relpath'],
+                   time.monotonic() - self._current['start'])
+        self._current = None
+
+    # -------------------------------------------------------------------------
+    def _fold(self, relpath, seconds):
+        """
+        Fold the outcome for a unit into the statistics.
+
+        """
+        tools  = self._pending.pop(relpath, set())
+        record = self.stats.get(relpath)
+        if record is None:
+            record = {'observed': 0.0, 'seconds': seconds, 'failed': {}}
+        record['observed'] = DECAY * record['observed'] + 1.0
+        record['seconds']  = (         DECAY  * record['seconds']
+                               + (1.0 - DECAY) * seconds)
+        for tool in set(record['failed']) | tools:
+            record['failed'][tool] = (
+                            DECAY * record['failed'].get(tool, 0.0)
+                            + (1.0 if tool in tools else 0.0))
+        self.stats[relpath]    = record
+        self._counted[relpath] = tools
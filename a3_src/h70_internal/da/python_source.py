@@ -34,6 +34,7 @@ license:
 import ast
 import collections
 import enum
+import io
 import itertools
 import os
 import sys
@@ -108,19 +109,25 @@ def gen_top_level_method_names(ast_root):
 
 
 # -----------------------------------------------------------------------------
-def iter_embedded_data(module_name, root, file):
+def iter_embedded_data(module_name, root, file, comments = None):
     """
     Yield each piece of embedded data in the file, with associated AST nodes.
 
+    If a sequence of comment and docstring tokens
+    for the file (as returned by comment_tokens())
+    is supplied, then it is used in place of
+    re-tokenizing the file.
+
     """
     iter_path = _iter_windowed_pairs(
                                 gen_ast_paths_depth_first(root, module_name))
 
     # If iter_path is lazy then:
     # file2 = os.fdopen(os.dup(file.fileno), 'r')
-    file.seek(0)
+    if comments is None:
+        file.seek(0)
     (path, next_path) = next(iter_path)
-    for embed in _gen_embedded_data_in_file(file):
+    for embed in _gen_embedded_data_in_file(file, comments):
 
         is_comment = embed.meta.ctx_typ == COMMENT_TYPE.COMMENT
         embed_lo   = embed.meta.ctx_lo
@@ -297,7 +304,13 @@ def gen_ast_paths_depth_first(root, module_name):
                 path = [node for (node, _) in stack if _has_name(node)]
                 addr = '.'.join([node.name for node in path])
                 setattr(child, 'da_addr', addr)
-                setattr(child, 'da_lineno_last', _last_line_in(child))
+                # da_lineno_last depends only on the
+                # subtree, so it does not need to be
+                # recalculated for an AST that has
+                # already been walked (or which has
+                # been loaded from the AST cache).
+                if not hasattr(child, 'da_lineno_last'):
+                    setattr(child, 'da_lineno_last', _last_line_in(child))
                 yield path
         except StopIteration:
             stack.pop()
@@ -360,22 +373,59 @@ def _last_line_in(node):
 
 
 # -----------------------------------------------------------------------------
-def _gen_embedded_data_in_file(file):
+def _gen_embedded_data_in_file(file, comments = None):
     """
     Yield Embedded named tuples loaded from the specified file.
 
     """
-    for embed in _gen_embedded_data(
-                    _merge_comment_blocks(
-                        _gen_comment_and_docstr_toks(file))):
+    if comments is None:
+        comments = _gen_comment_and_docstr_toks(file)
+    for embed in _gen_embedded_data(_merge_comment_blocks(comments)):
         yield embed
 
 
+# -----------------------------------------------------------------------------
+def comment_tokens(source_text):
+    """
+    Return a list of all comment and docstring tokens in the source text.
+
+    """
+    file = io.BytesIO(source_text.encode('utf-8'))
+    return list(_gen_comment_and_docstr_toks(file))
+
+
+# -----------------------------------------------------------------------------
+def gen_yaml_blocks(comments):
+    """
+    Yield the text and location of each block of YAML in the comment tokens.
+
+    The comments are a sequence of comment and
+    docstring tokens, as returned by the function
+    comment_tokens(). Each block is yielded as a
+    tuple of its text (without the start and end
+    markers) and a MetaYaml named tuple, so that
+    the caller can choose how to load it.
+
+    """
+    for block in _gen_yaml_blocks(_merge_comment_blocks(comments)):
+        yield block
+
+
 # -----------------------------------------------------------------------------
 def _gen_embedded_data(gen_blocks):
     """
     Yield Embedded named tuples populated with YAML from supplied text blocks.
 
+    """
+    for (text, meta) in _gen_yaml_blocks(gen_blocks):
+        yield Embedded(dat = yaml.load(text), meta = meta)
+
+
+# -----------------------------------------------------------------------------
+def _gen_yaml_blocks(gen_blocks):
+    """
+    Yield the text and MetaYaml of each block of YAML in the text blocks.
+
     """
     for comment in gen_blocks:
 
@@ -397,12 +447,12 @@ def _gen_embedded_data(gen_blocks):
             elif line.strip() == '...':
                 if yaml_lines:
                     # TODO: TRY ITERATING OVER A YAML.LOAD_ALL?
-                    yield Embedded(dat  = yaml.load('\n'.join(yaml_lines)),
-                                   meta = MetaYaml(lo      = yaml_lo,
-                                                   hi      = iline,
-                                                   ctx_lo  = ctxmeta.lo,
-                                                   ctx_hi  = ctxmeta.hi,
-                                                   ctx_typ = ctxmeta.typ))
+                    yield ('\n'.join(yaml_lines),
+                           MetaYaml(lo      = yaml_lo,
+                                    hi      = iline,
+                                    ctx_lo  = ctxmeta.lo,
+                                    ctx_hi  = ctxmeta.hi,
+                                    ctx_typ = ctxmeta.typ))
                     yaml_lines = []
                 is_inside = False
                 continue
@@ -416,12 +466,12 @@ def _gen_embedded_data(gen_blocks):
 
         # At the end, if we have anything to return, yield it.
         if yaml_lines:
-            yield Embedded(dat  = yaml.load('\n'.join(yaml_lines)),
-                           meta = MetaYaml(lo      = yaml_lo,
-                                           hi      = iline,
-                                           ctx_lo  = ctxmeta.lo,
-                                           ctx_hi  = ctxmeta.hi,
-                                           ctx_typ = ctxmeta.typ))
+            yield ('\n'.join(yaml_lines),
+                   MetaYaml(lo      = yaml_lo,
+                            hi      = iline,
+                            ctx_lo  = ctxmeta.lo,
+                            ctx_hi  = ctxmeta.hi,
+                            ctx_typ = ctxmeta.typ))
 
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Test fixtures shared by the specifications of the da package.
+
+---
+type:
+    python_package
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import pytest
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture(scope = 'module')
+def index_fragment():
+    """
+    Return a function which makes an index fragment for a single identifier.
+
+    The fragment has the same form as those sent
+    to da.index.merge_coro() by da.index.unit_coro().
+
+    """
+
+    def _index_fragment(relpath, idstr, line = 1):
+        """
+        Return an index fragment for a unit containing a single identifier.
+
+        """
+        return ([('item', idstr, relpath, (line, 1))],
+                [('item', idstr, relpath, str((line, 1)), ('key', 0))],
+                [('item', idstr, relpath, str((line, 1)), str(('key',)),
+                  (relpath, line, 1, ['key']))])
+
+    return _index_fragment
+
+
+# -----------------------------------------------------------------------------
+@pytest.fixture(scope = 'module')
+def read_index_files():
+    """
+    Return a function which reads every index file written to a directory.
+
+    """
+    import os
+
+    def _read_index_files(dirpath):
+        """
+        Return a map from filename to content for each file in dirpath.
+
+        """
+        content = {}
+        for filename in sorted(os.listdir(dirpath)):
+            with open(os.path.join(dirpath, filename), 'rt') as file:
+                content[filename] = file.read()
+        return content
+
+    return _read_index_files
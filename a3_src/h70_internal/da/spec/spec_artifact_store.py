@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.artifact_store module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# -----------------------------------------------------------------------------
+def _cfg(dirpath_root, tree_hexsha = 'a' * 40, **options):
+    """
+    Return a minimal build configuration for the specified tree.
+
+    """
+    return {
+        'build_id':         'build',
+        'timestamp':        {'datetime_utc': 'now'},
+        'defined_baseline': {'tree_hexsha': tree_hexsha},
+        'paths':            {'dirpath_lwc_root':   dirpath_root,
+                             'dirpath_meta_cache': os.path.join(dirpath_root,
+                                                                'cache')},
+        'options':          dict({'enable_artifact_store':      True,
+                                  'artifact_store_max_entries': 2},
+                                 **options)}
+
+
+# =============================================================================
+class SpecifyBuildKey:
+    """
+    Specify the da.artifact_store.build_key() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_depends_on_the_tree_and_the_build_configuration(self):
+        """
+        The key ignores the build id and paths, but not the tree or options.
+
+        """
+        import da.artifact_store
+        key   = da.artifact_store.build_key
+        cfg   = _cfg('/lwc')
+        moved = dict(_cfg('/elsewhere'), build_id = 'other')
+        assert key(cfg) == key(moved)
+        assert key(cfg) != key(_cfg('/lwc', tree_hexsha = 'b' * 40))
+        assert key(cfg) != key(_cfg('/lwc', loglevel = 'DEBUG'))
+        assert key(_cfg('/lwc', tree_hexsha = None)) is None
+
+
+# =============================================================================
+class SpecifyArtifactStore:
+    """
+    Specify the da.artifact_store.ArtifactStore class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_links_to_the_outputs_of_an_identical_build(self, tmpdir):
+        """
+        Stored outputs are linked into place, and old entries are pruned.
+
+        """
+        import da.artifact_store
+        cfg     = _cfg(str(tmpdir))
+        store   = da.artifact_store.open_store(cfg)
+        log_one = os.path.join(str(tmpdir), 'one', 'log')
+        log_two = os.path.join(str(tmpdir), 'two', 'log')
+
+        assert not store.link('k1', log_one)
+        store.prepare(log_one)
+        with open(os.path.join(log_one, 'index.html'), 'wt') as file:
+            file.write('built')
+        store.put('k1', log_one)
+        assert os.path.islink(log_one)
+
+        assert store.link('k1', log_two)
+        with open(os.path.join(log_two, 'index.html'), 'rt') as file:
+            assert file.read() == 'built'
+
+        store.prepare(log_two)
+        assert not os.path.islink(log_two)
+        assert os.listdir(log_two) == []
+
+        for key in ('k2', 'k3'):
+            store.prepare(log_two)
+            store.put(key, log_two)
+        assert not store.link('k1', log_one)
+
+    # -------------------------------------------------------------------------
+    def it_is_not_used_unless_enabled(self, tmpdir):
+        """
+        open_store() returns None if the artifact store is not enabled.
+
+        """
+        import da.artifact_store
+        cfg = _cfg(str(tmpdir), enable_artifact_store = False)
+        assert da.artifact_store.open_store(cfg) is None
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.ast_cache module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# =============================================================================
+class SpecifyOpenCache:
+    """
+    Specify the da.ast_cache.open_cache() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_none_when_the_cache_is_disabled(self):
+        """
+        The open_cache() function returns None unless the cache is enabled.
+
+        """
+        import da.ast_cache
+        cfg = {'options': {'enable_ast_cache': False}}
+        assert da.ast_cache.open_cache(cfg) is None
+
+
+# =============================================================================
+class SpecifyParse:
+    """
+    Specify the da.ast_cache.parse() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_an_annotated_ast_and_comment_tokens(self):
+        """
+        The parse() function annotates the AST and tokenizes comments.
+
+        """
+        import da.ast_cache
+        source_text      = 'def fcn():\n    # Comment.\n    pass\n'
+        (root, comments) = da.ast_cache.parse(source_text, 'mod')
+        assert root.body[0].da_addr == 'mod.fcn'
+        assert root.body[0].da_lineno_last == 3
+        assert [comment.txt for comment in comments] == [' Comment.']
+
+    # -------------------------------------------------------------------------
+    def it_reuses_cached_results_for_unchanged_source(self, tmpdir):
+        """
+        The parse() function loads previously parsed ASTs from the cache.
+
+        """
+        import da.ast_cache
+        import da.util.diskcache
+        cache = da.util.diskcache.DiskCache(str(tmpdir), max_bytes = 1 << 20)
+        (first, _)  = da.ast_cache.parse('x = 1\n', 'mod', cache)
+        (second, _) = da.ast_cache.parse('x = 1\n', 'mod', cache)
+        assert first is not second
+        assert second.body[0].targets[0].id == 'x'
+        assert len(list(os.walk(str(tmpdir)))) == 2
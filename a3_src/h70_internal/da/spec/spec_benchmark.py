@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.benchmark module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import ast
+
+
+# =============================================================================
+class SpecifyRun:
+    """
+    Specify the da.benchmark.run() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_is_callable(self):
+        """
+        The run() function is callable.
+
+        """
+        import da.benchmark
+        assert callable(da.benchmark.run)
+
+
+# =============================================================================
+class SpecifyInjectFault:
+    """
+    Specify the da.benchmark.inject_fault() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_modifies_the_design_document(self, tmpdir):
+        """
+        Design document faults modify only the design document.
+
+        """
+        import da.benchmark
+        design = tmpdir.join('design.py')
+        spec   = tmpdir.join('spec_design.py')
+        design.write('"""\nDocstring.\n\n---\n'
+                     'validation_level:\n    v00\n"""\n')
+        spec.write('')
+        for name in ('syntax_error',
+                     'pylint_violation',
+                     'schema_violation',
+                     'complexity_breach'):
+            original = design.read()
+            assert da.benchmark.inject_fault(
+                                name, str(design), str(spec)) == [str(design)]
+            assert design.read() != original
+        assert spec.read() == ''
+
+    # -------------------------------------------------------------------------
+    def it_modifies_the_specification(self, tmpdir):
+        """
+        The failing_spec fault appends a failing test to the specification.
+
+        """
+        import da.benchmark
+        design = tmpdir.join('design.py')
+        spec   = tmpdir.join('spec_design.py')
+        design.write('')
+        spec.write('')
+        assert da.benchmark.inject_fault(
+                        'failing_spec', str(design), str(spec)) == [str(spec)]
+        assert 'assert False' in spec.read()
+        ast.parse(spec.read())
+
+    # -------------------------------------------------------------------------
+    def it_returns_none_if_the_fault_does_not_apply(self, tmpdir):
+        """
+        The schema_violation fault does not apply without embedded data.
+
+        """
+        import da.benchmark
+        design = tmpdir.join('design.py')
+        design.write('')
+        assert da.benchmark.inject_fault(
+                        'schema_violation', str(design), str(design)) is None
+        assert design.read() == ''
+
+    # -------------------------------------------------------------------------
+    def it_injects_faults_that_parse_except_the_syntax_error(self, tmpdir):
+        """
+        Only the syntax_error fault stops the design document from parsing.
+
+        """
+        import pytest
+        import da.benchmark
+        for name in da.benchmark.FAULTS:
+            design = tmpdir.join(name + '.py')
+            spec   = tmpdir.join('spec_' + name + '.py')
+            design.write('')
+            spec.write('')
+            da.benchmark.inject_fault(name, str(design), str(spec))
+            if name == 'syntax_error':
+                with pytest.raises(SyntaxError):
+                    ast.parse(design.read())
+            else:
+                ast.parse(design.read())
+
+
+# =============================================================================
+class SpecifyPercentile:
+    """
+    Specify the da.benchmark.percentile() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_nearest_rank_percentile(self):
+        """
+        The percentile() function uses the nearest-rank method.
+
+        """
+        import da.benchmark
+        values = list(range(1, 21))
+        assert da.benchmark.percentile(values, 95) == 19
+        assert da.benchmark.percentile(values, 100) == 20
+        assert da.benchmark.percentile(values, 0) == 1
+        assert da.benchmark.percentile([], 95) is None
+
+
+# =============================================================================
+class SpecifySummarise:
+    """
+    Specify the da.benchmark.summarise() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_counts_undetected_faults_against_the_target(self):
+        """
+        Undetected faults are treated as having infinite latency.
+
+        """
+        import math
+        import da.benchmark
+        record_list = [{'latency': 1.0}, {'latency': 2.0}, {'latency': None}]
+        summary = da.benchmark.summarise(record_list,
+                                         pct            = 50,
+                                         target_seconds = 1.5)
+        assert summary['num_trials']   == 3
+        assert summary['num_detected'] == 2
+        assert summary['latency']      == 2.0
+        assert summary['fraction_within'] == 1.0 / 3.0
+        assert da.benchmark.summarise(record_list)['latency'] == math.inf
+
+
+# =============================================================================
+class SpecifyFormatSummary:
+    """
+    Specify the da.benchmark.format_summary() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_shows_missing_statistics_as_not_applicable(self):
+        """
+        A summary of no trials, or of no detected faults, can be formatted.
+
+        """
+        import da.benchmark
+        assert da.benchmark.format_summary(da.benchmark.summarise([])) == (
+                        '0/0 detected. p95 latency: n/a. Within 5s: n/a.')
+        assert da.benchmark.format_summary(
+                        da.benchmark.summarise([{'latency': None}])) == (
+                        '0/1 detected. p95 latency: inf. Within 5s: 0%.')
+
+
+# =============================================================================
+class Specify_FirstNonconformityProbe:
+    """
+    Specify the da.benchmark._first_nonconformity_probe() context manager.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_records_the_first_nonconformity_in_the_files(self):
+        """
+        Reports for other files are counted; the first match stops the build.
+
+        """
+        import pytest
+        import da.benchmark
+        import da.monitor
+        original = da.monitor.BuildMonitor.report_nonconformity
+        with da.benchmark._first_nonconformity_probe(['/x/a.py']) as probe:
+            report = da.monitor.BuildMonitor.report_nonconformity
+            report(None, 'tool', 'E0', 'msg', '/x/b.py')
+            assert probe['time'] is None
+            with pytest.raises(da.benchmark._FaultDetected):
+                report(None, 'tool', 'E1', 'msg', '/x/a.py', line = 3)
+        assert probe['time'] is not None
+        assert probe['num_other'] == 1
+        assert probe['nonconformity']['msg_id'] == 'E1'
+        assert probe['nonconformity']['line'] == 3
+        assert da.monitor.BuildMonitor.report_nonconformity is original
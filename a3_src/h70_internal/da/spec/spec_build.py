@@ -80,3 +80,64 @@ class SpecifyMain:
         """
         import da.build
         assert callable(da.build.main)
+
+
+# =============================================================================
+class Specify_MergeSlowLaneResults:
+    """
+    Specify the da.build._merge_slow_lane_results() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_replays_completed_jobs_in_order_of_completion(self):
+        """
+        Only completed jobs are replayed unless wait is True.
+
+        """
+        import da.build
+
+        class Job:                                      # pylint: disable=R0903
+            """
+            Stand-in for a multiprocessing.pool.AsyncResult.
+
+            """
+            def __init__(self, tool, is_ready):
+                self.tool     = tool
+                self.is_ready = is_ready
+
+            def ready(self):
+                """Return True if the job has completed."""
+                return self.is_ready
+
+            def wait(self, timeout):                    # pylint: disable=W0613
+                """Complete the job."""
+                self.is_ready = True
+
+            def get(self):
+                """Return a single nonconformity."""
+                return ([{'tool': self.tool}], [])
+
+        class Monitor:                                  # pylint: disable=R0903
+            """
+            Stand-in for a da.monitor.BuildMonitor.
+
+            """
+            step_timer = None
+
+            def __init__(self):
+                self.nonconformity_list = []
+
+            def report_nonconformity(self, **nonconformity):
+                """Record the nonconformity."""
+                self.nonconformity_list.append(nonconformity['tool'])
+
+        monitor   = Monitor()
+        slow_lane = {'pending': [Job('pylint', False), Job('pytype', True)]}
+        da.build._merge_slow_lane_results(slow_lane, monitor)
+        assert monitor.nonconformity_list == ['pytype']
+        assert len(slow_lane['pending']) == 1
+        da.build._merge_slow_lane_results(slow_lane, monitor, wait = True)
+        assert monitor.nonconformity_list == ['pytype', 'pylint']
+        assert slow_lane['pending'] == []
+        da.build._merge_slow_lane_results(None, monitor, wait = True)
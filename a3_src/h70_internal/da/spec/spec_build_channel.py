@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.build_channel module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+import socket
+import threading
+import time
+
+
+# =============================================================================
+class SpecifyRecvMessage:
+    """
+    Specify the da.build_channel.recv_message() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_receives_objects_and_file_descriptors(self, tmpdir):
+        """
+        Objects and file descriptors sent by send_message() are received.
+
+        """
+        import da.build_channel
+        filepath = os.path.join(str(tmpdir), 'out.txt')
+        (conn_a, conn_b) = socket.socketpair(socket.AF_UNIX)
+        with conn_a, conn_b, open(filepath, 'wb') as file:
+            da.build_channel.send_message(conn_a,
+                                          {'cfg': 'TEST_CFG'},
+                                          fds = (file.fileno(),))
+            (obj, fds) = da.build_channel.recv_message(conn_b)
+        assert obj == {'cfg': 'TEST_CFG'}
+        assert len(fds) == 1
+        os.write(fds[0], b'TEST_OUTPUT')
+        os.close(fds[0])
+        with open(filepath, 'rb') as file:
+            assert file.read() == b'TEST_OUTPUT'
+
+
+# =============================================================================
+class SpecifyListen:
+    """
+    Specify the da.build_channel.listen() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_streams_messages_until_the_result(self):
+        """
+        Messages published by the build are received before the result.
+
+        """
+        import da.build_channel
+        received         = []
+        (conn_a, conn_b) = socket.socketpair(socket.AF_UNIX)
+        with conn_a, conn_b:
+            with da.build_channel.context(conn_a):
+                da.build_channel.publish(da.build_channel.PROGRESS, 'a.py')
+                da.build_channel.publish(da.build_channel.RESULT, 0)
+            da.build_channel.publish(da.build_channel.PROGRESS, 'b.py')
+            result = da.build_channel.listen(conn_b, received.append)
+        assert result == 0
+        assert received == [{'type':    da.build_channel.PROGRESS,
+                             'payload': 'a.py'}]
+
+    # -------------------------------------------------------------------------
+    def it_asks_the_build_to_abort(self):
+        """
+        The build sees an abort request once the abort event is set.
+
+        """
+        import da.build_channel
+        abort_event      = threading.Event()
+        (conn_a, conn_b) = socket.socketpair(socket.AF_UNIX)
+        with conn_a, conn_b:
+            with da.build_channel.context(conn_a):
+                assert not da.build_channel.is_abort_requested()
+                abort_event.set()
+                listener = threading.Thread(
+                                        target = da.build_channel.listen,
+                                        args   = (conn_b, None, abort_event))
+                listener.start()
+                for _ in range(100):
+                    if da.build_channel.is_abort_requested():
+                        break
+                    time.sleep(0.05)
+                assert da.build_channel.is_abort_requested()
+                da.build_channel.publish(da.build_channel.RESULT, 0)
+                listener.join()
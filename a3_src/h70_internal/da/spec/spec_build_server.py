@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.build_server module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+import sys
+import types
+
+
+# =============================================================================
+class SpecifySocketFilepath:
+    """
+    Specify the da.build_server.socket_filepath() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_is_short_and_unique_to_each_source_tree(self):
+        """
+        The socket path is short enough to bind, whatever the tree path.
+
+        """
+        import da.build_server
+        dirpath_src = os.path.join('/tmp', 'x' * 200, 'src')
+        filepath_a  = da.build_server.socket_filepath(dirpath_src)
+        filepath_b  = da.build_server.socket_filepath(dirpath_src + '2')
+        assert len(filepath_a) < 100
+        assert filepath_a == da.build_server.socket_filepath(dirpath_src)
+        assert filepath_a != filepath_b
+
+
+# =============================================================================
+class SpecifyChangedModules:
+    """
+    Specify the da.build_server.changed_modules() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_lists_modules_with_changed_content(self, tmpdir):
+        """
+        Modules are reloaded only if the content of the file has changed.
+
+        """
+        import da.build_server
+        name     = 'da.spec_build_server_module'
+        filepath = os.path.join(str(tmpdir), 'module.py')
+        with open(filepath, 'wt') as file:
+            file.write('VALUE = 1\n')
+        module          = types.ModuleType(name)
+        module.__file__ = filepath
+        sys.modules[name] = module
+        try:
+            digests = da.build_server.module_digests(str(tmpdir))
+            assert digests.keys() == {name}
+            assert da.build_server.changed_modules(digests) == []
+            with open(filepath, 'wt') as file:
+                file.write('VALUE = 2\n')
+            assert da.build_server.changed_modules(digests) == [name]
+        finally:
+            del sys.modules[name]
+
+
+# =============================================================================
+class SpecifyReloadOrder:
+    """
+    Specify the da.build_server.reload_order() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_reloads_importers_after_the_modules_they_import(self, tmpdir):
+        """
+        Modules which import a changed module are reloaded after it.
+
+        """
+        import da.build_server
+        source = {
+            'da.spec_reload_base':      'VALUE = 1\n',
+            'da.spec_reload_from':      'from da.spec_reload_base import '
+                                        'VALUE\n',
+            'da.spec_reload_indirect':  'import da.spec_reload_from\n',
+            'da.spec_reload_unrelated': 'VALUE = 2\n'}
+        for (name, text) in source.items():
+            filepath = os.path.join(str(tmpdir), name + '.py')
+            with open(filepath, 'wt') as file:
+                file.write(text)
+            module          = types.ModuleType(name)
+            module.__file__ = filepath
+            sys.modules[name] = module
+        try:
+            assert da.build_server.reload_order(
+                                ['da.spec_reload_base'], source.keys()) == [
+                                                'da.spec_reload_base',
+                                                'da.spec_reload_from',
+                                                'da.spec_reload_indirect']
+        finally:
+            for name in source:
+                del sys.modules[name]
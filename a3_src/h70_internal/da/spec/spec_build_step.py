@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.build_step module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+# -----------------------------------------------------------------------------
+def _cfg(**steps):
+    """
+    Return a minimal build configuration with the specified steps enabled.
+
+    """
+    import da.build_step
+    flags = {step['flag']: False for step in da.build_step.UNIT_STEPS
+             if step['flag'] is not None}
+    flags.update(steps)
+    return {'options': {}, 'steps': flags}
+
+
+# =============================================================================
+class SpecifyEnabledSteps:
+    """
+    Specify the da.build_step.enabled_steps() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_enabled_steps_in_processing_order(self):
+        """
+        Steps without a flag are always enabled; tests run before linting.
+
+        """
+        import da.build_step
+        cfg = _cfg(enable_static_test_python_pylint = True,
+                   enable_test_python_unittest      = True)
+        assert [step['step_id'] for step in da.build_step.enabled_steps(
+                            cfg)] == ['pytest', 'pylint', 'dependencies']
+        assert [step['step_id'] for step in da.build_step.enabled_steps(
+                            cfg, step_ids = ('pylint',))] == ['pylint']
+
+
+# =============================================================================
+class SpecifyCoroutines:
+    """
+    Specify the da.build_step.coroutines() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_only_imports_modules_for_enabled_steps(self, monkeypatch):
+        """
+        Disabled steps are never imported; imports are timed once per module.
+
+        """
+        import sys
+        import da.util
+        import da.build_step
+        import da.monitor.step_timing
+
+        @da.util.coroutine
+        def echo():
+            """
+            Yield the relpath of each build unit received.
+
+            """
+            result = None
+            while True:
+                build_unit = (yield result)
+                result     = build_unit['relpath']
+
+        monkeypatch.delitem(sys.modules, 'colorsys', raising = False)
+        monkeypatch.setattr(da.build_step, 'UNIT_STEPS', (
+            {'step_id': 'on',
+             'flag':    'enable_on',
+             'module':  'colorsys',
+             'ctor':    lambda module, cfg, monitor: echo()},
+            {'step_id': 'off',
+             'flag':    'enable_off',
+             'module':  'da.no_such_module',
+             'ctor':    lambda module, cfg, monitor: echo()},
+            {'step_id': 'always',
+             'flag':    None,
+             'module':  'colorsys',
+             'ctor':    lambda module, cfg, monitor: echo()}))
+
+        step_timer = da.monitor.step_timing.StepTimer()
+        steps      = da.build_step.coroutines(
+                        cfg           = {'options': {},
+                                         'steps':   {'enable_on':  True,
+                                                     'enable_off': False}},
+                        build_monitor = None,
+                        step_timer    = step_timer)
+        assert list(steps) == ['on', 'always']
+        assert steps['on'].send({'relpath': 'a'}) == 'a'
+        assert [(record['step'], record['relpath'])
+                for record in step_timer.record_list] == [
+                                        ('import', 'colorsys'), ('on', 'a')]
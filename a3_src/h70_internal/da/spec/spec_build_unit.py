@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.build_unit module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# -----------------------------------------------------------------------------
+def _write(tmpdir, filename, text):
+    """
+    Write text to a file in tmpdir and return the filepath.
+
+    """
+    filepath = os.path.join(str(tmpdir), filename)
+    with open(filepath, 'wt') as file:
+        file.write(text)
+    return filepath
+
+
+# =============================================================================
+class SpecifyBuildUnit:
+    """
+    Specify the da.build_unit.BuildUnit class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_supports_the_mapping_interface(self, tmpdir):
+        """
+        BuildUnit instances may be used in place of build unit dicts.
+
+        """
+        import da.build_unit
+        filepath   = _write(tmpdir, 'data.txt', 'line 1\nline 2\n')
+        build_unit = da.build_unit.BuildUnit(filepath, 'data.txt')
+        build_unit['spec'] = 'TEST_SPEC'
+        assert build_unit['relpath'] == 'data.txt'
+        assert build_unit['spec'] == 'TEST_SPEC'
+        assert build_unit.get('dirpath_log') is None
+        assert 'ast' not in build_unit
+        assert build_unit['content'] == 'line 1\nline 2\n'
+        assert build_unit['lines'] == ['line 1\n', 'line 2\n']
+        build_unit.close()
+
+    # -------------------------------------------------------------------------
+    def it_provides_a_view_of_the_undecoded_bytes(self, tmpdir):
+        """
+        The file is memory mapped, but not decoded, on construction.
+
+        """
+        import da.build_unit
+        filepath   = _write(tmpdir, 'data.txt', 'TEST_CONTENT')
+        build_unit = da.build_unit.BuildUnit(filepath, 'data.txt')
+        assert build_unit['bytes'][:] == b'TEST_CONTENT'
+        build_unit.close()
+        assert build_unit['bytes'] == b''
+
+    # -------------------------------------------------------------------------
+    def it_refuses_to_overwrite_loaded_keys(self, tmpdir):
+        """
+        Keys which are loaded from the file cannot be set.
+
+        """
+        import pytest
+        import da.build_unit
+        filepath   = _write(tmpdir, 'data.txt', 'TEST_CONTENT')
+        build_unit = da.build_unit.BuildUnit(filepath, 'data.txt')
+        with pytest.raises(KeyError):
+            build_unit['content'] = 'OTHER_CONTENT'
+        build_unit.close()
+
+    # -------------------------------------------------------------------------
+    def it_parses_python_files(self, tmpdir):
+        """
+        The ast and comments are available for Python files.
+
+        """
+        import da.build_unit
+        filepath   = _write(tmpdir, 'mod.py', '# Comment.\npass\n')
+        build_unit = da.build_unit.BuildUnit(filepath, 'mod.py')
+        assert 'ast' in build_unit
+        assert [tok.txt for tok in build_unit['comments']] == [' Comment.']
+        build_unit.close()
+
+    # -------------------------------------------------------------------------
+    def it_reports_syntax_errors(self, tmpdir):
+        """
+        A nonconformity is reported for Python files which do not parse.
+
+        """
+        import da.build_unit
+        import da.check.constants
+        import da.monitor
+
+        filepath   = _write(tmpdir, 'mod.py', 'def (:\n')
+        monitor    = da.monitor.NonconformityRecorder()
+        build_unit = da.build_unit.BuildUnit(filepath,
+                                             'mod.py',
+                                             build_monitor = monitor)
+        assert build_unit.parse() == {}
+        assert build_unit.parse() == {}
+        assert 'ast' not in build_unit
+        recorded = monitor.drain()
+        assert len(recorded) == 1
+        assert recorded[0]['msg_id'] == (
+                                da.check.constants.BUILD_SPEC_SYNTAX_ERROR)
+        build_unit.close()
+
+    # -------------------------------------------------------------------------
+    def it_handles_empty_files(self, tmpdir):
+        """
+        Empty files, which cannot be memory mapped, have empty content.
+
+        """
+        import da.build_unit
+        filepath   = _write(tmpdir, 'empty.txt', '')
+        build_unit = da.build_unit.BuildUnit(filepath, 'empty.txt')
+        assert build_unit['content'] == ''
+        assert build_unit['lines'] == []
+        build_unit.close()
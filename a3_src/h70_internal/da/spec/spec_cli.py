@@ -157,6 +157,38 @@ class SpecifyBuild:
         assert callable(da.cli.build)
 
 
+# =============================================================================
+class SpecifyBenchmark:
+    """
+    Specify the da.cli.benchmark() function.
+
+    """
+
+    def it_is_callable(self):
+        """
+        The benchmark() function is callable.
+
+        """
+        import da.cli
+        assert callable(da.cli.benchmark)
+
+
+# =============================================================================
+class SpecifyIndex:
+    """
+    Specify the da.cli.index() function.
+
+    """
+
+    def it_is_callable(self):
+        """
+        The index() function is callable.
+
+        """
+        import da.cli
+        assert callable(da.cli.index)
+
+
 # =============================================================================
 class SpecifyRun:
     """
@@ -31,7 +31,37 @@ license:
 """
 
 
-import pytest
+import random
+
+
+# -----------------------------------------------------------------------------
+def _cfg(tmpdir, **settings):
+    """
+    Return a minimal build configuration for optimisation.
+
+    """
+    optimisation = {'parameters': {'options.x': [1, 2, 3],
+                                   'options.y': [0, 10]},
+                    'objective':  'TEST_OBJECTIVE'}
+    optimisation.update(settings)
+    return {'build_id':         'TEST_BUILD',
+            'defined_baseline': {'hexsha': 'TEST_HEXSHA'},
+            'options':          {'x': 0, 'y': 0},
+            'optimisation':     optimisation,
+            'paths':            {'dirpath_meta_cache': str(tmpdir.join('c')),
+                                 'dirpath_branch_tmp': str(tmpdir.join('t')),
+                                 'dirpath_branch_log': str(tmpdir.join('l'))}}
+
+
+# -----------------------------------------------------------------------------
+def _objective(cfg):
+    """
+    Return an objective value which is lowest for x == 2 and y == 10.
+
+    """
+    budget = cfg['design_delta']['budget'] or 1
+    return (abs(cfg['options']['x'] - 2)
+            + abs(cfg['options']['y'] - 10)) / budget
 
 
 # =============================================================================
@@ -42,11 +72,146 @@ class SpecifyOptimiseBuild:
     """
 
     # -------------------------------------------------------------------------
-    def it_throws_a_runtimeerror(self):
+    def it_finds_the_best_parameters_on_a_grid(self, tmpdir, monkeypatch):
         """
-        It throws a 'Not Implemented' runtime error.
+        Every combination is built, and the one with the lowest objective wins.
 
         """
         import da.default_design_optimisation
-        with pytest.raises(RuntimeError):
-            da.default_design_optimisation.optimise_build(None, None)
+        import da.util
+        monkeypatch.setattr(da.util, 'import_fcn', lambda _: _objective)
+        built  = []
+        result = da.default_design_optimisation.optimise_build(
+                                            built.append,
+                                            _cfg(tmpdir, concurrency = 2))
+        assert result['parameters'] == {'options.x': 2, 'options.y': 10}
+        assert result['objective'] == 0
+        assert len(built) == 6
+        assert len(set(cfg['build_id'] for cfg in built)) == 6
+
+    # -------------------------------------------------------------------------
+    def it_never_rebuilds_an_identical_config(self, tmpdir, monkeypatch):
+        """
+        Objective values are memoised by baseline and parameter vector.
+
+        """
+        import da.default_design_optimisation
+        import da.util
+        monkeypatch.setattr(da.util, 'import_fcn', lambda _: _objective)
+        built = []
+        for _ in range(2):
+            result = da.default_design_optimisation.optimise_build(
+                                            built.append,
+                                            _cfg(tmpdir, strategy = 'random',
+                                                 num_samples = 4, seed = 1))
+        assert len(built) == 4
+        assert all(trial['is_cached'] for trial in result['trials'])
+
+    # -------------------------------------------------------------------------
+    def it_rebuilds_when_the_build_config_changes(self, tmpdir, monkeypatch):
+        """
+        Objective values are not reused if other configuration has changed.
+
+        """
+        import da.default_design_optimisation
+        import da.util
+        monkeypatch.setattr(da.util, 'import_fcn', lambda _: _objective)
+        built = []
+        for steps in ('TEST_STEPS_1', 'TEST_STEPS_2'):
+            cfg             = _cfg(tmpdir)
+            cfg['steps']    = steps
+            cfg['build_id'] = 'TEST_BUILD_' + steps
+            da.default_design_optimisation.optimise_build(built.append, cfg)
+        assert len(built) == 12
+
+    # -------------------------------------------------------------------------
+    def it_halves_the_candidates_each_round(self, tmpdir, monkeypatch):
+        """
+        Successive halving doubles the budget as it halves the candidates.
+
+        """
+        import da.default_design_optimisation
+        import da.util
+        monkeypatch.setattr(da.util, 'import_fcn', lambda _: _objective)
+        result = da.default_design_optimisation.optimise_build(
+                                    lambda cfg: None,
+                                    _cfg(tmpdir,
+                                         strategy    = 'successive_halving',
+                                         num_samples = 6))
+        budgets = [trial['budget'] for trial in result['trials']]
+        assert budgets == [1] * 6 + [2] * 3 + [4] * 2 + [8]
+        assert result['parameters'] == {'options.x': 2, 'options.y': 10}
+
+    # -------------------------------------------------------------------------
+    def it_treats_failed_builds_as_infeasible(self, tmpdir, monkeypatch):
+        """
+        A candidate which fails to build is never the best.
+
+        """
+        import da.default_design_optimisation
+        import da.util
+        monkeypatch.setattr(da.util, 'import_fcn', lambda _: _objective)
+
+        def _build(cfg):
+            """
+            Fail to build the otherwise best candidate.
+
+            """
+            if cfg['options'] == {'x': 2, 'y': 10}:
+                raise RuntimeError('TEST_FAILURE')
+
+        result = da.default_design_optimisation.optimise_build(
+                                                            _build,
+                                                            _cfg(tmpdir))
+        assert result['parameters'] == {'options.x': 1, 'options.y': 10}
+        assert result['objective'] == 1
+
+    # -------------------------------------------------------------------------
+    def it_retries_failed_builds(self, tmpdir, monkeypatch):
+        """
+        Failed builds are not cached, so a later optimisation retries them.
+
+        """
+        import pytest
+        import da.default_design_optimisation
+        import da.exception
+        import da.util
+        monkeypatch.setattr(da.util, 'import_fcn', lambda _: _objective)
+        built = []
+
+        def _build(cfg):
+            """
+            Fail to build every candidate on the first attempt only.
+
+            """
+            built.append(cfg)
+            if len(built) <= 6:
+                raise RuntimeError('TEST_FAILURE')
+
+        with pytest.raises(da.exception.AbortWithoutStackTrace):
+            da.default_design_optimisation.optimise_build(_build, _cfg(tmpdir))
+        result = da.default_design_optimisation.optimise_build(_build,
+                                                               _cfg(tmpdir))
+        assert len(built) == 12
+        assert result['parameters'] == {'options.x': 2, 'options.y': 10}
+
+
+# =============================================================================
+class SpecifySample:
+    """
+    Specify the da.default_design_optimisation.sample function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_distinct_combinations(self):
+        """
+        Sampled combinations are distinct and are drawn from the grid.
+
+        """
+        import da.default_design_optimisation as optimisation
+        parameters = {'a': list(range(10)), 'b': list(range(10))}
+        combos     = optimisation.sample(parameters, random.Random(0), 20)
+        assert len(combos) == 20
+        assert len(set(tuple(sorted(c.items())) for c in combos)) == 20
+        assert all(c in list(optimisation.grid(parameters)) for c in combos)
@@ -63,3 +63,213 @@ class Specify_GetVersion:
         """
         import da.dep
         assert da.dep._get_version({'policy': 'ver_foo'}) == 'foo'
+
+
+# =============================================================================
+class Specify_BuildOrder:
+    """
+    Specify the da.dep._build_order() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_puts_prerequisites_first_and_otherwise_keeps_the_order(self):
+        """
+        Each key follows its prerequisites; a cycle of prerequisites aborts.
+
+        """
+        import pytest
+        import da.dep
+        import da.exception
+        keylist = ['setuptools', 'a', 'b', 'c']
+        assert da.dep._build_order({'setuptools': set(),
+                                    'a':          {'c'},
+                                    'b':          set(),
+                                    'c':          {'b'}},
+                                   keylist) == ['setuptools', 'b', 'c', 'a']
+        with pytest.raises(da.exception.AbortWithoutStackTrace):
+            da.dep._build_order({'a': {'b'}, 'b': {'a'}}, ['a', 'b'])
+
+
+# =============================================================================
+class Specify_RunConcurrently:
+    """
+    Specify the da.dep._run_concurrently() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_runs_each_job_after_those_of_its_prerequisites(self):
+        """
+        Independent jobs are run concurrently; dependents wait for them.
+
+        """
+        import threading
+        import da.dep
+        lock    = threading.Lock()
+        built   = []
+        barrier = threading.Barrier(2, timeout = 5)
+
+        def build(key):
+            """
+            Record the key, after meeting its independent sibling.
+
+            """
+            if key in ('a', 'b'):
+                barrier.wait()
+            with lock:
+                built.append(key)
+
+        da.dep._run_concurrently(job_fcn       = build,
+                                 prerequisites = {'a': set(),
+                                                  'b': set(),
+                                                  'c': {'a', 'b'}},
+                                 order         = ['a', 'b', 'c'],
+                                 num_workers   = 2)
+        assert sorted(built[:2]) == ['a', 'b']
+        assert built[2] == 'c'
+
+    # -------------------------------------------------------------------------
+    def it_stops_starting_jobs_after_the_first_failure(self):
+        """
+        Jobs in progress finish before the first error is raised.
+
+        """
+        import threading
+        import time
+        import pytest
+        import da.dep
+        started  = []
+        finished = []
+        failed   = threading.Event()
+
+        def build(key):
+            """
+            Fail for key a; let key b finish well after a has failed.
+
+            """
+            started.append(key)
+            if key == 'a':
+                failed.set()
+                raise RuntimeError('TEST')
+            failed.wait(5)
+            time.sleep(0.2)
+            finished.append(key)
+
+        with pytest.raises(RuntimeError):
+            da.dep._run_concurrently(job_fcn       = build,
+                                     prerequisites = {'a': set(),
+                                                      'b': set(),
+                                                      'c': set()},
+                                     order         = ['a', 'b', 'c'],
+                                     num_workers   = 2)
+        assert sorted(started) == ['a', 'b']
+        assert finished == ['b']
+
+
+# =============================================================================
+class Specify_BuildDependency:
+    """
+    Specify the da.dep._build_dependency() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_only_rebuilds_when_inputs_or_outputs_change(self,
+                                                       tmpdir,
+                                                       monkeypatch):
+        """
+        A dependency is rebuilt if its source or its installed files change.
+
+        """
+        import os
+        import da.dep
+        import da.machine
+        builds = []
+
+        def build_python_library(dep, **_):
+            """
+            Install a single file, counting the number of builds.
+
+            """
+            builds.append(dep['name'])
+            tmpdir.ensure('dep', 'lib', 'python3', 'mod.py').write('built')
+
+        monkeypatch.setattr(da.machine, 'env_id', lambda: 'e00')
+        monkeypatch.setattr(da.dep, '_build_python_library',
+                            build_python_library)
+        tmpdir.ensure('src', 'setup.py').write('setup()')
+        dep = {'name':          'mod',
+               'policy':        'ver_1',
+               'api':           {'lib_python3': 'lib/python3'},
+               'build':         {'method': 'automatic',
+                                 'tool':   'python_setuptools'},
+               'dirpath_src':   str(tmpdir.join('src')),
+               'dirpath_dep':   str(tmpdir.join('dep'))}
+
+        def build():
+            """
+            Build the dependency, returning the number of builds so far.
+
+            """
+            da.dep._build_dependency(dep, str(tmpdir), str(tmpdir))
+            return len(builds)
+
+        assert build() == 1
+        assert os.path.isfile(str(tmpdir.join('dep', 'build.manifest.json')))
+        assert build() == 1
+        tmpdir.join('src', 'setup.py').write('setup(name = "mod")')
+        assert build() == 2
+        tmpdir.join('dep', 'lib', 'python3', 'mod.py').write('tampered')
+        assert build() == 3
+        assert build() == 3
+
+    # -------------------------------------------------------------------------
+    def it_ignores_files_generated_in_a_git_source_tree(self,
+                                                        tmpdir,
+                                                        monkeypatch):
+        """
+        Untracked files made by the build do not cause it to be repeated.
+
+        """
+        import shutil
+        import git
+        import da.dep
+        import da.machine
+        builds = []
+
+        def build_python_library(dep, **_):
+            """
+            Generate metadata in the source tree, counting the builds.
+
+            """
+            builds.append(dep['name'])
+            tmpdir.ensure('src', 'mod.egg-info', 'PKG-INFO').write(
+                                                        str(len(builds)))
+            tmpdir.ensure('dep', 'lib', 'python3', 'mod.py').write('built')
+
+        monkeypatch.setattr(da.machine, 'env_id', lambda: 'e00')
+        monkeypatch.setattr(da.dep, '_build_python_library',
+                            build_python_library)
+        repo = git.Repo.init(str(tmpdir.join('src')))
+        tmpdir.ensure('src', 'setup.py').write('setup()')
+        repo.index.add(['setup.py'])
+        repo.index.commit('TEST_COMMIT')
+        dep = {'name':          'mod',
+               'policy':        'ver_1',
+               'api':           {'lib_python3': 'lib/python3'},
+               'build':         {'method': 'automatic',
+                                 'tool':   'python_setuptools'},
+               'dirpath_src':   str(tmpdir.join('src')),
+               'dirpath_dep':   str(tmpdir.join('dep'))}
+
+        # Untracked files are deleted from the source
+        # tree each time that it is updated.
+        for _ in range(2):
+            da.dep._build_dependency(dep, str(tmpdir), str(tmpdir))
+            shutil.rmtree(str(tmpdir.join('src', 'mod.egg-info')),
+                          ignore_errors = True)
+        assert len(builds) == 1
+        tmpdir.join('src', 'setup.py').write('setup(name = "mod")')
+        da.dep._build_dependency(dep, str(tmpdir), str(tmpdir))
+        assert len(builds) == 2
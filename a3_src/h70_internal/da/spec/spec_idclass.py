@@ -46,3 +46,33 @@ class SpecifyRegexTable:
         """
         import da.idclass
         assert da.idclass.regex_table(None) is not None
+
+
+# =============================================================================
+class SpecifyCombinedRegex:
+    """
+    Specify the da.idclass.combined_regex() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_agrees_with_the_first_matching_regex_in_the_table(self):
+        """
+        The combined regex classifies identifiers like the regex table.
+
+        """
+        import da.idclass
+        regextab = da.idclass.regex_table(None)
+        combined = da.idclass.combined_regex(None)
+        for idstr in ('i00022_store_requirements',
+                      'a3_src',
+                      'h70_internal',
+                      'k00_public',
+                      'x00_not_an_identifier'):
+            expected = None
+            for (idclass, regex) in regextab.items():
+                if regex.match(idstr):
+                    expected = idclass
+                    break
+            match = combined.match(idstr)
+            assert (match.lastgroup if match else None) == expected
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.import_graph module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import ast
+
+
+# =============================================================================
+class SpecifyUpdate:
+    """
+    Specify the da.import_graph.update() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_is_callable(self):
+        """
+        The update() function is callable.
+
+        """
+        import da.import_graph
+        assert callable(da.import_graph.update)
+
+
+# =============================================================================
+class SpecifyDependents:
+    """
+    Specify the da.import_graph.dependents() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_reverse_closure_ordered_by_distance(self):
+        """
+        The dependents() function follows import edges in reverse.
+
+        """
+        import da.import_graph
+        graph = {
+            'h00/pkg/__init__.py': {'imports': []},
+            'h00/pkg/base.py':     {'imports': []},
+            'h00/pkg/mid.py':      {'imports': ['pkg.base']},
+            'h00/pkg/top.py':      {'imports': ['pkg.mid']},
+            'h00/other.py':        {'imports': ['pkg']},
+            'h00/unrelated.py':    {'imports': ['os']}
+        }
+        assert da.import_graph.dependents(graph, ['h00/pkg/base.py']) == [
+                                                    (1, 'h00/pkg/mid.py'),
+                                                    (2, 'h00/pkg/top.py')]
+        assert da.import_graph.dependents(graph, ['h00/pkg/__init__.py']) == [
+                                                    (1, 'h00/other.py'),
+                                                    (1, 'h00/pkg/mid.py'),
+                                                    (1, 'h00/pkg/top.py')]
+
+
+# =============================================================================
+class SpecifyDependencies:
+    """
+    Specify the da.import_graph.dependencies() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_forward_closure_including_packages(self):
+        """
+        The dependencies() function follows import edges transitively.
+
+        """
+        import da.import_graph
+        graph = {
+            'h00/pkg/__init__.py': {'imports': []},
+            'h00/pkg/base.py':     {'imports': ['os']},
+            'h00/pkg/mid.py':      {'imports': ['pkg.base']},
+            'h00/pkg/top.py':      {'imports': ['pkg.mid', 'pkg.top']},
+            'h00/unrelated.py':    {'imports': []}
+        }
+        assert da.import_graph.dependencies(graph, 'h00/pkg/top.py') == [
+                                                    'h00/pkg/__init__.py',
+                                                    'h00/pkg/base.py',
+                                                    'h00/pkg/mid.py']
+        assert da.import_graph.dependencies(graph, 'h00/unrelated.py') == []
+
+
+# =============================================================================
+class SpecifyModuleName:
+    """
+    Specify the da.import_graph.module_name() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_strips_the_import_root_and_package_init(self):
+        """
+        The module_name() function returns dotted absolute module names.
+
+        """
+        import da.import_graph
+        module_name = da.import_graph.module_name
+        assert module_name('h70_internal/da/util/misc.py') == 'da.util.misc'
+        assert module_name('h70_internal/da/util/__init__.py') == 'da.util'
+
+
+# =============================================================================
+class SpecifyImportedModules:
+    """
+    Specify the da.import_graph.imported_modules() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_resolves_relative_and_nested_imports(self):
+        """
+        The imported_modules() function finds all imports in the module.
+
+        """
+        import da.import_graph
+        root = ast.parse('import os\n'
+                         'from . import misc\n'
+                         'def fcn():\n'
+                         '    from ..lwc import env\n')
+        assert da.import_graph.imported_modules(root, 'da.util.spam') == [
+                                                            'da.lwc',
+                                                            'da.lwc.env',
+                                                            'da.util',
+                                                            'da.util.misc',
+                                                            'os']
@@ -80,6 +80,132 @@ class SpecifyIndexCoro:
         assert callable(da.index.index_coro)
 
 
+# =============================================================================
+class SpecifyIndexFragment:
+    """
+    Specify the da.index.index_fragment() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_is_callable(self):
+        """
+        The index_fragment() function is callable.
+
+        """
+        import da.index
+        assert callable(da.index.index_fragment)
+
+
+# =============================================================================
+class SpecifyMergeCoro:
+    """
+    Specify the da.index.merge_coro() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_merges_fragments_into_a_single_set_of_indices(self):
+        """
+        The merge_coro() coroutine combines index fragments.
+
+        """
+        import da.index
+        merger  = da.index.merge_coro()
+        merger.send(([('i', 'a', (1, 1))], [], []))
+        indices = merger.send(([('i', 'b', (2, 1))], [], []))
+        assert dict(indices[0]['i']) == {'a': [(1, 1)], 'b': [(2, 1)]}
+        assert indices[1] is None
+        assert indices[2] is None
+
+
+# =============================================================================
+class Specify_IdMatcherCoro:
+    """
+    Specify the da.index._id_matcher_coro() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_yields_the_class_and_offsets_of_each_identifier(self):
+        """
+        Offsets are zero based line and column numbers within the text.
+
+        """
+        import da.index
+        matcher = da.index._id_matcher_coro(None)
+        text    = 'see i00001_first\n  d00012_second and\ni00002_third'
+        assert matcher.send(text) == [
+                                ('item',           'i00001_first',  0, 4),
+                                ('design_element', 'd00012_second', 1, 2),
+                                ('item',           'i00002_third',  2, 0)]
+
+
+# =============================================================================
+class Specify_Offsets:
+    """
+    Specify the da.index._offsets() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_locates_positions_using_the_newline_index(self):
+        """
+        Positions on, before and after newlines are located correctly.
+
+        """
+        import da.index
+        text     = 'ab\ncd\n\nef'
+        newlines = da.index._newline_index(text)
+        assert newlines == [2, 5, 6]
+        assert [da.index._offsets(newlines, ipos)
+                for ipos in range(len(text))] == [(0, 0), (0, 1), (0, 2),
+                                                  (1, 0), (1, 1), (1, 2),
+                                                  (2, 0),
+                                                  (3, 0), (3, 1)]
+
+
+# =============================================================================
+class Specify_IterPythonEmbeddedData:
+    """
+    Specify the da.index._iter_python_embedded_data() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_yields_data_with_the_offsets_of_its_block(self):
+        """
+        Offsets are from the start of the file to the start of the YAML text.
+
+        """
+        import da.index
+        import da.python_source
+        text       = ('def fn():\n'
+                      '    """\n'
+                      '    Docstring.\n'
+                      '\n'
+                      '    ---\n'
+                      '    type: function\n'
+                      '    ...\n'
+                      '\n'
+                      '    """\n'
+                      '    # ---\n'
+                      '    # i00001_first:\n'
+                      '    #   - "Text."\n'
+                      '    # ...\n'
+                      '    return 1\n')
+        lines      = text.splitlines(keepends = True)
+        build_unit = {
+            'relpath':  'fn.py',
+            'lines':    lines,
+            'comments': da.python_source.comment_tokens(text)}
+        items = list(da.index._iter_python_embedded_data(build_unit))
+        assert [data for (data, _, _) in items] == [
+                                            {'type': 'function'},
+                                            {'i00001_first': ['Text.']}]
+        assert [offsets for (_, *offsets) in items] == [[5, 4], [10, 5]]
+
+
 # -----------------------------------------------------------------------------
 def it_exists():
     """
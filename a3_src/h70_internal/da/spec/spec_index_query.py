@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.index_query module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# -----------------------------------------------------------------------------
+def _write_index(dirpath):
+    """
+    Write index files for a pair of identifiers to the specified directory.
+
+    """
+    import da.index
+    merger = da.index.merge_coro()
+    merger.send(([('item', 'i00001_first', 'a.yaml', (1, 1))],
+                 [('item', 'i00001_first', 'a.yaml', '(1, 1)', ('key',))],
+                 []))
+    indices = merger.send(
+                ([('item', 'i00002_second', 'a.yaml', (4, 3)),
+                  ('item', 'i00002_second', 'b.yaml', (2, 7))],
+                 [],
+                 [('item', 'i00002_second', 'a.yaml', '(5, 3)',
+                   "('register', 'i00002_second')", {'desc': 'second'})]))
+    da.index.write(indices, dirpath)
+
+
+# =============================================================================
+class SpecifyIndexReader:
+    """
+    Specify the da.index_query.IndexReader class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_finds_definitions_containers_and_references(self, tmpdir):
+        """
+        Each query returns the locations recorded in the index files.
+
+        """
+        import da.index_query
+        dirpath = str(tmpdir)
+        _write_index(dirpath)
+        reader  = da.index_query.IndexReader(dirpath)
+        result  = reader.lookup('i00002_second')
+        assert result['idclass'] == 'item'
+        assert result['definitions'] == [{'relpath': 'a.yaml',
+                                          'line':    5,
+                                          'col':     3,
+                                          'path':    ['register',
+                                                      'i00002_second']}]
+        assert result['containers'] == []
+        assert result['references'] == [
+                                {'relpath': 'a.yaml', 'line': 4, 'col': 3},
+                                {'relpath': 'b.yaml', 'line': 2, 'col': 7}]
+        assert reader.containers('i00001_first') == [{'relpath': 'a.yaml',
+                                                      'line':    1,
+                                                      'col':     1,
+                                                      'path':    ['key']}]
+        assert reader.references('i00003_missing') == []
+        assert reader.references('not_an_identifier') == []
+        reader.close()
+
+
+# =============================================================================
+class Specify_Search:
+    """
+    Specify the da.index_query._search() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_finds_every_line_of_a_sorted_file(self):
+        """
+        Every key in a sorted file is found, and absent keys are not.
+
+        """
+        import da.index_query
+        keys = ['i{num:05d}_key'.format(num = num) for num in range(0, 200, 2)]
+        buf  = ''.join('{{"{key}": {num}}}\n'.format(key = key, num = num)
+                       for (num, key) in enumerate(keys)).encode('utf-8')
+        for (num, key) in enumerate(keys):
+            line = da.index_query._search(buf, key.encode('utf-8'))
+            assert line == '{{"{key}": {num}}}'.format(
+                                        key = key, num = num).encode('utf-8')
+        for num in (-1, 1, 99, 199, 201):
+            absent = 'i{num:05d}_key'.format(num = num).encode('utf-8')
+            assert da.index_query._search(buf, absent) is None
+
+
+# =============================================================================
+class SpecifyFindDirpath:
+    """
+    Specify the da.index_query.find_dirpath() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_most_recently_written_index(self, tmpdir, monkeypatch):
+        """
+        The branch log directory with the newest line index is returned.
+
+        """
+        import da.index_query
+        import da.lwc.discover
+        monkeypatch.setattr(da.lwc.discover, 'path',
+                            lambda key, dirpath_lwc_root: str(tmpdir))
+        assert da.index_query.find_dirpath('/lwc') is None
+        for (branch, mtime) in (('master', 100), ('feature', 200)):
+            dirpath = tmpdir.join('default', branch, 'log').ensure(dir = True)
+            dirpath.join('item.line_index.jseq').write('')
+            os.utime(str(dirpath.join('item.line_index.jseq')), (mtime, mtime))
+        dirpath_expected = tmpdir.join('default', 'feature', 'log')
+        assert da.index_query.find_dirpath('/lwc') == str(dirpath_expected)
+        assert da.index_query.find_dirpath('/lwc', cfg_name = 'other') is None
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.index_spill module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+import pytest
+
+
+# =============================================================================
+class SpecifySpillingIndex:
+    """
+    Specify the da.index_spill.SpillingIndex class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_writes_the_same_files_as_an_in_memory_index(self,
+                                                       tmpdir,
+                                                       index_fragment,
+                                                       read_index_files):
+        """
+        Index files written from sorted runs match those from da.index.write.
+
+        """
+        import da.index
+        import da.index_spill
+        fragments = [index_fragment('a.yaml', 'i00002_second'),
+                     index_fragment('b.yaml', 'i00001_first',  line = 3),
+                     index_fragment('a.yaml', 'i00001_first',  line = 5),
+                     index_fragment('c.yaml', 'i00002_second', line = 7)]
+        merger    = da.index.merge_coro()
+        for fragment in fragments:
+            indices = merger.send(fragment)
+        dirpath_memory = str(tmpdir.join('memory'))
+        da.index.write(indices, dirpath_memory)
+
+        dirpath_tmp = str(tmpdir.join('tmp'))
+        index       = da.index_spill.SpillingIndex(dirpath_tmp,
+                                                   memory_budget = 1)
+        merger      = da.index.merge_coro(index)
+        for fragment in fragments:
+            assert merger.send(fragment) is index
+        assert len(os.listdir(dirpath_tmp)) == 1
+        dirpath_spill = str(tmpdir.join('spill'))
+        da.index.write(index, dirpath_spill)
+
+        assert (   read_index_files(dirpath_spill)
+                == read_index_files(dirpath_memory))
+        assert os.listdir(dirpath_tmp) == []
+
+    # -------------------------------------------------------------------------
+    def it_rejects_duplicate_identifier_numbers(self,
+                                                tmpdir,
+                                                index_fragment):
+        """
+        Two identifiers with the same number cause an exception.
+
+        """
+        import da.index_spill
+        index = da.index_spill.SpillingIndex(str(tmpdir.join('tmp')),
+                                             memory_budget = 1)
+        index.add(index_fragment('a.yaml', 'i00001_first'))
+        index.add(index_fragment('b.yaml', 'i00001_second'))
+        with pytest.raises(RuntimeError):
+            index.write(str(tmpdir.join('idx')))
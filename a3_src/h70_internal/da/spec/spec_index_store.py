@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.index_store module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import pytest
+
+
+# =============================================================================
+class SpecifyIndexStore:
+    """
+    Specify the da.index_store.IndexStore class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_writes_the_same_files_as_an_in_memory_index(self,
+                                                       tmpdir,
+                                                       index_fragment,
+                                                       read_index_files):
+        """
+        Index files written from the store match those from da.index.write.
+
+        """
+        import da.index
+        import da.index_store
+        fragments = [index_fragment('a.yaml', 'i00001_first'),
+                     index_fragment('b.yaml', 'i00002_second', line = 3),
+                     index_fragment('b.yaml', 'i00001_first',  line = 5)]
+        merger    = da.index.merge_coro()
+        for fragment in fragments:
+            indices = merger.send(fragment)
+        dirpath_memory = str(tmpdir.join('memory'))
+        da.index.write(indices, dirpath_memory)
+
+        store = da.index_store.IndexStore(str(tmpdir.join('index.sqlite')),
+                                          fingerprint = 'f')
+        store.update('a.yaml', 'da', fragments[0])
+        store.update('b.yaml', 'db', tuple(fragments[1][idx]
+                                           + fragments[2][idx]
+                                           for idx in range(3)))
+        dirpath_store = str(tmpdir.join('store'))
+        da.index.write(store, dirpath_store)
+
+        assert (   read_index_files(dirpath_store)
+                == read_index_files(dirpath_memory))
+
+    # -------------------------------------------------------------------------
+    def it_keeps_unchanged_units_and_drops_units_not_in_the_build(
+                                                self, tmpdir, index_fragment):
+        """
+        Only units which are updated in a build are written.
+
+        """
+        import da.index_store
+        filepath = str(tmpdir.join('index.sqlite'))
+        store    = da.index_store.IndexStore(filepath, fingerprint = 'f')
+        store.update('a.yaml', 'da', index_fragment('a.yaml', 'i00001_first'))
+        store.update('b.yaml', 'db', index_fragment('b.yaml', 'i00002_second'))
+        store.write(str(tmpdir.join('first')))
+
+        store = da.index_store.IndexStore(filepath, fingerprint = 'f')
+        assert store.is_current('a.yaml', 'da')
+        assert not store.is_current('b.yaml', 'db2')
+        store.update('a.yaml', 'da')
+        store.write(str(tmpdir.join('second')))
+        with open(str(tmpdir.join('second', 'item.line_index.jseq'))) as file:
+            assert file.read() == '{"i00001_first": {"a.yaml": [[1, 1]]}}\n'
+
+        store = da.index_store.IndexStore(filepath, fingerprint = 'g')
+        assert store.digests == {}
+
+    # -------------------------------------------------------------------------
+    def it_rejects_duplicate_identifier_numbers(self,
+                                                tmpdir,
+                                                index_fragment):
+        """
+        Two identifiers with the same number cause an exception.
+
+        """
+        import da.index_store
+        store = da.index_store.IndexStore(str(tmpdir.join('index.sqlite')),
+                                          fingerprint = 'f')
+        store.update('a.yaml', 'da', index_fragment('a.yaml', 'i00001_first'))
+        store.update('b.yaml', 'db', index_fragment('b.yaml', 'i00001_second'))
+        with pytest.raises(RuntimeError):
+            store.write(str(tmpdir.join('idx')))
@@ -63,3 +63,168 @@ class SpecifyRunSubsidiaryBuild:
         """
         import da.metabuild
         assert callable(da.metabuild.run_subsidiary_build)
+
+
+# =============================================================================
+class SpecifyRunBuild:
+    """
+    Specify the da.metabuild.run_build() function
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_is_callable(self):
+        """
+        The run_build() function is callable.
+
+        """
+        import da.metabuild
+        assert callable(da.metabuild.run_build)
+
+
+# =============================================================================
+class SpecifyContinuousBuildCfg:
+    """
+    Specify the da.metabuild.continuous_build_cfg() function
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_is_callable(self):
+        """
+        The continuous_build_cfg() function is callable.
+
+        """
+        import da.metabuild
+        assert callable(da.metabuild.continuous_build_cfg)
+
+
+# =============================================================================
+class SpecifyRunContinuousBuild:
+    """
+    Specify the da.metabuild.run_continuous_build() function
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_builds_with_the_changed_files(self, monkeypatch):
+        """
+        The changed files are passed to the build, in order, as changed_files.
+
+        """
+        import da.metabuild
+        built = []
+
+        def _build(cfg, abort_event):
+            """
+            Record the build configuration.
+
+            """
+            built.append((cfg, abort_event))
+            return 'TEST_RESULT'
+
+        monkeypatch.setattr(da.metabuild, '_build_and_evaluate_design', _build)
+        cfg    = {'options': {}}
+        result = da.metabuild.run_continuous_build(cfg, {'b.py', 'a.py'}, 42)
+        assert result == 'TEST_RESULT'
+        assert built == [({'options': {}, 'changed_files': ['a.py', 'b.py']},
+                          42)]
+        assert cfg == {'options': {}}
+
+
+# =============================================================================
+class Specify_EvaluateBaselines:
+    """
+    Specify the da.metabuild._evaluate_baselines() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_results_in_the_defined_order(self, monkeypatch):
+        """
+        Results are in the order in which baselines are defined.
+
+        """
+        import threading
+        import time
+        import da.metabuild
+
+        active  = set()
+        overlap = []
+        lock    = threading.Lock()
+
+        def _evaluate(cfg, *_):
+            branch = cfg['safe_baseline_name']
+            with lock:
+                overlap.append(branch in active)
+                active.add(branch)
+            time.sleep(0.3 if cfg['defined_baseline']['hexsha'] == 'a' else 0)
+            with lock:
+                active.remove(branch)
+            return cfg['defined_baseline']['hexsha'].upper()
+
+        monkeypatch.setattr(da.metabuild, '_evaluate_baseline', _evaluate)
+        monkeypatch.setattr(da.metabuild, '_is_admissible', lambda *_: True)
+        baseline_cfg_list = [
+            {'safe_baseline_name': 'x', 'defined_baseline': {'hexsha': 'a'}},
+            {'safe_baseline_name': 'y', 'defined_baseline': {'hexsha': 'b'}},
+            {'safe_baseline_name': 'x', 'defined_baseline': {'hexsha': 'c'}}]
+        results = da.metabuild._evaluate_baselines(
+                                {'options': {'metabuild_concurrency': 2}},
+                                baseline_cfg_list,
+                                None)
+        assert [item['result'] for item in results] == ['A', 'B', 'C']
+        assert not any(overlap)
+
+    # -------------------------------------------------------------------------
+    def it_builds_baselines_on_the_same_branch_concurrently(self, monkeypatch):
+        """
+        Different commits on the same branch are evaluated in separate lanes.
+
+        """
+        import threading
+        import da.metabuild
+
+        barrier = threading.Barrier(2, timeout = 5)
+
+        def _evaluate(cfg, *_):
+            barrier.wait()
+            return cfg['defined_baseline']['hexsha'].upper()
+
+        monkeypatch.setattr(da.metabuild, '_evaluate_baseline', _evaluate)
+        monkeypatch.setattr(da.metabuild, '_is_admissible', lambda *_: True)
+        baseline_cfg_list = [
+            {'safe_branch_name':   'x',
+             'safe_baseline_name': 'x_a',
+             'defined_baseline':   {'hexsha': 'a'}},
+            {'safe_branch_name':   'x',
+             'safe_baseline_name': 'x_b',
+             'defined_baseline':   {'hexsha': 'b'}}]
+        results = da.metabuild._evaluate_baselines(
+                                {'options': {'metabuild_concurrency': 2}},
+                                baseline_cfg_list,
+                                None)
+        assert [item['result'] for item in results] == ['A', 'B']
+
+    # -------------------------------------------------------------------------
+    def it_raises_the_first_defined_failure(self, monkeypatch):
+        """
+        The failure of the first baseline, in the order defined, is raised.
+
+        """
+        import pytest
+        import da.metabuild
+
+        def _evaluate(cfg, *_):
+            raise ValueError(cfg['defined_baseline']['hexsha'])
+
+        monkeypatch.setattr(da.metabuild, '_evaluate_baseline', _evaluate)
+        baseline_cfg_list = [
+            {'safe_baseline_name': 'x', 'defined_baseline': {'hexsha': 'a'}},
+            {'safe_baseline_name': 'y', 'defined_baseline': {'hexsha': 'b'}}]
+        with pytest.raises(ValueError) as exc_info:
+            da.metabuild._evaluate_baselines(
+                                {'options': {'metabuild_concurrency': 2}},
+                                baseline_cfg_list,
+                                None)
+        assert str(exc_info.value) == 'a'
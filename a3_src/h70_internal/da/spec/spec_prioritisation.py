@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.prioritisation module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# =============================================================================
+class SpecifyStatisticsFilepath:
+    """
+    Specify the da.prioritisation.statistics_filepath() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_a_path_in_the_branch_tmp_directory(self):
+        """
+        Statistics are kept separately for each branch and configuration.
+
+        """
+        import da.prioritisation
+        cfg = {'paths': {'rootpath_tmp':       '/tmp/TEST',
+                         'dirpath_branch_tmp': '/tmp/TEST/CFG/BRANCH'}}
+        assert da.prioritisation.statistics_filepath(cfg).startswith(
+                                                    '/tmp/TEST/CFG/BRANCH/')
+
+
+# =============================================================================
+class SpecifyRiskModelStartUnit:
+    """
+    Specify the da.prioritisation.RiskModel.start_unit() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_records_an_observation_for_the_previous_unit(self, tmpdir):
+        """
+        The start_unit() method completes the record for the previous unit.
+
+        """
+        import da.prioritisation
+        model = da.prioritisation.RiskModel(str(tmpdir.join('stats.json')))
+        model.start_unit('a.py')
+        model.start_unit('b.py')
+        assert list(model.stats) == ['a.py']
+
+
+# =============================================================================
+class SpecifyRiskModelRecordNonconformity:
+    """
+    Specify the da.prioritisation.RiskModel.record_nonconformity() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_records_failures_against_the_unit_in_progress(self, tmpdir):
+        """
+        The record_nonconformity() method attributes failures by checker.
+
+        """
+        import da.prioritisation
+        model = da.prioritisation.RiskModel(str(tmpdir.join('stats.json')))
+        model.start_unit('a.py')
+        model.record_nonconformity('TEST_TOOL')
+        model.record_nonconformity('TEST_TOOL')
+        model.start_unit('b.py')
+        assert model.stats['a.py']['failed'] == {'TEST_TOOL': 1.0}
+
+    # -------------------------------------------------------------------------
+    def it_attributes_late_failures_to_the_unit_reported_against(
+                                                                self, tmpdir):
+        """
+        Failures reported after a unit has finished are still counted once.
+
+        """
+        import da.prioritisation
+        model = da.prioritisation.RiskModel(str(tmpdir.join('stats.json')))
+        model.start_unit('a.py', seconds = 2.0)
+        model.start_unit('b.py')
+        model.record_nonconformity('TEST_TOOL', 'a.py')
+        model.record_nonconformity('TEST_TOOL', 'a.py')
+        model.record_nonconformity('TEST_TOOL', 'c.py')
+        model.start_unit('c.py')
+        model.save()
+        assert model.stats['a.py']['failed'] == {'TEST_TOOL': 1.0}
+        assert model.stats['a.py']['seconds'] == 2.0
+        assert model.stats['b.py']['failed'] == {}
+        assert model.stats['c.py']['failed'] == {'TEST_TOOL': 1.0}
+
+
+# =============================================================================
+class SpecifyRiskModelSave:
+    """
+    Specify the da.prioritisation.RiskModel.save() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_persists_statistics_between_builds(self, tmpdir):
+        """
+        The save() method writes statistics that a new model will load.
+
+        """
+        import da.prioritisation
+        filepath = os.path.join(str(tmpdir), 'tmp', 'stats.json')
+        model    = da.prioritisation.RiskModel(filepath)
+        model.start_unit('a.py')
+        model.save()
+        assert 'a.py' in da.prioritisation.RiskModel(filepath).stats
+
+
+# =============================================================================
+class SpecifyRiskModelExpectedYield:
+    """
+    Specify the da.prioritisation.RiskModel.expected_yield() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_prefers_units_that_fail_often_and_check_quickly(self, tmpdir):
+        """
+        The expected_yield() method is failure rate divided by duration.
+
+        """
+        import da.prioritisation
+        model       = da.prioritisation.RiskModel(str(tmpdir.join('s.json')))
+        model.stats = {
+            'failing_fast': {'observed': 4.0, 'seconds': 1.0,
+                             'failed':   {'pylint': 3.0}},
+            'failing_slow': {'observed': 4.0, 'seconds': 10.0,
+                             'failed':   {'pylint': 3.0}},
+            'passing_fast': {'observed': 4.0, 'seconds': 1.0,
+                             'failed':   {'pylint': 0.0}}
+        }
+        assert model.expected_yield('unknown') == float('inf')
+        assert (   model.expected_yield('failing_fast')
+                 > model.expected_yield('failing_slow'))
+        assert (   model.expected_yield('failing_fast')
+                 > model.expected_yield('passing_fast'))
+
+
+# =============================================================================
+class SpecifyRiskModelRank:
+    """
+    Specify the da.prioritisation.RiskModel.rank() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_sorts_within_but_not_across_tiers(self, tmpdir):
+        """
+        The rank() method preserves tier order and sorts within each tier.
+
+        """
+        import da.prioritisation
+        model       = da.prioritisation.RiskModel(str(tmpdir.join('s.json')))
+        model.stats = {
+            'low':  {'observed': 4.0, 'seconds': 1.0, 'failed': {}},
+            'high': {'observed': 4.0, 'seconds': 1.0, 'failed': {'x': 3.0}}
+        }
+        ranked = list(model.rank([(0, 'low'),
+                                  (0, 'high'),
+                                  (1, 'high2'),
+                                  (2, 'low'),
+                                  (2, 'new')]))
+        assert ranked == [(0, 'high'),
+                          (0, 'low'),
+                          (1, 'high2'),
+                          (2, 'new'),
+                          (2, 'low')]
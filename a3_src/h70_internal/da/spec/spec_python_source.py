@@ -443,7 +443,16 @@ class SpecifyIterEmbeddedData:
             root          = ast.parse(encoded_input.read())
             iter_out      = da.python_source.iter_embedded_data(
                                                     'mod', root, encoded_input)
-            return [(embed.dat, embed.meta.path) for embed in iter_out]
+            result        = [(emb.dat, emb.meta.path) for emb in iter_out]
+
+            # Pre-tokenized comments give the same result.
+            comments      = da.python_source.comment_tokens(
+                                                textwrap.dedent(test_vector))
+            iter_out      = da.python_source.iter_embedded_data(
+                                                    'mod', root, None,
+                                                    comments = comments)
+            assert [(emb.dat, emb.meta.path) for emb in iter_out] == result
+            return result
 
         test_vector = '''
                       """
@@ -755,6 +764,31 @@ class Specify_LastLineIn:
         assert callable(da.python_source._last_line_in)
 
 
+# =============================================================================
+class SpecifyCommentTokens:
+    """
+    Specify the da.python_source.comment_tokens() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_same_tokens_as_the_file_tokenizer(self):
+        """
+        The comment_tokens() function tokenizes source text, not files.
+
+        """
+        import da.python_source
+        source_text = textwrap.dedent('''
+                      """
+                      Docstring.
+
+                      """
+                      # Comment.
+                      ''')
+        tokens = da.python_source.comment_tokens(source_text)
+        assert [token.txt for token in tokens] == ['Docstring.', ' Comment.']
+
+
 # =============================================================================
 class Specify_GenEmbeddedDataInFile:
     """
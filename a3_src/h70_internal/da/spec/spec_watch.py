@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.watch module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# =============================================================================
+class SpecifyChangeSet:
+    """
+    Specify the da.watch.ChangeSet class.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_changes_once_they_have_settled(self):
+        """
+        A burst of changes is returned as a single set, which is then cleared.
+
+        """
+        import da.watch
+        change_set = da.watch.ChangeSet()
+        change_set.add('a.py')
+        change_set.add('b.py')
+        change_set.add('a.py')
+        assert change_set.take_settled(0.01) == {'a.py', 'b.py'}
+        change_set.add('c.py')
+        assert change_set.take_settled(0.01) == {'c.py'}
+
+    # -------------------------------------------------------------------------
+    def it_sets_change_events_when_a_change_is_made(self):
+        """
+        Change events are set by the next change, or at once if one is pending.
+
+        """
+        import da.watch
+        change_set = da.watch.ChangeSet()
+        event      = change_set.change_event()
+        assert not event.is_set()
+        change_set.add('a.py')
+        assert event.is_set()
+        assert change_set.change_event().is_set()
+        change_set.take_settled(0.0)
+        assert not change_set.change_event().is_set()
+
+
+# =============================================================================
+class SpecifyIsRelevant:
+    """
+    Specify the da.watch.is_relevant() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_ignores_files_which_the_build_ignores(self):
+        """
+        Source files are relevant; swap files, caches and the like are not.
+
+        """
+        import da.watch
+        root = '/lwc/a3_src'
+        assert da.watch.is_relevant(root, '/lwc/a3_src/x/y.py', False)
+        assert da.watch.is_relevant(root, '/lwc/a3_src/x', True)
+        assert not da.watch.is_relevant(root, '/lwc/a3_src/x/.y.py.swp', False)
+        assert not da.watch.is_relevant(root, '/lwc/a3_src/x/y.py~', False)
+        assert not da.watch.is_relevant(
+                                root, '/lwc/a3_src/__pycache__/y.py', False)
+        assert not da.watch.is_relevant(root, '/lwc/a3_src/.git', True)
+        assert not da.watch.is_relevant(root, '/lwc/a4_tmp/y.py', False)
+
+
+# =============================================================================
+class SpecifySyncChangedFiles:
+    """
+    Specify the da.watch.sync_changed_files() function.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_copies_changes_into_the_isolated_copy(self, tmpdir):
+        """
+        Changed files are copied, and deleted files are deleted.
+
+        """
+        import da.watch
+        dirpath_lwc = os.path.join(str(tmpdir), 'lwc')
+        dirpath_iso = os.path.join(str(tmpdir), 'iso')
+        for (dirpath, relpath, text) in (
+                        (dirpath_lwc, 'changed.py',      'NEW'),
+                        (dirpath_lwc, 'moved/inner.py',  'NEW'),
+                        (dirpath_iso, 'changed.py',      'OLD'),
+                        (dirpath_iso, 'deleted.py',      'OLD'),
+                        (dirpath_iso, 'gone/inner.py',   'OLD')):
+            filepath = os.path.join(dirpath, relpath)
+            os.makedirs(os.path.dirname(filepath), exist_ok = True)
+            with open(filepath, 'wt') as file:
+                file.write(text)
+
+        existing = da.watch.sync_changed_files(
+                changed_files        = [
+                            os.path.join(dirpath_lwc, 'changed.py'),
+                            os.path.join(dirpath_lwc, 'moved'),
+                            os.path.join(dirpath_lwc, 'deleted.py'),
+                            os.path.join(dirpath_lwc, 'gone')],
+                dirpath_lwc_root     = dirpath_lwc,
+                dirpath_isolated_src = dirpath_iso)
+
+        assert existing == {os.path.join(dirpath_lwc, 'changed.py'),
+                            os.path.join(dirpath_lwc, 'moved', 'inner.py')}
+        for relpath in ('changed.py', os.path.join('moved', 'inner.py')):
+            with open(os.path.join(dirpath_iso, relpath), 'rt') as file:
+                assert file.read() == 'NEW'
+        assert not os.path.exists(os.path.join(dirpath_iso, 'deleted.py'))
+        assert not os.path.exists(os.path.join(dirpath_iso, 'gone'))
@@ -45,6 +45,7 @@ string_types       = misc.string_types                  # pylint: disable=C0103
 is_string          = misc.is_string                     # pylint: disable=C0103
 index_builder_coro = misc.index_builder_coro            # pylint: disable=C0103
 build_index        = misc.build_index                   # pylint: disable=C0103
+iter_index_tuples  = misc.iter_index_tuples             # pylint: disable=C0103
 walkobj            = misc.walkobj                       # pylint: disable=C0103
 flatten_ragged     = misc.flatten_ragged                # pylint: disable=C0103
 decompose_map      = misc.decompose_map                 # pylint: disable=C0103
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Module containing a simple size-bounded persistent key-value cache.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import hashlib
+import mmap
+import os
+import pickle
+import tempfile
+
+import da.util.misc
+
+
+# =============================================================================
+class DiskCache:
+    """
+    A persistent, content-addressed key-value cache on the local filesystem.
+
+    Each value is pickled into a file of its own,
+    named after the key, and sharded by the first
+    two characters of the key to keep directory
+    sizes manageable. Keys are expected to be
+    hexadecimal digests, as returned by key().
+
+    Writes are atomic (write to a temporary file,
+    then rename), so concurrent readers and writers
+    in separate processes never see partial values.
+
+    Eviction is least-recently-used: reading an
+    entry touches its modification time, and
+    prune() deletes the oldest entries until the
+    total size of the cache is within bounds.
+
+    Invalidation is by deletion of the directory:
+    the cache is kept under the build tmp directory
+    so that it is wiped along with everything else
+    when the build is configured with clean_tmp_dir.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, dirpath, max_bytes):
+        """
+        Return an initialised instance of the DiskCache class.
+
+        """
+        self.dirpath   = dirpath
+        self.max_bytes = max_bytes
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def key(*parts):
+        """
+        Return a cache key derived from the specified parts.
+
+        Each part should be either a string or a
+        bytes-like object (e.g. a memory map).
+
+        """
+        hasher = hashlib.sha256()
+        for part in parts:
+            if not isinstance(part, (bytes, bytearray, memoryview, mmap.mmap)):
+                part = str(part).encode('utf-8')
+            hasher.update(part)
+            hasher.update(b'\0')
+        return hasher.hexdigest()
+
+    # -------------------------------------------------------------------------
+    def get(self, key, default = None):
+        """
+        Return the value stored against the specified key, or default.
+
+        """
+        filepath = self._filepath(key)
+        try:
+            with open(filepath, 'rb') as file:
+                value = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        try:
+            os.utime(filepath, None)
+        except OSError:
+            pass
+        return value
+
+    # -------------------------------------------------------------------------
+    def put(self, key, value):
+        """
+        Store the specified value against the specified key.
+
+        """
+        filepath = self._filepath(key)
+        dirpath  = os.path.dirname(filepath)
+        da.util.misc.ensure_dir_exists(dirpath)
+        (handle, filepath_tmp) = tempfile.mkstemp(dir = dirpath,
+                                                  suffix = '.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(value, file, protocol = pickle.HIGHEST_PROTOCOL)
+            os.replace(filepath_tmp, filepath)
+        except BaseException:
+            os.remove(filepath_tmp)
+            raise
+
+    # -------------------------------------------------------------------------
+    def prune(self):
+        """
+        Delete least recently used entries until the cache is within bounds.
+
+        """
+        if not os.path.isdir(self.dirpath):
+            return
+        entries = []
+        for (dirpath, _, filenames) in os.walk(self.dirpath):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(filepath)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filepath))
+        total_bytes = sum(size for (_, size, _) in entries)
+        for (_, size, filepath) in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(filepath)
+            except OSError:
+                continue
+            total_bytes -= size
+
+    # -------------------------------------------------------------------------
+    def _filepath(self, key):
+        """
+        Return the filepath of the entry for the specified key.
+
+        """
+        return os.path.join(self.dirpath, key[:2], key + '.pickle')
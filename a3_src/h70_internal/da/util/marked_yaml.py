@@ -17,6 +17,12 @@ the behaviour of `yaml.safe_load`, but in addition:
  - Note that int/bool/... are returned unchanged
    for now
 
+If PyYAML was built with libyaml, CLoader does
+the same, but uses the (much faster) libyaml
+parser in place of the pure Python reader,
+scanner, parser and composer. FastLoader is
+CLoader if it is available and Loader if not.
+
 This module is modified/adapted from Dag Sverre
 Seljebotn's GitHub Gist:
     https://gist.github.com/dagss/5008118
@@ -75,6 +81,14 @@ from yaml.resolver import Resolver
 from yaml.parser import Parser
 from yaml.constructor import SafeConstructor
 
+# The libyaml based parser is only available
+# if PyYAML was built with libyaml.
+#
+try:
+    from yaml.cyaml import CParser
+except ImportError:
+    CParser = None
+
 import da.util
 
 
@@ -125,6 +139,18 @@ def create_node_class(node_type):
             """
             return node_type.__new__(cls, obj)
 
+        def __reduce__(self):
+            """
+            Reduce to the plain underlying type so that nodes can be pickled.
+
+            The NodeClass is created dynamically, so
+            it cannot be located by the unpickler.
+            Marks are discarded when nodes are sent
+            to another process.
+
+            """
+            return (node_type, (node_type(self),))
+
     NodeClass.__name__ = '%s_node' % node_type.__name__
     return NodeClass
 
@@ -215,3 +241,33 @@ class Loader(Reader,                                    # pylint: disable=R0901
         Composer.__init__(self)
         NodeConstructor.__init__(self)
         Resolver.__init__(self)
+
+
+# =============================================================================
+if CParser is not None:
+
+    # Pylint rule R0901 (too-many-ancestors) disabled
+    # as class design is determined by the YAML library
+    # architecture, and is not under our control.
+    #
+    class CLoader(CParser,                              # pylint: disable=R0901
+                  NodeConstructor,
+                  Resolver):
+        """
+        Custom libyaml Loader class that supports marking of line numbers.
+
+        """
+
+        def __init__(self, stream):
+            """
+            Return an instance of this customised YAML Loader class.
+
+            """
+            CParser.__init__(self, stream)
+            NodeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+    FastLoader = CLoader
+
+else:
+    FastLoader = Loader
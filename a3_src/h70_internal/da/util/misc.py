@@ -32,6 +32,7 @@ license:
 
 
 import collections
+import collections.abc
 import contextlib
 import functools
 import hashlib
@@ -199,6 +200,34 @@ def build_index(itable_tup):
     return _reduce(_add_tup_to_idx, iter_all, idx_ctor())
 
 
+# -----------------------------------------------------------------------------
+def iter_index_tuples(index, prefix = ()):
+    """
+    Yield the multi-key tuples from which the specified index was built.
+
+    This is the inverse of build_index() and
+    index_builder_coro(). It yields one tuple
+    for each payload value in the index, with
+    the preceeding elements in each tuple
+    giving the hierarchy of keys under which
+    that payload value was indexed.
+
+    >>> idx = build_index((('a', 'b', 1), ('a', 'c', 2)))
+    >>> sorted(iter_index_tuples(idx))
+    [('a', 'b', 1), ('a', 'c', 2)]
+
+    """
+    if index is None:
+        return
+    if isinstance(index, dict):
+        for (key, value) in index.items():
+            for tupl in iter_index_tuples(value, prefix + (key,)):
+                yield tupl
+    else:
+        for payload in index:
+            yield prefix + (payload,)
+
+
 # -----------------------------------------------------------------------------
 # TODO: Refactor this so the parameters go in a named tuple and re-enable the
 #       pylint warning.
@@ -238,7 +267,7 @@ def walkobj(obj,                                  # pylint: disable=R0912,R0913
     # path before returning control back up
     # the stack.
     #
-    is_itable    = isinstance(obj, collections.Iterable)
+    is_itable    = isinstance(obj, collections.abc.Iterable)
     is_leaf      = (not is_itable) or is_string(obj)
 
     if is_leaf:
@@ -288,7 +317,7 @@ def walkobj(obj,                                  # pylint: disable=R0912,R0913
 
         """
         return getattr(mapping, 'iteritems', mapping.items)()
-    itfcn = mapiter if isinstance(obj, collections.Mapping) else enumerate
+    itfcn = mapiter if isinstance(obj, collections.abc.Mapping) else enumerate
 
     for pathpart, component in itfcn(obj):
 
@@ -333,7 +362,7 @@ def flatten_ragged(raggedlist, memo = None):
     # path before returning control back up the
     # stack.
     #
-    is_itable    = isinstance(raggedlist, collections.Iterable)
+    is_itable    = isinstance(raggedlist, collections.abc.Iterable)
 
     is_leaf      = (not is_itable) or is_string(raggedlist)
 
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the da.util.diskcache module.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import os
+
+
+# =============================================================================
+class SpecifyDiskCacheKey:
+    """
+    Specify the da.util.diskcache.DiskCache.key() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_depends_on_the_boundaries_between_parts(self):
+        """
+        The key() method distinguishes ('ab', 'c') from ('a', 'bc').
+
+        """
+        import da.util.diskcache
+        key = da.util.diskcache.DiskCache.key
+        assert key('ab', 'c') != key('a', 'bc')
+        assert key('a', b'b') == key('a', 'b')
+
+
+# =============================================================================
+class SpecifyDiskCacheGet:
+    """
+    Specify the da.util.diskcache.DiskCache.get() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_returns_the_default_on_a_cache_miss(self, tmpdir):
+        """
+        The get() method returns the default value if the key is absent.
+
+        """
+        import da.util.diskcache
+        cache = da.util.diskcache.DiskCache(str(tmpdir), max_bytes = 1024)
+        assert cache.get(cache.key('absent'), default = 'MISS') == 'MISS'
+
+
+# =============================================================================
+class SpecifyDiskCachePut:
+    """
+    Specify the da.util.diskcache.DiskCache.put() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_stores_values_for_later_retrieval(self, tmpdir):
+        """
+        The put() method stores a value which can be retrieved with get().
+
+        """
+        import da.util.diskcache
+        cache = da.util.diskcache.DiskCache(str(tmpdir), max_bytes = 1024)
+        key   = cache.key('present')
+        cache.put(key, [{'msg': 'TEST'}])
+        reopened = da.util.diskcache.DiskCache(str(tmpdir), max_bytes = 1024)
+        assert reopened.get(key) == [{'msg': 'TEST'}]
+
+
+# =============================================================================
+class SpecifyDiskCachePrune:
+    """
+    Specify the da.util.diskcache.DiskCache.prune() method.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_evicts_least_recently_used_entries_first(self, tmpdir):
+        """
+        The prune() method deletes the oldest entries until within bounds.
+
+        """
+        import da.util.diskcache
+        cache = da.util.diskcache.DiskCache(str(tmpdir), max_bytes = 0)
+        keys  = [cache.key(idx) for idx in range(3)]
+        for (idx, key) in enumerate(keys):
+            cache.put(key, 'x' * 100)
+            os.utime(cache._filepath(key), (idx, idx))
+        cache.get(keys[0])
+        size = os.path.getsize(cache._filepath(keys[0]))
+        cache.max_bytes = 2 * size
+        cache.prune()
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
@@ -51,6 +51,21 @@ class SpecifyCreateNodeClass:
         DictNode = da.util.marked_yaml.create_node_class(dict)
         assert inspect.isclass(DictNode)
 
+    # -------------------------------------------------------------------------
+    def it_returns_a_class_with_picklable_instances(self):
+        """
+        Instances of the returned class pickle to the plain underlying type.
+
+        """
+        import pickle
+        import yaml
+        import da.util.marked_yaml
+        data = yaml.load('a: [b, c]', Loader = da.util.marked_yaml.Loader)
+        assert isinstance(data, da.util.marked_yaml.DictNode)
+        copied = pickle.loads(pickle.dumps(data))
+        assert type(copied) is dict
+        assert copied == {'a': ['b', 'c']}
+
 
 # =============================================================================
 class SpecifyNodeConstructorConstructYamlMap:
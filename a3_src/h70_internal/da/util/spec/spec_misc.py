@@ -143,6 +143,32 @@ class SpecifyBuildIndex:
         assert callable(da.util.misc.build_index)
 
 
+# =============================================================================
+class SpecifyIterIndexTuples:
+    """
+    Specify the da.util.misc.iter_index_tuples() function.
+
+    """
+
+    def it_is_the_inverse_of_build_index(self):
+        """
+        The iter_index_tuples() function yields the tuples that built an idx.
+
+        """
+        import da.util.misc
+        tuples = [('a', 'b', 1), ('a', 'b', 2), ('a', 'c', 3)]
+        index  = da.util.misc.build_index(tuples)
+        assert sorted(da.util.misc.iter_index_tuples(index)) == tuples
+
+    def it_yields_nothing_for_an_empty_index(self):
+        """
+        The iter_index_tuples() function yields nothing for a None index.
+
+        """
+        import da.util.misc
+        assert list(da.util.misc.iter_index_tuples(None)) == []
+
+
 # =============================================================================
 class SpecifyWalkobj:
     """
@@ -42,8 +42,12 @@ license:
 
 import contextlib
 import datetime
+import hashlib
 import logging
 import os
+import re
+import shutil
+import threading
 
 import git
 
@@ -55,6 +59,15 @@ import da.util
 from . import git_adapter as vcs_adapter
 
 
+# Mirrors may be updated from several threads
+# at once (e.g. when dependency sources are
+# fetched concurrently), so each mirror has a
+# lock to serialise updates to it.
+#
+_MIRROR_LOCKS      = {}
+_MIRROR_LOCKS_LOCK = threading.Lock()
+
+
 # ------------------------------------------------------------------------------
 @contextlib.contextmanager
 def rollback_context(dirpath_root):
@@ -245,6 +258,7 @@ def commit_info(dirpath_root = None, ref = 'HEAD'):
         return {
             'hexsha':           hexsha,
             'short_hexsha':     hexsha[0:8],
+            'tree_hexsha':      commit.tree.hexsha,
             'branch':           branch,
             'is_dirty':         is_dirty,
             'has_untracked':    has_untracked,
@@ -270,6 +284,7 @@ def commit_info(dirpath_root = None, ref = 'HEAD'):
         return {
             'hexsha':           None,
             'short_hexsha':     None,
+            'tree_hexsha':      None,
             'branch':           None,
             'author_name':      None,
             'author_email':     None,
@@ -286,6 +301,64 @@ def commit_info(dirpath_root = None, ref = 'HEAD'):
         }
 
 
+# ------------------------------------------------------------------------------
+def ensure_mirrored(dirpath_mirror_root, url_remote):
+    """
+    Return the path of an up to date bare mirror of the remote repository.
+
+    Mirrors are kept in dirpath_mirror_root, named
+    after the remote URL. A new mirror is a full
+    clone of the remote; after that, each update is
+    an incremental fetch. Local repositories can
+    then be cloned from, and fetch from, the mirror
+    without going to the network, and a remote that
+    is temporarily unavailable only causes the
+    mirror to go stale.
+
+    """
+    dirpath_mirror = os.path.join(dirpath_mirror_root,
+                                  _mirror_dirname(url_remote))
+
+    with _MIRROR_LOCKS_LOCK:
+        lock = _MIRROR_LOCKS.setdefault(dirpath_mirror, threading.Lock())
+
+    with lock:
+        if os.path.isdir(dirpath_mirror):
+            try:
+                vcs_adapter.update_mirror(dirpath_mirror)
+            except git.exc.GitCommandError as err:
+                logging.warning('Failed to update mirror of %s: %s',
+                                url_remote, str(err))
+            return dirpath_mirror
+
+        # Clone to a temporary directory first,
+        # so that an interrupted clone never
+        # leaves a partial mirror behind.
+        #
+        dirpath_partial = dirpath_mirror + '.partial'
+        if os.path.isdir(dirpath_partial):
+            shutil.rmtree(dirpath_partial)
+        da.util.ensure_dir_exists(dirpath_mirror_root)
+        vcs_adapter.clone_mirror(url_remote, dirpath_partial)
+        os.rename(dirpath_partial, dirpath_mirror)
+        return dirpath_mirror
+
+
+# ------------------------------------------------------------------------------
+def _mirror_dirname(url_remote):
+    """
+    Return the name of the mirror directory for the specified remote URL.
+
+    """
+    name = os.path.basename(url_remote.rstrip('/'))
+    if name.endswith('.git'):
+        name = name[:-len('.git')]
+    return '{name}.{digest}.git'.format(
+                name   = re.sub(r'[^\w.-]', '_', name),
+                digest = hashlib.sha1(
+                            url_remote.encode('utf-8')).hexdigest()[:12])
+
+
 # ------------------------------------------------------------------------------
 def ensure_cloned(dirpath_local, url_remote, ref):
     """
@@ -341,16 +414,95 @@ def ensure_cloned(dirpath_local, url_remote, ref):
                                                         path = dirpath_local))
 
 
+# ------------------------------------------------------------------------------
+def ensure_updated(dirpath_local, url_remote, ref):
+    """
+    Incrementally update local repository to a state cloned from the remote.
+
+    This is a faster alternative to ensure_cloned()
+    for remotes on the local filesystem. The local
+    repository is cloned only once, sharing the
+    object store of the remote. After that, only
+    the paths that differ between the previous
+    and the new configuration are checked out.
+
+    Objects are only fetched if they cannot be
+    found through the shared object store.
+
+    The result is verified by comparing the tree
+    hash of the index against the tree hash of
+    the commit, and by checking for modified and
+    untracked files. If verification fails, we
+    fall back to ensure_cloned(), so the result is
+    always identical to a full checkout. If the
+    objects that the local repository relies on
+    have been pruned from the shared object store,
+    it is replaced with a clone of its own.
+
+    """
+    hexsha = vcs_adapter.resolve_commit(url_remote, ref)
+
+    try:
+        local = git.Repo(dirpath_local)
+    except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError):
+        if os.path.isdir(dirpath_local) and os.listdir(dirpath_local):
+            return ensure_cloned(dirpath_local, url_remote, hexsha)
+        local = vcs_adapter.clone_shared(url_remote, dirpath_local)
+
+    if not local.working_tree_dir == dirpath_local:
+        return ensure_cloned(dirpath_local, url_remote, hexsha)
+
+    try:
+        if not vcs_adapter.has_commit(local, hexsha):
+            local.remotes.origin.fetch()
+        changed = vcs_adapter.checkout_changed_paths(local, hexsha)
+        logging.info('Updated %d paths in: %s', len(changed), dirpath_local)
+    except (git.exc.GitCommandError, ValueError) as err:
+        logging.warning('Incremental update failed: %s', str(err))
+
+    if not vcs_adapter.is_pristine(local, hexsha):
+        logging.warning('Isolated copy failed verification: %s', dirpath_local)
+        _ensure_recloned(dirpath_local, url_remote, hexsha)
+
+
+# ------------------------------------------------------------------------------
+def _ensure_recloned(dirpath_local, url_remote, hexsha):
+    """
+    Force local repository to the commit, re-cloning it if that fails.
+
+    A local repository which shares the object
+    store of the remote is broken if objects that
+    it needs are pruned by garbage collection in
+    the remote. It is then deleted and cloned
+    again, this time without sharing objects.
+
+    """
+    try:
+        ensure_cloned(dirpath_local, url_remote, hexsha)
+    except (git.exc.GitCommandError, ValueError) as err:
+        logging.warning('Re-cloning isolated copy: %s', str(err))
+        shutil.rmtree(dirpath_local)
+        vcs_adapter.get_repo.cache_clear()  # Forget the deleted repo.
+        ensure_cloned(dirpath_local, url_remote, hexsha)
+
+
 # ------------------------------------------------------------------------------
 def clone_all_design_documents(dirpath_destination,
                                dirpath_lwc_root,
-                               configuration):
+                               configuration,
+                               incremental = False):
     """
     Clone all design document repositories into the specified directory.
 
+    If incremental is True, existing clones are
+    updated with ensure_updated(), so that only
+    changed paths are checked out.
+
     """
+    ensure_isolated = ensure_updated if incremental else ensure_cloned
+
     # Clone the root repo.
-    ensure_cloned(
+    ensure_isolated(
         dirpath_local = os.path.join(dirpath_destination),
         url_remote    = os.path.join(dirpath_lwc_root),
         ref           = configuration)
@@ -365,7 +517,7 @@ def clone_all_design_documents(dirpath_destination,
             continue
         try:
             subrepo_cfg = repo_register[relpath]['configuration']
-            ensure_cloned(
+            ensure_isolated(
                 dirpath_local = os.path.join(dirpath_destination, relpath),
                 url_remote    = os.path.join(dirpath_lwc_root, relpath),
                 ref           = subrepo_cfg)
@@ -266,6 +266,113 @@ def commit(repo, commit_msg, try_amendment):
     return repo.head.commit.hexsha
 
 
+# -----------------------------------------------------------------------------
+def clone_shared(url_remote, dirpath_local):
+    """
+    Clone a local repository, sharing its object store rather than copying it.
+
+    The clone refers to the objects in the remote
+    repository through git alternates, so cloning
+    is fast and uses little disk space. The clone
+    also caches untracked file information, which
+    makes subsequent status checks much faster.
+
+    """
+    repo = git.Repo.clone_from(url_remote, dirpath_local, shared = True)
+    repo.git.config('core.untrackedCache', 'true')
+    return repo
+
+
+# -----------------------------------------------------------------------------
+def clone_mirror(url_remote, dirpath_mirror):
+    """
+    Create a bare mirror of the remote repository, with all of its refs.
+
+    """
+    return git.Repo.clone_from(url_remote, dirpath_mirror, mirror = True)
+
+
+# -----------------------------------------------------------------------------
+def update_mirror(dirpath_mirror):
+    """
+    Fetch new objects and refs into a mirror, pruning deleted refs.
+
+    """
+    git.Repo(dirpath_mirror).git.remote('update', '--prune')
+
+
+# -----------------------------------------------------------------------------
+def resolve_commit(dirpath_repo, ref):
+    """
+    Return the hexsha of the commit identified by ref in the specified repo.
+
+    """
+    return git.Repo(dirpath_repo).commit(ref).hexsha
+
+
+# -----------------------------------------------------------------------------
+def has_commit(repo, hexsha):
+    """
+    Return True if the repo (or a repo sharing objects with it) has the commit.
+
+    """
+    try:
+        repo.git.cat_file('-e', '{hexsha}^{{commit}}'.format(hexsha = hexsha))
+    except git.exc.GitCommandError:
+        return False
+    return True
+
+
+# -----------------------------------------------------------------------------
+def checkout_changed_paths(repo, hexsha):
+    """
+    Detach HEAD at the specified commit, updating only the paths that differ.
+
+    The index and working tree are updated with a
+    two-tree merge from the current HEAD, so files
+    that are the same in both commits are neither
+    rewritten nor hashed. The list of changed paths
+    is returned.
+
+    """
+    hexsha_prev = repo.head.commit.hexsha
+    if hexsha_prev == hexsha:
+        return []
+    changed = [relpath for relpath in repo.git.diff(
+                                        '--name-only', '--no-renames', '-z',
+                                        hexsha_prev, hexsha).split('\0')
+                                                                if relpath]
+    repo.git.read_tree('-m', '-u', hexsha_prev, hexsha)
+    repo.git.update_ref('--no-deref', 'HEAD', hexsha)
+    return changed
+
+
+# -----------------------------------------------------------------------------
+def is_pristine(repo, hexsha):
+    """
+    Return True if the working tree is an exact checkout of the commit.
+
+    HEAD must be detached at the commit, the tree
+    hash of the index must match the tree hash of
+    the commit, and there must be no modified or
+    untracked files in the working tree.
+
+    A repository with objects that cannot be read
+    (e.g. because they have been pruned from an
+    object store that it shares) is not pristine.
+
+    """
+    try:
+        if not repo.head.is_detached or repo.head.commit.hexsha != hexsha:
+            return False
+        if repo.git.write_tree() != repo.commit(hexsha).tree.hexsha:
+            return False
+        repo.git.diff_files('--quiet')
+        return not repo.git.ls_files('--others', '--exclude-standard')
+    except (git.exc.GitCommandError, ValueError):
+        return False
+
+
 # -----------------------------------------------------------------------------
 def design_repo_tab(dirpath_lwc_root):
     """
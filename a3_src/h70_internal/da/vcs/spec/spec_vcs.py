@@ -115,7 +115,8 @@ class SpecifyCommitInfo:
                                                   'hexsha',
                                                   'is_dirty',
                                                   'is_modified',
-                                                  'short_hexsha'])
+                                                  'short_hexsha',
+                                                  'tree_hexsha'])
             assert info['branch'] == 'master'
 
 
@@ -136,6 +137,45 @@ class SpecifyCloneAllDesignDocuments:
         assert callable(da.vcs.clone_all_design_documents)
 
 
+# =============================================================================
+class SpecifyEnsureMirrored:
+    """
+    Specify the da.vcs.ensure_mirrored() function
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_keeps_a_local_mirror_up_to_date_with_the_remote(self):
+        """
+        Clones from the mirror see commits made to the remote after mirroring.
+
+        """
+        import da.vcs
+        with tempfile.TemporaryDirectory() as dirpath_tmp:
+
+            dirpath_remote = os.path.join(dirpath_tmp, 'remote.git')
+            dirpath_mirror = os.path.join(dirpath_tmp, 'mirror')
+            dirpath_local  = os.path.join(dirpath_tmp, 'local')
+            git.Repo.init(dirpath_remote, bare = False)
+            hexsha_first   = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'first'))
+
+            mirror = da.vcs.ensure_mirrored(dirpath_mirror, dirpath_remote)
+            assert os.path.basename(mirror).startswith('remote.')
+            assert git.Repo(mirror).bare
+            da.vcs.ensure_cloned(dirpath_local, mirror, hexsha_first)
+            assert os.path.isfile(os.path.join(dirpath_local, 'first'))
+
+            hexsha_second  = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'second'))
+            assert da.vcs.ensure_mirrored(dirpath_mirror,
+                                          dirpath_remote) == mirror
+            da.vcs.ensure_cloned(dirpath_local, mirror, hexsha_second)
+            assert git.Repo(dirpath_local).head.commit.hexsha == hexsha_second
+
+
 # =============================================================================
 class SpecifyEnsureCloned:
     """
@@ -153,12 +193,94 @@ class SpecifyEnsureCloned:
         assert callable(da.vcs.ensure_cloned)
 
 
+# =============================================================================
+class SpecifyEnsureUpdated:
+    """
+    Specify the da.vcs.ensure_updated() function
+
+    """
+
+    # -------------------------------------------------------------------------
+    def it_checks_out_each_configuration_exactly(self):
+        """
+        The local repository matches each specified commit in turn.
+
+        """
+        import da.vcs
+        with tempfile.TemporaryDirectory() as dirpath_tmp:
+
+            dirpath_remote = os.path.join(dirpath_tmp, 'remote')
+            dirpath_local  = os.path.join(dirpath_tmp, 'local')
+            git.Repo.init(dirpath_remote, bare = False)
+            hexsha_first   = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'first'))
+            hexsha_second  = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'second'))
+
+            da.vcs.ensure_updated(dirpath_local, dirpath_remote, hexsha_first)
+            assert not os.path.exists(os.path.join(dirpath_local, 'second'))
+
+            da.vcs.ensure_updated(dirpath_local, dirpath_remote, hexsha_second)
+            local = git.Repo(dirpath_local)
+            assert local.head.commit.hexsha == hexsha_second
+            assert os.path.isfile(os.path.join(dirpath_local, 'second'))
+
+            # Local modifications are discarded.
+            with open(os.path.join(dirpath_local, 'first'), 'wt') as file:
+                file.write('modified')
+            da.vcs.ensure_updated(dirpath_local, dirpath_remote, hexsha_second)
+            assert not local.is_dirty()
+
+    # -------------------------------------------------------------------------
+    def it_recovers_when_shared_objects_are_pruned(self):
+        """
+        The local repository is re-cloned if garbage collection breaks it.
+
+        """
+        import da.vcs
+        with tempfile.TemporaryDirectory() as dirpath_tmp:
+
+            dirpath_remote = os.path.join(dirpath_tmp, 'remote')
+            dirpath_local  = os.path.join(dirpath_tmp, 'local')
+            remote         = git.Repo.init(dirpath_remote, bare = False)
+            hexsha_first   = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'first'))
+            da.vcs.ensure_updated(dirpath_local, dirpath_remote, hexsha_first)
+            hexsha_second  = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'second'))
+            da.vcs.ensure_updated(dirpath_local, dirpath_remote, hexsha_second)
+
+            # Discard the second commit in the remote,
+            # and prune it from the object store that
+            # the local repository shares.
+            remote.git.reset('--hard', hexsha_first)
+            remote.git.reflog('expire', '--expire=now', '--all')
+            remote.git.gc('--prune=now')
+
+            hexsha_third   = create_file_and_commit(
+                                dirpath_remote,
+                                os.path.join(dirpath_remote, 'third'))
+            da.vcs.ensure_updated(dirpath_local, dirpath_remote, hexsha_third)
+            local = git.Repo(dirpath_local)
+            assert local.head.commit.hexsha == hexsha_third
+            assert os.path.isfile(os.path.join(dirpath_local, 'third'))
+            assert not os.path.exists(os.path.join(dirpath_local, 'second'))
+            assert not local.is_dirty()
+            assert not os.path.exists(os.path.join(
+                            dirpath_local, '.git', 'objects', 'info',
+                            'alternates'))
+
+
 # -----------------------------------------------------------------------------
 def create_file_and_commit(dirpath_repo, filepath):
     """
     Helper function to commit a file.
 
-    Used by SpecifyCommitInfo.
+    Used by SpecifyCommitInfo and SpecifyEnsureUpdated.
 
     """
     repo = git.Repo(dirpath_repo)
@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+"""
+Continuous build service.
+
+The continuous build service provides feedback on
+changes to the design documents as they are made,
+without the developer having to ask for a build.
+
+The service is a daemon that uses inotify to watch
+the source tree of the local working copy for
+changed files. A burst of saves (e.g. from a
+"save all" or from a git checkout) is collected
+into a single set of changed files, and a build
+is only started once no further changes have been
+made for a short (debounce) interval. If further
+changes are made while a build is in progress,
+that build is stale, so it is cancelled, and a new
+build is started for the union of the old and the
+new changes once they have settled.
+
+Unlike the builds made by "da build", continuous
+builds neither auto-commit nor roll back, so the
+git history is left untouched. Instead, the service
+keeps its own isolated copy of the design documents,
+made from HEAD when the service starts, and copies
+each changed file into it before each build. The
+set of changed files is passed to the build as the
+changed_files for the build to check first.
+
+The service runs with a reduced CPU and I/O
+scheduling priority, which is inherited by the
+builds that it starts, so that it does not get in
+the way of interactive work.
+
+---
+type:
+    python_module
+
+validation_level:
+    v00_minimum
+
+protection:
+    k00_public
+
+copyright:
+    "Copyright 2016 High Integrity Artificial Intelligence Systems"
+
+license:
+    "Licensed under the Apache License, Version 2.0 (the License);
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an AS IS BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License."
+...
+"""
+
+
+import contextlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+import psutil
+import pyinotify
+
+import da.exception
+import da.log
+import da.lwc.discover
+import da.metabuild
+import da.util
+import da.util.daemon
+import da.vcs
+
+
+# The inotify events which indicate that a file
+# or directory has been changed. Files are only
+# considered changed once they have been closed,
+# so that we do not copy half-written files.
+#
+_EVENT_MASK = (  pyinotify.IN_CLOSE_WRITE
+               | pyinotify.IN_MOVED_TO
+               | pyinotify.IN_MOVED_FROM
+               | pyinotify.IN_DELETE)
+
+_DIR_EXCLUDE_LIST  = [re.compile(expr) for expr
+                      in da.lwc.discover.LWC_DIR_EXCLUDE_EXPR_LIST]
+
+_FILE_INCLUDE_LIST = [re.compile(expr) for expr
+                      in da.lwc.discover.LWC_EXT_INCLUDE_EXPR_LIST]
+
+
+# -----------------------------------------------------------------------------
+def main(cfg_key, cfg_extras, dirpath_lwc_root, foreground = False):
+    """
+    Start the continuous build service for the local working copy.
+
+    The service is started as a daemon unless
+    foreground is True, in which case it runs
+    until interrupted.
+
+    """
+    service = WatchService(cfg_key          = cfg_key,
+                           cfg_extras       = cfg_extras,
+                           dirpath_lwc_root = dirpath_lwc_root)
+    if foreground:
+        service.run()
+    else:
+        service.start()
+
+
+# -----------------------------------------------------------------------------
+def stop(dirpath_lwc_root):
+    """
+    Stop the continuous build service for the local working copy.
+
+    """
+    da.util.daemon.BaseDaemon(pid_filepath(dirpath_lwc_root)).stop()
+
+
+# -----------------------------------------------------------------------------
+def pid_filepath(dirpath_lwc_root):
+    """
+    Return the path of the pidfile for the continuous build service.
+
+    """
+    dirpath_tmp = da.lwc.discover.path(key              = 'tmp',
+                                       dirpath_lwc_root = dirpath_lwc_root)
+    da.util.ensure_dir_exists(dirpath_tmp)
+    return os.path.join(dirpath_tmp, 'watch.pid')
+
+
+# =============================================================================
+class WatchService(da.util.daemon.BaseDaemon):
+    """
+    Daemon which runs a build each time the design documents are changed.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, cfg_key, cfg_extras, dirpath_lwc_root):
+        """
+        Return a WatchService instance for the specified local working copy.
+
+        """
+        super().__init__(pidfile = pid_filepath(dirpath_lwc_root))
+        self.cfg_key          = cfg_key
+        self.cfg_extras       = cfg_extras
+        self.dirpath_lwc_root = dirpath_lwc_root
+        self.change_set       = ChangeSet()
+
+    # -------------------------------------------------------------------------
+    def run(self):
+        """
+        Build changes to the design documents as they are made, until stopped.
+
+        Files which differ from HEAD when the
+        service starts are built straight away.
+
+        """
+        cfg     = self.cfg()
+        options = cfg['options']
+        lower_priority(niceness   = options.get('watch_niceness', 10),
+                       is_io_idle = options.get('watch_io_idle', True))
+        da.log.configure(dirpath_log      = cfg['paths']['dirpath_branch_log'],
+                         loglevel_overall = logging.INFO,
+                         loglevel_console = logging.INFO,
+                         loglevel_file    = logging.INFO)
+
+        dirpath_src   = da.lwc.discover.path(
+                                    key              = 'src',
+                                    dirpath_lwc_root = self.dirpath_lwc_root)
+        debounce_secs = options.get('watch_debounce_secs', 0.5)
+        with _notifier_context(dirpath_src, self.change_set):
+            pending = isolate(cfg, self.dirpath_lwc_root)
+            while True:
+                if pending:
+                    pending = self.build(pending)
+                pending |= self.change_set.take_settled(debounce_secs)
+
+    # -------------------------------------------------------------------------
+    def cfg(self):
+        """
+        Return a freshly loaded configuration for a continuous build.
+
+        The configuration is reloaded for each build
+        so that each build has its own timestamp and
+        build id, and so that changes to the build
+        configuration files take effect.
+
+        """
+        return da.metabuild.continuous_build_cfg(
+                                    cfg_key          = self.cfg_key,
+                                    cfg_extras       = self.cfg_extras,
+                                    dirpath_lwc_root = self.dirpath_lwc_root)
+
+    # -------------------------------------------------------------------------
+    def build(self, pending):
+        """
+        Build the pending changes, returning those that remain to be built.
+
+        The build is cancelled as soon as any further
+        change is made, in which case the changes are
+        still pending. Otherwise, the changes have been
+        built, whether or not the build succeeded.
+
+        """
+        cfg         = self.cfg()
+        abort_event = self.change_set.change_event()
+        changed     = sync_changed_files(
+                            changed_files        = pending,
+                            dirpath_lwc_root     = self.dirpath_lwc_root,
+                            dirpath_isolated_src = cfg['paths'][
+                                                    'dirpath_isolated_src'])
+        logging.info('Building %d changed files.', len(changed))
+        try:
+            da.metabuild.run_continuous_build(cfg, changed, abort_event)
+            logging.info('Build completed.')
+        except da.exception.BuildAborted:
+            logging.info('Build cancelled by newer changes.')
+            return pending
+        except da.exception.AbortSilently:
+            logging.info('Build aborted.')
+        except da.exception.AbortWithoutStackTrace as abort:
+            logging.warning('Nonconformity: %s', abort.message)
+
+        # Pylint rule W0703 (broad-except) disabled.
+        # The service must keep running whatever
+        # goes wrong in any one build.
+        #
+        except Exception:                               # pylint: disable=W0703
+            logging.exception('Error in build process.')
+        return set()
+
+
+# =============================================================================
+class ChangeSet:
+    """
+    Thread-safe collection of changed filepaths.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def __init__(self, clock = time.monotonic):
+        """
+        Return an empty ChangeSet instance.
+
+        """
+        self._clock       = clock
+        self._condition   = threading.Condition()
+        self._paths       = set()
+        self._events      = []
+        self._time_change = None
+
+    # -------------------------------------------------------------------------
+    def add(self, filepath):
+        """
+        Record a change to the specified file or directory.
+
+        """
+        with self._condition:
+            self._paths.add(filepath)
+            self._time_change = self._clock()
+            for event in self._events:
+                event.set()
+            self._condition.notify_all()
+
+    # -------------------------------------------------------------------------
+    def change_event(self):
+        """
+        Return an event which is set as soon as there is a change.
+
+        The event is set immediately if there are
+        already changes that have not been taken.
+
+        """
+        event = threading.Event()
+        with self._condition:
+            if self._paths:
+                event.set()
+            self._events.append(event)
+        return event
+
+    # -------------------------------------------------------------------------
+    def take_settled(self, debounce_secs):
+        """
+        Return and clear the changes, once none have been made for a while.
+
+        Blocks until there is at least one change,
+        and no change has been made for debounce_secs.
+
+        """
+        with self._condition:
+            while True:
+                if self._paths:
+                    quiet_secs = self._clock() - self._time_change
+                    if quiet_secs >= debounce_secs:
+                        break
+                    self._condition.wait(debounce_secs - quiet_secs)
+                else:
+                    self._condition.wait()
+            paths        = self._paths
+            self._paths  = set()
+            self._events = []
+            return paths
+
+
+# =============================================================================
+class _ChangeHandler(pyinotify.ProcessEvent):
+    """
+    Add the paths of relevant inotify events to a ChangeSet.
+
+    """
+
+    # -------------------------------------------------------------------------
+    def my_init(self, **kwargs):                        # pylint: disable=W0221
+        """
+        Initialise the handler with a change_set and a dirpath_src.
+
+        """
+        self.change_set  = kwargs['change_set']
+        self.dirpath_src = kwargs['dirpath_src']
+
+    # -------------------------------------------------------------------------
+    def process_default(self, event):
+        """
+        Record a change, unless it is to a file that the build ignores.
+
+        """
+        if is_relevant(self.dirpath_src, event.pathname, event.dir):
+            self.change_set.add(event.pathname)
+
+
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _notifier_context(dirpath_src, change_set):
+    """
+    Context manager to add changes under dirpath_src to change_set.
+
+    """
+    watch_manager = pyinotify.WatchManager()
+    notifier      = pyinotify.ThreadedNotifier(
+                            watch_manager,
+                            default_proc_fun = _ChangeHandler(
+                                                change_set  = change_set,
+                                                dirpath_src = dirpath_src))
+    notifier.start()
+    try:
+        watch_manager.add_watch(
+                dirpath_src,
+                _EVENT_MASK,
+                rec            = True,
+                auto_add       = True,
+                exclude_filter = lambda path: is_excluded(dirpath_src, path))
+        yield
+    finally:
+        notifier.stop()
+
+
+# -----------------------------------------------------------------------------
+def is_excluded(dirpath_root, path):
+    """
+    Return True if path is in a directory that is excluded from the build.
+
+    """
+    relpath = os.path.relpath(path, dirpath_root)
+    return any(expr.match(name)
+               for name in relpath.split(os.sep) if name != os.curdir
+               for expr in _DIR_EXCLUDE_LIST)
+
+
+# -----------------------------------------------------------------------------
+def is_relevant(dirpath_root, path, is_dir):
+    """
+    Return True if a change to the specified path could affect the build.
+
+    Editor swap and backup files, caches and so on
+    are ignored, as are files outside dirpath_root.
+
+    """
+    relpath = os.path.relpath(path, dirpath_root)
+    if relpath.startswith(os.pardir):
+        return False
+    if is_excluded(dirpath_root, os.path.dirname(path)):
+        return False
+    if is_dir:
+        return not is_excluded(dirpath_root, path)
+    filename = os.path.basename(path)
+    return any(expr.match(filename) for expr in _FILE_INCLUDE_LIST)
+
+
+# -----------------------------------------------------------------------------
+def lower_priority(niceness, is_io_idle):
+    """
+    Lower the CPU and I/O scheduling priority of this process.
+
+    Child processes (e.g. builds and build servers)
+    inherit the reduced priority.
+
+    """
+    if niceness > 0:
+        os.nice(niceness)
+    if is_io_idle:
+        psutil.Process().ionice(psutil.IOPRIO_CLASS_IDLE)
+
+
+# -----------------------------------------------------------------------------
+def isolate(cfg, dirpath_lwc_root):
+    """
+    Make a fresh isolated copy of HEAD and return the set of changed files.
+
+    Any isolated copy left over from a previous
+    session holds changes that have since been
+    copied into it, so it is replaced. Files
+    which have been changed since HEAD are
+    returned rather than copied, so that they
+    are copied and built like any other change.
+
+    """
+    dirpath_isolated_src = cfg['paths']['dirpath_isolated_src']
+    if os.path.isdir(dirpath_isolated_src):
+        shutil.rmtree(dirpath_isolated_src)
+    da.vcs.clone_all_design_documents(
+        dirpath_lwc_root    = dirpath_lwc_root,
+        dirpath_destination = dirpath_isolated_src,
+        configuration       = cfg['defined_baseline']['hexsha'],
+        incremental         = cfg['options'].get(
+                                        'enable_incremental_isolation', True))
+    return set(da.vcs.changed_files(dirpath_lwc_root))
+
+
+# -----------------------------------------------------------------------------
+def sync_changed_files(changed_files, dirpath_lwc_root, dirpath_isolated_src):
+    """
+    Copy changed files to the isolated copy; return those that still exist.
+
+    Files and directories which no longer exist
+    in the local working copy are deleted from the
+    isolated copy. Directories (e.g. those moved
+    into the source tree) are copied in full, and
+    the files within them are returned.
+
+    """
+    existing = set()
+    for path in sorted(changed_files):
+        relpath = os.path.relpath(path, dirpath_lwc_root)
+        if relpath.startswith(os.pardir):
+            continue
+        path_isolated = os.path.join(dirpath_isolated_src, relpath)
+
+        if os.path.isfile(path):
+            _copy_file(path, path_isolated)
+            existing.add(path)
+
+        elif os.path.isdir(path):
+            existing.update(_sync_dir(path,
+                                      dirpath_lwc_root,
+                                      dirpath_isolated_src))
+
+        elif os.path.isdir(path_isolated):
+            shutil.rmtree(path_isolated)
+
+        elif os.path.lexists(path_isolated):
+            os.remove(path_isolated)
+
+    return existing
+
+
+# -----------------------------------------------------------------------------
+def _sync_dir(dirpath, dirpath_lwc_root, dirpath_isolated_src):
+    """
+    Copy relevant files in a directory to the isolated copy; return them.
+
+    Excluded directories are not descended into.
+
+    """
+    copied = []
+    for (dirpath_walk, dirnames, filenames) in os.walk(dirpath):
+        dirnames[:] = [name for name in dirnames
+                       if not is_excluded(dirpath_walk,
+                                          os.path.join(dirpath_walk, name))]
+        for filename in filenames:
+            filepath = os.path.join(dirpath_walk, filename)
+            if is_relevant(dirpath, filepath, is_dir = False):
+                _copy_file(filepath, os.path.join(
+                                dirpath_isolated_src,
+                                os.path.relpath(filepath, dirpath_lwc_root)))
+                copied.append(filepath)
+    return copied
+
+
+# -----------------------------------------------------------------------------
+def _copy_file(filepath_src, filepath_dst):
+    """
+    Copy a file, creating the destination directory if necessary.
+
+    """
+    da.util.ensure_dir_exists(os.path.dirname(filepath_dst))
+    shutil.copy2(filepath_src, filepath_dst)